@@ -2,22 +2,85 @@ import argparse
 import sys
 import os
 from dotenv import load_dotenv
-from src.utils.logger import log_experiment
+from src.utils.logger import export_experiment_log
 
 load_dotenv()
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--target_dir", type=str, required=True)
+    parser.add_argument("--workers", type=int, default=4, help="Nombre de shards traités en parallèle")
+    parser.add_argument("--max_iterations", type=int, default=3, help="Tentatives du Fixer par shard")
+    parser.add_argument("--shard_size", type=int, default=8, help="Nombre maximal de fichiers par shard")
+    parser.add_argument("--model", type=str, default=os.getenv("LLM_MODEL", "gemini-1.5-flash"))
+    parser.add_argument("--rpm", type=float, default=float(os.getenv("LLM_RPM", 0)) or None,
+                        help="Quota de requêtes LLM par minute (défaut : illimité)")
+    parser.add_argument("--tpm", type=float, default=float(os.getenv("LLM_TPM", 0)) or None,
+                        help="Quota de tokens LLM par minute (défaut : illimité)")
+    parser.add_argument("--candidates", type=int, default=1,
+                        help="Correctifs candidats générés et jugés en parallèle à chaque itération")
+    parser.add_argument("--context_budget", type=int, default=6000,
+                        help="Budget de tokens du code envoyé aux agents (0 : fichiers complets)")
+    parser.add_argument("--no_llm_cache", action="store_true", help="Désactive le cache disque des réponses LLM")
+    parser.add_argument("--llm_cache_ttl", type=float, default=None, help="Durée de validité du cache LLM (secondes)")
     args = parser.parse_args()
 
     if not os.path.exists(args.target_dir):
         print(f"❌ Dossier {args.target_dir} introuvable.")
         sys.exit(1)
 
+    # Imports tardifs : --help reste disponible même sans les dépendances LLM
+    from src.agents.llm import create_llm
+    from src.middleware.llm_cache import CachedLLM, LLMCache
+    from src.middleware.rate_limiter import RateLimitedLLM
+    from src.orchestration.swarm import Swarm
+    from src.tools.file_operations.SandboxSetup import setup_project_sandbox
+
     print(f"🚀 DEMARRAGE SUR : {args.target_dir}")
-    log_experiment("System", "STARTUP", f"Target: {args.target_dir}", "INFO")
+    root = setup_project_sandbox(args.target_dir)
+
+    try:
+        llm = create_llm(args.model)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    # Quotas du fournisseur partagés par tous les agents (priorité aux relances du Fixer
+    # après un verdict du Judge, puis au Fixer, puis à l'Auditor)
+    limiter = llm = RateLimitedLLM(llm, rpm=args.rpm, tpm=args.tpm, max_concurrency=max(1, args.workers))
+    cache = None
+    if not args.no_llm_cache:
+        # Les relances sur le même dossier rejouent les réponses déjà obtenues
+        cache = LLMCache.for_sandbox(root, ttl=args.llm_cache_ttl)
+        llm = CachedLLM(llm, cache, args.model)
+
+    def report_shard(result):
+        status = "✅" if result.passed else ("❌" if result.error else "⚠️")
+        detail = result.error or f"{len(result.changed_files)} fichier(s) modifié(s), {result.iterations} itération(s)"
+        print(f"{status} Shard {result.shard_id} ({len(result.files)} fichiers) : {detail}")
+
+    swarm = Swarm(
+        root, llm,
+        model_name=args.model,
+        workers=args.workers,
+        max_iterations=args.max_iterations,
+        max_shard_files=args.shard_size,
+        on_result=report_shard,
+        context_budget=args.context_budget or None,
+        candidates=args.candidates,
+    )
+    report = swarm.run()
+
+    print(f"📊 {report.passed}/{len(report.results)} shards validés, "
+          f"{len(report.changed_files)} fichiers modifiés en {report.elapsed:.1f}s")
+    limits = limiter.stats()
+    if limits["rate_limited"] or limits["coalesced"]:
+        print(f"🚦 Quotas : {limits['rate_limited']} erreur(s) 429, {limits['coalesced']} requête(s) fusionnée(s)")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"💾 Cache LLM : {stats['hits']} réponse(s) réutilisée(s), {stats['misses']} appel(s) au modèle")
+    count = export_experiment_log()
+    print(f"📝 {count} entrées de log exportées")
     print("✅ MISSION_COMPLETE")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,17 @@
+from .base_agent import BaseAgent
+from .auditor import AuditorAgent, AuditResult
+from .fixer import FixerAgent, FixerAnswerError
+from .judge import JudgeAgent, Verdict
+from .llm import DEFAULT_MODEL, create_llm
+
+__all__ = [
+    "BaseAgent",
+    "AuditorAgent",
+    "AuditResult",
+    "FixerAgent",
+    "FixerAnswerError",
+    "JudgeAgent",
+    "Verdict",
+    "DEFAULT_MODEL",
+    "create_llm",
+]
@@ -0,0 +1,64 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .base_agent import BaseAgent
+from .llm import extract_json
+from ..tools.analysis.PylintParser import PylintMessage
+from ..utils.logger import ActionType
+
+AUDIT_PROMPT = """You are the Auditor of a code refactoring team.
+Review the Python files below together with the pylint findings and write a
+refactoring plan: bugs, style problems, missing docstrings, dead code.
+Do not rewrite the code yourself.
+
+Answer with a JSON object:
+{{"plan": "<ordered list of changes>", "issues": {{"<file path>": ["<issue>", ...]}}}}
+
+Pylint findings:
+{lint}
+
+Files:
+{files}
+"""
+
+
+@dataclass(slots=True)
+class AuditResult:
+    plan: str
+    issues: Dict[str, List[str]] = field(default_factory=dict)
+
+
+def format_lint(messages: List[PylintMessage], limit: int = 200) -> str:
+    lines = [f"{m.path}:{m.line}: {m.message_id} ({m.symbol}) {m.message}" for m in messages[:limit]]
+    if len(messages) > limit:
+        lines.append(f"... {len(messages) - limit} more")
+    return "\n".join(lines) or "(none)"
+
+
+def format_files(sources: Dict[str, str]) -> str:
+    return "\n\n".join(f"### {path}\n```python\n{code}\n```" for path, code in sorted(sources.items()))
+
+
+class AuditorAgent(BaseAgent):
+    """Reads a shard and its pylint report, produces the plan the Fixer follows."""
+
+    name = "Auditor"
+
+    def audit(self, sources: Dict[str, str], messages: List[PylintMessage], shard_id: Optional[int] = None) -> AuditResult:
+        details = {}
+        if self.packer is not None:
+            packed = self.packer.pack(sources, messages)
+            prompt = AUDIT_PROMPT.format(lint=format_lint(packed.messages), files=packed.files)
+            details = {"context_tokens": packed.tokens, "excerpted": packed.excerpted}
+        else:
+            prompt = AUDIT_PROMPT.format(lint=format_lint(messages), files=format_files(sources))
+        text = self.ask(prompt, ActionType.ANALYSIS, shard=shard_id, files=sorted(sources), **details)
+        try:
+            data = extract_json(text)
+        except ValueError:
+            return AuditResult(plan=text.strip())
+        issues = data.get("issues") or {}
+        return AuditResult(
+            plan=str(data.get("plan") or text).strip(),
+            issues={str(k): [str(i) for i in v] for k, v in issues.items() if isinstance(v, list)},
+        )
@@ -0,0 +1,77 @@
+from typing import Any, Optional
+
+from .llm import DEFAULT_MODEL, response_text
+from ..utils.logger import ActionType, log_experiment
+
+
+class BaseAgent:
+    """
+    Common plumbing of the LLM agents: one `ask()` call = one LLM round trip,
+    always recorded with log_experiment (prompt, response, status).
+
+    `llm` can be a langchain chat model (anything with `.invoke(prompt)`) or a
+    plain callable taking the prompt and returning text (used by tests).
+    Wrappers exposing `invoke_cached(prompt) -> (text, info)` (the middleware
+    CachedLLM) also get their cache outcome logged as `llm_cache`, and those
+    exposing `with_priority(agent_name)` (the middleware RateLimitedLLM) are
+    bound to this agent's priority class (`ask(..., priority=...)` overrides it
+    for one call).
+    """
+
+    name = "Agent"
+
+    def __init__(self, llm: Any, model_name: str = DEFAULT_MODEL, packer: Any = None):
+        """
+        Args:
+            llm: chat model, callable or middleware wrapper
+            model_name: model name recorded in the experiment log
+            packer: optional context packer (`pack(sources, messages)`, see the
+                middleware ContextPacker) replacing whole files in prompts
+        """
+        self.packer = packer
+        self._base_llm = llm
+        self.llm = self._prioritized(self.name)
+        self.model_name = model_name
+
+    def _prioritized(self, priority: str) -> Any:
+        llm = self._base_llm
+        return llm.with_priority(priority) if hasattr(llm, "with_priority") else llm
+
+    def ask(self, prompt: str, action: ActionType, priority: Optional[str] = None, **details) -> str:
+        """
+        Send a prompt and log the interaction.
+
+        Args:
+            prompt: full prompt text
+            action: ActionType recorded in the experiment log
+            priority: priority class of this call, if not the agent's own
+            **details: extra fields stored in the log entry (e.g. shard id, files)
+
+        Returns:
+            the response text
+
+        Raises:
+            Exception: whatever the model raised (logged as FAILURE first)
+        """
+        llm = self.llm if priority is None else self._prioritized(priority)
+        cache_info = {}
+        try:
+            if hasattr(llm, "invoke_cached"):
+                response, info = llm.invoke_cached(prompt)
+                cache_info = {"llm_cache": info}
+            else:
+                response = llm.invoke(prompt) if hasattr(llm, "invoke") else llm(prompt)
+        except Exception as e:
+            log_experiment(
+                self.name, self.model_name, action,
+                {"input_prompt": prompt, "output_response": f"{type(e).__name__}: {e}", **details},
+                "FAILURE",
+            )
+            raise
+        text = response_text(response)
+        log_experiment(
+            self.name, self.model_name, action,
+            {"input_prompt": prompt, "output_response": text, **details, **cache_info},
+            "SUCCESS",
+        )
+        return text
@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional
+
+from .auditor import format_files
+from .base_agent import BaseAgent
+from .llm import extract_json
+from ..tools.analysis.PylintParser import PylintMessage
+from ..tools.file_operations.PatchApplier import PatchError, apply_patch
+from ..utils.logger import ActionType
+
+FIX_PROMPT = """You are the Fixer of a code refactoring team.
+Apply the refactoring plan to the Python files below. Keep the public behaviour
+unchanged and the code valid Python.
+{feedback}{excerpts}{candidate}
+Answer with a JSON object. For local changes send search/replace blocks (the
+SEARCH lines must appear exactly once in the file); send the complete new
+content only when most of a file changes:
+{{"patches": {{"<file path>": "<<<<<<< SEARCH\n<old lines>\n=======\n<new lines>\n>>>>>>> REPLACE"}},
+ "files": {{"<file path>": "<full new content>"}}}}
+Files you do not change can be omitted; if no change is needed, answer {{"files": {{}}}}.
+
+Plan:
+{plan}
+
+Files:
+{files}
+"""
+
+EXCERPTS_BLOCK = """
+Files shown as "(lines a-b)" excerpts or outlines are partial: change them with
+patches only (the SEARCH lines must come from the excerpts). Partial files: {paths}
+"""
+
+CANDIDATE_BLOCK = """
+You are writing candidate {index} of {count}; the candidates are generated in
+parallel and judged independently, so pick your own way to apply the plan.
+"""
+
+FEEDBACK_BLOCK = """
+Your previous attempt was rejected by the Judge. Fix these problems:
+{feedback}
+"""
+
+
+class FixerAnswerError(ValueError):
+    """The Fixer's answer is unusable (not JSON, truncated, or only changes it may not make)."""
+
+
+class FixerAgent(BaseAgent):
+    """Turns the Auditor's plan (and the Judge's feedback on retries) into new file contents."""
+
+    name = "Fixer"
+
+    def fix(
+        self,
+        sources: Dict[str, str],
+        plan: str,
+        feedback: Optional[str] = None,
+        shard_id: Optional[int] = None,
+        messages: Optional[List[PylintMessage]] = None,
+        candidate: Optional[int] = None,
+        candidates: int = 1,
+    ) -> Dict[str, str]:
+        """
+        Args:
+            sources: content of the shard files
+            plan: the Auditor's plan
+            feedback: the Judge's objections to the previous attempt
+            shard_id: shard id recorded in the log
+            messages: pylint findings, used to pack a smaller context
+            candidate: number of this attempt when several are generated at once
+                (it changes the prompt, so parallel candidates are not coalesced
+                or served from the LLM cache as one answer)
+            candidates: number of attempts generated at once
+
+        Returns:
+            new content per changed file (only files of the shard are kept);
+            empty only when the model explicitly answered that nothing changes
+
+        Raises:
+            PatchError: a patch does not apply to the current source
+            FixerAnswerError: the answer is not a JSON object, or none of its
+                changes can be used
+        """
+        details, partial = {}, set()
+        if self.packer is not None:
+            packed = self.packer.pack(sources, messages or [])
+            files_text, partial = packed.files, set(packed.excerpted)
+            details = {"context_tokens": packed.tokens, "excerpted": packed.excerpted}
+        else:
+            files_text = format_files(sources)
+        prompt = FIX_PROMPT.format(
+            feedback=FEEDBACK_BLOCK.format(feedback=feedback) if feedback else "",
+            excerpts=EXCERPTS_BLOCK.format(paths=", ".join(sorted(partial))) if partial else "",
+            candidate=CANDIDATE_BLOCK.format(index=candidate, count=candidates) if candidate else "",
+            plan=plan,
+            files=files_text,
+        )
+        # A retry after a failed judgement is debugging work, the first pass is a fix;
+        # retries are served first by a rate limiter (the shard is nearly done)
+        action = ActionType.DEBUG if feedback else ActionType.FIX
+        if candidate:
+            details["candidate"] = candidate
+        text = self.ask(prompt, action, priority="Retry" if feedback else None,
+                        shard=shard_id, files=sorted(sources), **details)
+        try:
+            answer = extract_json(text)
+            answered = dict(answer.get("files") or {})
+            patches = answer.get("patches") or {}
+            if not isinstance(patches, dict):
+                raise TypeError("patches is not an object")
+        except (ValueError, AttributeError, TypeError) as e:
+            raise FixerAnswerError(f"answer was not valid JSON ({e})") from e
+        # a full rewrite of a file the model only saw in part would drop the rest of it
+        files = {
+            p: c for p, c in answered.items()
+            if p in sources and p not in partial and isinstance(c, str)
+        }
+        for path, patch in patches.items():
+            if path in sources and path not in files and isinstance(patch, str):
+                try:
+                    files[path] = apply_patch(sources[path], patch).content
+                except PatchError as e:
+                    raise PatchError(f"{path}: {e}") from e
+        if not files and (answered or patches):
+            raise FixerAnswerError(
+                f"none of the changes apply to this shard (files: {sorted(answered)}, patches: {sorted(patches)}); "
+                "edit partial files with patches and only use the paths shown"
+            )
+        return {path: content for path, content in files.items() if content != sources[path]}
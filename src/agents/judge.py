@@ -0,0 +1,124 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+from ..tools.analysis.AstCache import parse_cached
+from ..tools.analysis.PylintRunner import PylintRunner
+
+
+@dataclass(slots=True)
+class Verdict:
+    passed: bool
+    score: float
+    syntax_errors: List[str] = field(default_factory=list)
+    tests_passed: Optional[bool] = None  # None: the shard has no tests
+    test_output: str = ""
+    cancelled: bool = False  # evaluation stopped early (another candidate won)
+
+    @property
+    def feedback(self) -> str:
+        """What the Fixer must address on its next attempt."""
+        parts = [f"Syntax error: {e}" for e in self.syntax_errors]
+        if self.tests_passed is False:
+            parts.append("Tests failed:\n" + self.test_output[-4000:])
+        if not parts and not self.passed:
+            parts.append(f"The pylint score dropped to {self.score:.2f}.")
+        return "\n".join(parts)
+
+
+def is_test_file(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+class JudgeAgent:
+    """
+    Accepts or rejects a shard after a fix, without calling the LLM:
+    every file must parse, the tests must pass, and the pylint score
+    must not drop below the score before the fix.
+
+    Only the tests passed to `evaluate` run; by default those are the test
+    files inside the shard. The Swarm also passes the tests that import the
+    shard's modules (see import_graph.tests_for).
+    """
+
+    name = "Judge"
+
+    def __init__(self, root: Union[str, Path], runner: Optional[PylintRunner] = None, test_timeout: float = 300.0):
+        self.root = Path(root).resolve()
+        self.runner = runner or PylintRunner(max_workers=1)
+        self.test_timeout = test_timeout
+
+    def lint(self, files: Sequence[str]):
+        return self.runner.run(self.root, files=list(files))
+
+    def run_tests(self, test_files: Sequence[str], cancel: Optional[threading.Event] = None) -> tuple:
+        """
+        Run pytest on the given files; returns (passed, output).
+
+        Setting `cancel` kills the pytest process and returns (False, "Cancelled").
+        """
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "pytest", "-q", "-x", "-p", "no:cacheprovider", *test_files],
+            cwd=self.root, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        deadline = time.monotonic() + self.test_timeout
+        while True:
+            try:
+                output, _ = proc.communicate(timeout=0.1)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel is not None and cancel.is_set():
+                    proc.kill()
+                    proc.communicate()
+                    return False, "Cancelled"
+                if time.monotonic() > deadline:
+                    proc.kill()
+                    output, _ = proc.communicate()
+                    return False, f"Tests timed out after {self.test_timeout:.0f}s\n{output or ''}"
+        # exit code 5: no tests collected
+        return proc.returncode in (0, 5), output
+
+    def evaluate(
+        self,
+        files: Sequence[str],
+        baseline_score: float,
+        cancel: Optional[threading.Event] = None,
+        tests: Optional[Sequence[str]] = None,
+    ) -> Verdict:
+        """
+        Judge the given files as they are on disk under `root`.
+
+        Args:
+            files: shard files (relative paths)
+            baseline_score: pylint score before the fix
+            cancel: optional event stopping the evaluation between and during checks
+            tests: test files to run (default: the test files among `files`)
+        """
+        syntax_errors = []
+        for rel in files:
+            try:
+                parse_cached((self.root / rel).read_text(encoding="utf-8"), rel)
+            except SyntaxError as e:
+                syntax_errors.append(f"{rel}: {e}")
+            except OSError:
+                continue
+        if syntax_errors:
+            return Verdict(passed=False, score=0.0, syntax_errors=syntax_errors)
+
+        if cancel is not None and cancel.is_set():
+            return Verdict(passed=False, score=0.0, cancelled=True)
+        score = self.lint(files).score()
+        if tests is None:
+            tests = [f for f in files if is_test_file(f)]
+        tests_passed, output = self.run_tests(tests, cancel) if tests else (None, "")
+        if cancel is not None and cancel.is_set() and not tests_passed:
+            return Verdict(passed=False, score=score, cancelled=True)
+        passed = tests_passed is not False and score >= baseline_score - 1e-9
+        return Verdict(passed=passed, score=score, tests_passed=tests_passed, test_output=output)
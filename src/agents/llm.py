@@ -0,0 +1,50 @@
+import json
+import re
+from typing import Any
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def create_llm(model_name: str = DEFAULT_MODEL, temperature: float = 0.0):
+    """
+    Chat model used by the agents (Gemini through langchain-google-genai).
+
+    Raises:
+        RuntimeError: if langchain-google-genai is not installed
+    """
+    try:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+    except ImportError as e:
+        raise RuntimeError(
+            "langchain-google-genai is not installed: run `pip install -r requirements.txt`"
+        ) from e
+    return ChatGoogleGenerativeAI(model=model_name, temperature=temperature)
+
+
+def response_text(response: Any) -> str:
+    """Text of an LLM response (chat message, plain string or list of content parts)."""
+    content = getattr(response, "content", response)
+    if isinstance(content, list):
+        return "".join(part if isinstance(part, str) else str(part.get("text", "")) for part in content)
+    return str(content)
+
+
+def extract_json(text: str) -> Any:
+    """
+    Decode the JSON object of an LLM answer (fenced ```json block or first {...} span).
+
+    Raises:
+        ValueError: if no JSON object can be decoded
+    """
+    candidates = [m.group(1) for m in _FENCE.finditer(text)]
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        candidates.append(text[start:end + 1])
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("No JSON object found in the model response")
@@ -0,0 +1,17 @@
+from .llm_cache import CachedLLM, LLMCache, cache_key, normalize_prompt
+from .context_packer import ContextPacker, PackedContext, Snippet
+from .rate_limiter import PrioritizedLLM, RateLimitedLLM, TokenBucket, estimate_tokens
+
+__all__ = [
+    "CachedLLM",
+    "LLMCache",
+    "cache_key",
+    "normalize_prompt",
+    "ContextPacker",
+    "PackedContext",
+    "Snippet",
+    "PrioritizedLLM",
+    "RateLimitedLLM",
+    "TokenBucket",
+    "estimate_tokens",
+]
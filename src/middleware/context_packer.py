@@ -0,0 +1,266 @@
+import ast
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .rate_limiter import estimate_tokens
+from ..tools.analysis.AstCache import parse_cached
+from ..tools.analysis.PylintParser import PylintMessage
+from ..tools.analysis.SymbolIndex import build_symbol_index
+from ..tools.file_operations.PatchApplier import split_lines
+
+# Most severe findings are packed first
+_SEVERITY = {"fatal": 0, "error": 1, "warning": 2, "refactor": 3, "convention": 4, "info": 5}
+_BLOCK_OVERHEAD = 12  # tokens of a "### path (lines a-b)" header and code fence
+_MESSAGE_TOKENS = 24  # typical formatted pylint message
+
+
+@dataclass(slots=True)
+class Snippet:
+    """Lines [start, end] (1-based, inclusive) of a file worth showing to the model."""
+
+    path: str
+    start: int
+    end: int
+    rank: Tuple[int, int] = (9, 9)  # (finding severity, 0 = enclosing definition / 1 = referenced symbol)
+    reason: str = ""
+    line: Optional[int] = None  # line of the finding, for enclosing definitions
+
+
+@dataclass(slots=True)
+class PackedContext:
+    """
+    Prompt context built by ContextPacker.
+
+    Attributes:
+        files: rendered code blocks (whole files, excerpts, outlines)
+        messages: pylint messages kept within the budget
+        tokens: estimated size of `files` plus the kept messages
+        excerpted: files shown partially (they must be edited with patches)
+        omitted: files not shown at all
+    """
+
+    files: str
+    messages: List[PylintMessage] = field(default_factory=list)
+    tokens: int = 0
+    excerpted: List[str] = field(default_factory=list)
+    omitted: List[str] = field(default_factory=list)
+
+
+def _definition_nodes(tree: ast.Module) -> List[ast.AST]:
+    """Function/class definitions of a module, in line order."""
+    nodes = [n for n in ast.walk(tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+    return sorted(nodes, key=lambda n: n.lineno)
+
+
+def _definition_at(nodes: List[ast.AST], start: int, qualified: str) -> Optional[ast.AST]:
+    """Node of the definition whose index span starts at `start` (decorators included)."""
+    short = qualified.rsplit(".", 1)[-1]
+    return next((n for n in nodes if n.lineno >= start and n.name == short), None)
+
+
+def _header_end(node: ast.AST) -> int:
+    """Last line of a definition's signature and docstring."""
+    body = node.body
+    first = body[0]
+    if isinstance(first, ast.Expr) and isinstance(getattr(first, "value", None), ast.Constant) \
+            and isinstance(first.value.value, str):
+        return first.end_lineno or first.lineno
+    return max(node.lineno, first.lineno - 1)
+
+
+def _referenced_names(node: ast.AST) -> Iterable[str]:
+    seen = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+            name = child.id
+        elif isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name) \
+                and child.value.id in ("self", "cls"):
+            name = child.attr
+        else:
+            continue
+        if name not in seen:
+            seen.add(name)
+            yield name
+
+
+class ContextPacker:
+    """
+    Builds the smallest useful code context for an agent prompt.
+
+    Instead of whole files, each pylint finding contributes the definition
+    enclosing it, and the definitions it references (located through the
+    symbol index, anywhere in the given files) contribute their signature
+    and docstring. Small files are shown whole; files without findings are
+    reduced to an outline. Everything is added by priority (severity first)
+    until the token budget, estimated locally, is spent.
+    """
+
+    def __init__(
+        self,
+        budget: int = 6000,
+        whole_file_tokens: int = 300,
+        max_references: int = 8,
+        tokenizer: Callable[[str], int] = estimate_tokens,
+    ):
+        """
+        Args:
+            budget: token budget for code and findings
+            whole_file_tokens: files up to this size are always shown whole
+            max_references: referenced definitions added per finding
+            tokenizer: token count estimate of a text
+        """
+        self.budget = budget
+        self.whole_file_tokens = whole_file_tokens
+        self.max_references = max_references
+        self.tokenizer = tokenizer
+
+    # ---- analysis ------------------------------------------------------------
+
+    def _enclosing(self, source: str, line: int) -> Optional[Tuple[str, int, int]]:
+        """Innermost definition containing `line`: (qualified name, start, end)."""
+        best = None
+        for name, (start, end) in build_symbol_index(source).items():
+            if start <= line <= end and (best is None or end - start < best[2] - best[1]):
+                best = (name, start, end)
+        return best
+
+    def _references(self, sources: Dict[str, str], nodes: Dict[str, List[ast.AST]], path: str,
+                    name: str, start: int, severity: int) -> List[Snippet]:
+        """Signature + docstring of the definitions used by `name` (defined at `start` in `path`)."""
+        node = _definition_at(nodes[path], start, name)
+        if node is None:
+            return []
+        owner = name.rsplit(".", 1)[0] + "." if "." in name else ""
+
+        snippets = []
+        for ref in _referenced_names(node):
+            if len(snippets) >= self.max_references:
+                break
+            # the file being fixed first, then the other files
+            for other in sorted(nodes, key=lambda p: (p != path, p)):
+                spans = build_symbol_index(sources[other])
+                qualified = owner + ref if other == path and owner + ref in spans else ref
+                if qualified not in spans or (other == path and qualified == name):
+                    continue
+                ref_start = spans[qualified][0]
+                target = _definition_at(nodes[other], ref_start, qualified)
+                if target is not None:
+                    snippets.append(Snippet(other, ref_start, _header_end(target), (severity, 1), f"used by {name}"))
+                break
+        return snippets
+
+    def snippets(self, sources: Dict[str, str], messages: List[PylintMessage]) -> List[Snippet]:
+        """Candidate excerpts for the findings, most important first."""
+        nodes: Dict[str, List[ast.AST]] = {}
+        for path, source in sources.items():
+            try:
+                nodes[path] = _definition_nodes(parse_cached(source, path))
+            except SyntaxError:
+                continue
+        found: List[Snippet] = []
+        for message in sorted(messages, key=lambda m: (_SEVERITY.get(m.category, 9), m.path, m.line)):
+            if message.path not in sources:
+                continue
+            severity = _SEVERITY.get(message.category, 9)
+            enclosing = self._enclosing(sources[message.path], message.line) if message.path in nodes else None
+            if enclosing is None:
+                # module level finding: a few lines around it
+                start = max(1, message.line - 2)
+                found.append(Snippet(message.path, start, message.line + 2, (severity, 0), message.symbol))
+                continue
+            name, start, end = enclosing
+            found.append(Snippet(message.path, start, end, (severity, 0), message.symbol, message.line))
+            found.extend(self._references(sources, nodes, message.path, name, start, severity))
+        found.sort(key=lambda s: s.rank)
+        return found
+
+    # ---- packing -------------------------------------------------------------
+
+    def pack(self, sources: Dict[str, str], messages: List[PylintMessage]) -> PackedContext:
+        """
+        Args:
+            sources: content per file path
+            messages: pylint messages for these files
+
+        Returns:
+            PackedContext within the budget (findings first, then code)
+        """
+        remaining = self.budget
+        kept_messages = []
+        for message in sorted(messages, key=lambda m: (_SEVERITY.get(m.category, 9), m.path, m.line)):
+            if remaining - _MESSAGE_TOKENS < self.budget // 2:
+                break  # findings never take more than half of the budget
+            kept_messages.append(message)
+            remaining -= _MESSAGE_TOKENS
+
+        # numbered like pylint and the AST: a form feed or "\x85" does not end a line
+        lines = {path: split_lines(source)[0] for path, source in sources.items()}
+        sizes = {path: self.tokenizer(source) for path, source in sources.items()}
+        with_findings = {m.path for m in kept_messages}
+        whole: List[str] = []
+        for path in sorted(sources, key=lambda p: (p not in with_findings, sizes[p], p)):
+            if sizes[path] <= self.whole_file_tokens and sizes[path] + _BLOCK_OVERHEAD <= remaining:
+                whole.append(path)
+                remaining -= sizes[path] + _BLOCK_OVERHEAD
+
+        shown: Dict[str, Set[int]] = {}
+        for snippet in self.snippets(sources, kept_messages):
+            if snippet.path in whole:
+                continue
+            spans = [(snippet.start, snippet.end)]
+            if snippet.line is not None:
+                # a definition too large for the budget: the lines around the finding
+                spans.append((max(snippet.start, snippet.line - 5), min(snippet.end, snippet.line + 5)))
+            for start, end in spans:
+                file_lines = lines[snippet.path]
+                new = [n for n in range(start, min(end, len(file_lines)) + 1) if n not in shown.get(snippet.path, ())]
+                cost = self.tokenizer("\n".join(file_lines[n - 1] for n in new)) + _BLOCK_OVERHEAD
+                if not new or cost <= remaining:
+                    if new:
+                        shown.setdefault(snippet.path, set()).update(new)
+                        remaining -= cost
+                    break
+
+        outlines: Dict[str, str] = {}
+        for path in sorted(sources):
+            if path in whole or path in shown:
+                continue
+            try:
+                spans = build_symbol_index(sources[path])
+            except SyntaxError:
+                continue
+            outline = "\n".join(f"{start}: {name}" for name, (start, _) in sorted(spans.items(), key=lambda i: i[1]))
+            cost = self.tokenizer(outline) + _BLOCK_OVERHEAD
+            if outline and cost <= remaining:
+                outlines[path] = outline
+                remaining -= cost
+
+        blocks = []
+        for path in sorted(sources):
+            if path in whole:
+                blocks.append(f"### {path}\n```python\n{sources[path]}\n```")
+            elif path in shown:
+                for start, end in _ranges(shown[path]):
+                    excerpt = "\n".join(lines[path][start - 1:end])
+                    blocks.append(f"### {path} (lines {start}-{end})\n```python\n{excerpt}\n```")
+            elif path in outlines:
+                blocks.append(f"### {path} (outline: line: definition)\n```\n{outlines[path]}\n```")
+
+        return PackedContext(
+            files="\n\n".join(blocks),
+            messages=kept_messages,
+            tokens=self.budget - remaining,
+            excerpted=sorted(p for p in sources if p not in whole),
+            omitted=sorted(p for p in sources if p not in whole and p not in shown and p not in outlines),
+        )
+
+
+def _ranges(numbers: Set[int]) -> List[Tuple[int, int]]:
+    """Consecutive runs of line numbers, as (first, last) pairs."""
+    runs: List[Tuple[int, int]] = []
+    for n in sorted(numbers):
+        if runs and n == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], n)
+        else:
+            runs.append((n, n))
+    return runs
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from ..agents.llm import response_text
+
+CACHE_FILENAME = "llm_cache.sqlite"
+
+# Model attributes that change the answer for a given prompt
+_PARAM_NAMES = ("temperature", "top_p", "top_k", "max_output_tokens", "max_tokens", "n", "candidate_count")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def normalize_prompt(prompt: Any) -> str:
+    """
+    Canonical text of a prompt, so cosmetic differences do not miss the cache.
+
+    Line endings are unified and trailing whitespace is dropped. A list of chat
+    messages is serialized as (role, content) pairs.
+    """
+    if isinstance(prompt, (list, tuple)):
+        messages = []
+        for message in prompt:
+            if isinstance(message, (list, tuple)) and len(message) == 2:
+                role, content = message
+            elif isinstance(message, dict):
+                role, content = message.get("role", ""), message.get("content", "")
+            else:
+                role = getattr(message, "type", type(message).__name__)
+                content = response_text(message)
+            messages.append([str(role), normalize_prompt(content)])
+        return json.dumps(messages, ensure_ascii=False)
+    text = str(prompt).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.strip("\n").split("\n"))
+
+
+def model_params(llm: Any) -> Dict[str, Any]:
+    """Sampling parameters of a langchain chat model (those that are set), looking through wrappers."""
+    while getattr(llm, "wrapped", None) is not None:
+        llm = llm.wrapped
+    params = {}
+    for name in _PARAM_NAMES:
+        value = getattr(llm, name, None)
+        if value is not None and isinstance(value, (int, float, str, bool)):
+            params[name] = value
+    return params
+
+
+def cache_key(model: str, params: Dict[str, Any], prompt: Any) -> str:
+    """SHA-256 of the model name, its parameters and the normalized prompt."""
+    payload = json.dumps(
+        {"model": model, "params": params, "prompt": normalize_prompt(prompt)},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Disk-backed store of LLM responses (SQLite), bounded by age and entry count.
+
+    Entries older than `ttl` seconds are ignored and deleted; beyond
+    `max_entries`, the least recently used responses are evicted. WAL mode
+    lets several processes replaying the same target share one cache file.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: Optional[float] = None, max_entries: int = 10000):
+        """
+        Args:
+            path: SQLite database file (parent directories are created)
+            ttl: maximum age of a response in seconds (None: no expiry)
+            max_entries: maximum number of stored responses
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30.0)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    @classmethod
+    def for_sandbox(cls, root: Union[str, Path, None] = None, **kwargs) -> "LLMCache":
+        """Cache stored in `<sandbox>/logs/llm_cache.sqlite` (default root: the current sandbox)."""
+        if root is None:
+            from ..tools.file_operations import SandboxSetup
+            root = SandboxSetup.SANDBOX_ROOT
+        if root is None:
+            raise RuntimeError("Sandbox not initialized")
+        return cls(Path(root) / "logs" / CACHE_FILENAME, **kwargs)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created, accessed, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, model, response, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(response)), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedLLM:
+    """
+    Wraps a chat model (or a plain callable) with an LLMCache.
+
+    The key covers the model name, its sampling parameters and the normalized
+    prompt, so a re-run on an unchanged project replays the stored answers
+    without any network round trip. Failed calls are never cached.
+
+    BaseAgent uses `invoke_cached()` to record the cache outcome in the experiment log.
+    """
+
+    def __init__(self, llm: Any, cache: LLMCache, model_name: str, params: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            llm: chat model (anything with `.invoke(prompt)`) or callable
+            cache: response store
+            model_name: model name, part of the cache key
+            params: sampling parameters for the key (default: read from `llm`)
+        """
+        self.llm = llm
+        self.cache = cache
+        self.model_name = model_name
+        self.params = model_params(llm) if params is None else dict(params)
+
+    def invoke_cached(self, prompt: Any) -> Tuple[str, dict]:
+        """
+        Returns:
+            (response text, cache info for the log: hit, key and running totals)
+        """
+        key = cache_key(self.model_name, self.params, prompt)
+        text = self.cache.get(key)
+        hit = text is not None
+        if not hit:
+            response = self.llm.invoke(prompt) if hasattr(self.llm, "invoke") else self.llm(prompt)
+            text = response_text(response)
+            self.cache.put(key, self.model_name, text)
+        info = {
+            "hit": hit,
+            "key": key[:16],
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+        }
+        return text, info
+
+    @property
+    def wrapped(self) -> Any:
+        return self.llm
+
+    def with_priority(self, priority: Any) -> "CachedLLM":
+        """Same cache in front of a prioritized view of the wrapped model, if it supports one."""
+        if not hasattr(self.llm, "with_priority"):
+            return self
+        return CachedLLM(self.llm.with_priority(priority), self.cache, self.model_name, self.params)
+
+    def invoke(self, prompt: Any) -> str:
+        return self.invoke_cached(prompt)[0]
+
+    __call__ = invoke
@@ -0,0 +1,332 @@
+import hashlib
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Union
+
+from ..agents.llm import response_text
+from .llm_cache import normalize_prompt
+
+# Lower value = served first. The Judge never calls the model: its verdicts are
+# answered by Fixer retries ("Retry"), the last step before a shard completes,
+# while an Auditor call only starts a shard.
+AGENT_PRIORITIES: Dict[str, int] = {"Retry": 0, "Fixer": 1, "Auditor": 2}
+DEFAULT_PRIORITY = 1
+
+# Exception class names provider clients use for HTTP 429 / quota exhaustion
+_RATE_LIMIT_ERRORS = frozenset({"RateLimitError", "ResourceExhausted", "TooManyRequests", "RateLimitExceeded"})
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for code and English)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    True for provider quota errors, whatever the client library: an HTTP 429
+    (or gRPC RESOURCE_EXHAUSTED) status, a Retry-After, or a known exception
+    type. The message text is not inspected, so an unrelated error mentioning
+    "429" or a billing "quota" is not retried.
+    """
+    for attr in ("status_code", "code", "status"):
+        value = getattr(error, attr, None)
+        if value == 429 or str(value) == "429" or str(value).endswith("RESOURCE_EXHAUSTED"):
+            return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    if retry_after(error) is not None:
+        return True
+    return any(cls.__name__ in _RATE_LIMIT_ERRORS for cls in type(error).__mro__)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Delay requested by the provider, if the error carries one."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute` units per minute.
+
+    Not thread-safe on its own: RateLimitedLLM only touches it under its lock.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            per_minute: sustained rate
+            capacity: burst size (default: one minute worth of units)
+            clock: monotonic time source
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.clock = clock
+        self.tokens = self.capacity
+        self._stamp = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        """Correct a reservation (negative values charge extra units)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "tokens")
+
+    def __init__(self, priority: int, seq: int, tokens: int):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RateLimitedLLM:
+    """
+    Admission control in front of a chat model shared by parallel agents.
+
+    - requests-per-minute and tokens-per-minute token buckets (the prompt is
+      estimated, plus `output_tokens` reserved for the answer and corrected
+      once the answer is known);
+    - strict priority between waiting requests (see AGENT_PRIORITIES),
+      first come first served within a class;
+    - adaptive concurrency (AIMD): the in-flight limit grows by one after a
+      window of successes and is halved on a 429;
+    - a 429 pauses every caller for a jittered exponential delay (or the
+      provider's Retry-After) before the request is retried, so the quota
+      is not hammered by the other threads meanwhile;
+    - identical prompts already in flight are coalesced: followers wait for
+      the leader's answer instead of sending the request again.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        output_tokens: int = 512,
+        burst: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Args:
+            llm: chat model (anything with `.invoke(prompt)`) or callable
+            rpm: requests per minute (None: unlimited)
+            tpm: tokens per minute (None: unlimited)
+            max_concurrency: upper bound of the adaptive in-flight limit
+            min_concurrency: lower bound after 429 back-offs
+            max_retries: retries of a rate-limited request before giving up
+            base_delay: first back-off delay in seconds (doubled per retry)
+            max_delay: back-off cap in seconds
+            output_tokens: tokens reserved per request for the answer
+            burst: bucket capacity as a fraction of a minute (default: a full minute)
+            rng: random source for the jitter
+        """
+        self.llm = llm
+        self.rpm = TokenBucket(rpm, rpm * burst if burst else None) if rpm else None
+        self.tpm = TokenBucket(tpm, tpm * burst if burst else None) if tpm else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = self.max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.output_tokens = output_tokens
+        self.rng = rng or random.Random()
+
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.coalesced = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._waiting: list = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Future] = {}
+
+    @property
+    def wrapped(self) -> Any:
+        return self.llm
+
+    def with_priority(self, priority: Union[str, int]) -> "PrioritizedLLM":
+        """View of this limiter whose requests use `priority` (an agent name or a number)."""
+        if isinstance(priority, str):
+            priority = AGENT_PRIORITIES.get(priority, DEFAULT_PRIORITY)
+        return PrioritizedLLM(self, priority)
+
+    # ---- admission -----------------------------------------------------------
+
+    def _acquire(self, priority: int, seq: int, tokens: int) -> None:
+        ticket = _Ticket(priority, seq, tokens)
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                wait = None
+                if self._waiting[0] is ticket and self.in_flight < self.limit:
+                    wait = max(
+                        self._paused_until - time.monotonic(),
+                        self.rpm.wait_time(1) if self.rpm else 0.0,
+                        self.tpm.wait_time(tokens) if self.tpm else 0.0,
+                    )
+                    if wait <= 0:
+                        heapq.heappop(self._waiting)
+                        if self.rpm:
+                            self.rpm.take(1)
+                        if self.tpm:
+                            self.tpm.take(tokens)
+                        self.in_flight += 1
+                        self.requests += 1
+                        self._cond.notify_all()  # the next ticket becomes head
+                        return
+                self._cond.wait(wait)
+
+    def _release(self, ok: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if ok:
+                # additive increase: one more slot per window of `limit` successes
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+    def _back_off(self, attempt: int, error: BaseException, started: float) -> float:
+        """Record a 429 and pause everyone; returns the delay."""
+        delay = self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        requested = retry_after(error)
+        if requested is not None:
+            delay = max(delay, requested)
+        with self._cond:
+            self.rate_limited += 1
+            # multiplicative decrease, once per congestion event: requests sent
+            # before the previous decrease do not shrink the window again
+            if started >= self._last_decrease:
+                self.limit = max(self.min_concurrency, self.limit // 2)
+                self._successes = 0
+                self._last_decrease = time.monotonic()
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._cond.notify_all()
+        return delay
+
+    # ---- calls ---------------------------------------------------------------
+
+    def _send(self, prompt: Any, priority: int) -> str:
+        prompt_tokens = estimate_tokens(normalize_prompt(prompt))
+        tokens = prompt_tokens + self.output_tokens
+        seq = next(self._seq)  # a retried request keeps its place in the queue
+        for attempt in range(self.max_retries + 1):
+            self._acquire(priority, seq, tokens)
+            started = time.monotonic()
+            try:
+                response = self.llm.invoke(prompt) if hasattr(self.llm, "invoke") else self.llm(prompt)
+            except Exception as e:
+                self._release(ok=False)
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self._back_off(attempt, e, started)
+                with self._cond:
+                    self.retries += 1
+                continue
+            self._release(ok=True)
+            text = response_text(response)
+            if self.tpm:
+                with self._cond:
+                    self.tpm.give_back(tokens - (prompt_tokens + estimate_tokens(text)))
+            return text
+        raise RuntimeError("unreachable")
+
+    def invoke(self, prompt: Any, priority: int = DEFAULT_PRIORITY) -> str:
+        key = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+        with self._cond:
+            future = self._pending.get(key)
+            leader = future is None
+            if leader:
+                future = self._pending[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            text = self._send(prompt, priority)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(text)
+            return text
+        finally:
+            with self._cond:
+                self._pending.pop(key, None)
+
+    __call__ = invoke
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "coalesced": self.coalesced,
+                "concurrency_limit": self.limit,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiting),
+            }
+
+
+class PrioritizedLLM:
+    """RateLimitedLLM view sending every request with a fixed priority."""
+
+    def __init__(self, limiter: RateLimitedLLM, priority: int):
+        self.limiter = limiter
+        self.priority = priority
+
+    @property
+    def wrapped(self) -> Any:
+        return self.limiter.llm
+
+    def with_priority(self, priority: Union[str, int]) -> "PrioritizedLLM":
+        return self.limiter.with_priority(priority)
+
+    def invoke(self, prompt: Any) -> str:
+        return self.limiter.invoke(prompt, self.priority)
+
+    __call__ = invoke
@@ -0,0 +1,21 @@
+from .import_graph import build_import_graph
+from .sharding import Shard, shard_files
+from .workflow import ShardState, build_shard_graph
+from .scheduler import DependencyScheduler
+from .speculation import Overlay, SpeculativeFixer
+from .swarm import ShardResult, Swarm, SwarmReport, run_swarm
+
+__all__ = [
+    "build_import_graph",
+    "Shard",
+    "shard_files",
+    "ShardState",
+    "build_shard_graph",
+    "DependencyScheduler",
+    "Overlay",
+    "SpeculativeFixer",
+    "ShardResult",
+    "Swarm",
+    "SwarmReport",
+    "run_swarm",
+]
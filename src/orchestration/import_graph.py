@@ -0,0 +1,109 @@
+import ast
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Union
+
+from ..agents.judge import is_test_file
+from ..tools.analysis.AstCache import parse_cached
+
+# file (relative path) -> files it imports (relative paths, only files of the project)
+ImportGraph = Dict[str, Set[str]]
+
+
+def module_names(rel_path: str, packages: Set[str]) -> List[str]:
+    """
+    Dotted names a file can be imported as.
+
+    "pkg/mod.py" gives "pkg.mod"; "pkg/__init__.py" gives "pkg". Leading
+    directories that are not packages (no __init__.py, e.g. a "src" layout
+    folder) are also dropped, since they are usually put on sys.path.
+    """
+    parts = rel_path[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    names = [".".join(parts)] if parts else []
+    for i in range(1, len(parts)):
+        if "/".join(parts[:i]) in packages:
+            break
+        names.append(".".join(parts[i:]))
+    return names
+
+
+def _package_of(rel_path: str) -> List[str]:
+    parts = rel_path[:-3].split("/")
+    return parts[:-1]
+
+
+def _imported_modules(tree: ast.AST, rel_path: str) -> Iterable[str]:
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                package = _package_of(rel_path)
+                if node.level > 1:
+                    package = package[:len(package) - (node.level - 1)]
+                base = ".".join(package + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if base:
+                yield base
+            for alias in node.names:
+                if alias.name != "*":
+                    yield f"{base}.{alias.name}" if base else alias.name
+
+
+def build_import_graph(root: Union[str, Path], files: Iterable[str]) -> ImportGraph:
+    """
+    Static import graph between the given files.
+
+    Args:
+        root: project root
+        files: .py paths relative to root
+
+    Returns:
+        ImportGraph; files that fail to parse simply have no edges
+    """
+    root = Path(root)
+    files = sorted(files)
+    packages = {f[: -len("/__init__.py")] for f in files if f.endswith("/__init__.py")}
+    by_module: Dict[str, str] = {}
+    for rel in files:
+        for name in module_names(rel, packages):
+            by_module.setdefault(name, rel)
+
+    graph: ImportGraph = {rel: set() for rel in files}
+    for rel in files:
+        try:
+            tree = parse_cached((root / rel).read_text(encoding="utf-8"), rel)
+        except (OSError, UnicodeDecodeError, SyntaxError, ValueError):
+            continue
+        for name in _imported_modules(tree, rel):
+            # "a.b.c" may be a module, or a name defined in module "a.b"
+            while name:
+                target = by_module.get(name)
+                if target is not None:
+                    if target != rel:
+                        graph[rel].add(target)
+                    break
+                name = name.rpartition(".")[0]
+    return graph
+
+
+def tests_for(graph: ImportGraph, files: Iterable[str]) -> List[str]:
+    """
+    Test files exercising the given files: those among them, plus every test
+    file importing one of them, directly or through other project modules.
+    """
+    importers: Dict[str, Set[str]] = {}
+    for src, targets in graph.items():
+        for dst in targets:
+            importers.setdefault(dst, set()).add(src)
+    seen = set(files)
+    stack = list(seen)
+    while stack:
+        for importer in importers.get(stack.pop(), ()):
+            if importer not in seen:
+                seen.add(importer)
+                stack.append(importer)
+    return sorted(f for f in seen if is_test_file(f))
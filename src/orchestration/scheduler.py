@@ -0,0 +1,228 @@
+import hashlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Union
+
+from .import_graph import ImportGraph
+from .sharding import Shard
+from ..tools.file_operations import WriteEvents
+
+_ABSENT = "absent"
+
+
+def _digest(content: Optional[Union[str, bytes]]) -> str:
+    if content is None:
+        return _ABSENT
+    if isinstance(content, str):
+        content = content.encode("utf-8", "surrogatepass")
+    return hashlib.sha256(content).hexdigest()
+
+
+def strongly_connected(nodes: List[int], edges: Dict[int, Set[int]]) -> Dict[int, int]:
+    """Tarjan's algorithm (iterative); returns node -> component number."""
+    index: Dict[int, int] = {}
+    low: Dict[int, int] = {}
+    component: Dict[int, int] = {}
+    stack: List[int] = []
+    on_stack: Set[int] = set()
+    counter = 0
+    n_components = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(sorted(edges.get(root, ()))))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(sorted(edges.get(child, ())))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component[member] = n_components
+                    if member == node:
+                        break
+                n_components += 1
+    return component
+
+
+class DependencyScheduler:
+    """
+    Runs shards in import order, independent shards in parallel.
+
+    A shard starts once every shard it imports from is done, so a module is
+    refactored before the modules that use it. Shards importing each other in
+    a cycle are treated as independent.
+
+    While the run is in progress the scheduler listens to write events. When a
+    shard finishes, the files it really changed (current content differs from
+    the content before the run, so rolled-back attempts do not count) re-queue
+    only the shards that import them and had already finished, at most
+    `max_requeues` times per shard. Nothing else is re-run.
+    """
+
+    def __init__(
+        self,
+        graph: ImportGraph,
+        shards: List[Shard],
+        run_shard: Callable[[Shard], object],
+        root: Union[str, Path],
+        workers: int = 4,
+        max_requeues: int = 1,
+    ):
+        """
+        Args:
+            graph: import graph of the project (file -> imported files)
+            shards: shards to run (disjoint file sets)
+            run_shard: callable processing one shard and returning its result
+            root: project root (to read final file contents)
+            workers: shards processed concurrently
+            max_requeues: extra runs allowed per shard after a dependency changed
+        """
+        self.shards = {s.id: s for s in shards}
+        self.run_shard = run_shard
+        self.root = Path(root).resolve()
+        self.workers = max(1, workers)
+        self.max_requeues = max(0, max_requeues)
+
+        self.owner: Dict[str, int] = {f: s.id for s in shards for f in s.files}
+        # file -> files importing it
+        self.importers: Dict[str, Set[str]] = {}
+        for src, targets in graph.items():
+            for dst in targets:
+                self.importers.setdefault(dst, set()).add(src)
+
+        # shard -> shards it imports from
+        deps: Dict[int, Set[int]] = {sid: set() for sid in self.shards}
+        for src, targets in graph.items():
+            if src not in self.owner:
+                continue
+            for dst in targets:
+                if dst in self.owner and self.owner[dst] != self.owner[src]:
+                    deps[self.owner[src]].add(self.owner[dst])
+        component = strongly_connected(sorted(self.shards), deps)
+        self.dependencies = {
+            sid: {d for d in ds if component[d] != component[sid]} for sid, ds in deps.items()
+        }
+        self.dependents: Dict[int, Set[int]] = {sid: set() for sid in self.shards}
+        for sid, ds in self.dependencies.items():
+            for d in ds:
+                self.dependents[d].add(sid)
+
+        self.runs: Dict[int, int] = {}
+        self.order: List[int] = []  # shard ids in start order (re-runs included)
+        self._baseline: Dict[str, str] = {}
+        self._touched: Set[str] = set()
+        self._lock = threading.Lock()
+
+    # ---- write tracking ----------------------------------------------------
+
+    def _on_write(self, event: WriteEvents.WriteEvent) -> None:
+        rel = event.relative_path
+        if rel not in self.owner:
+            return
+        with self._lock:
+            if rel not in self._baseline:
+                self._baseline[rel] = _digest(event.old_content)
+            self._touched.add(rel)
+
+    def _changed_files(self, shard_id: int) -> List[str]:
+        """Files of the shard whose content now differs from before the run."""
+        with self._lock:
+            touched = [f for f in self._touched if self.owner[f] == shard_id]
+            self._touched.difference_update(touched)
+            baseline = {f: self._baseline[f] for f in touched}
+        changed = []
+        for rel in touched:
+            try:
+                current = _digest((self.root / rel).read_bytes())
+            except OSError:
+                current = _ABSENT
+            if current != baseline[rel]:
+                changed.append(rel)
+                with self._lock:
+                    self._baseline[rel] = current  # later re-queues compare to this version
+        return sorted(changed)
+
+    def affected_shards(self, changed_files: List[str]) -> Set[int]:
+        """Shards owning a file that imports one of the changed files."""
+        affected = set()
+        for rel in changed_files:
+            for importer in self.importers.get(rel, ()):
+                if importer in self.owner:
+                    affected.add(self.owner[importer])
+        return affected
+
+    # ---- execution ---------------------------------------------------------
+
+    def run(self) -> Dict[int, object]:
+        """
+        Process every shard; returns the latest result per shard id.
+        """
+        remaining = {sid: set(ds) for sid, ds in self.dependencies.items()}
+        ready = [sid for sid in sorted(self.shards) if not remaining[sid]]
+        started: Set[int] = set()
+        finished: Set[int] = set()
+        dirty: Set[int] = set()  # running shards whose dependencies changed meanwhile
+        results: Dict[int, object] = {}
+        running: Dict[Future, int] = {}
+
+        WriteEvents.subscribe(self._on_write, with_old_content=True)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scheduler") as pool:
+                while ready or running:
+                    for sid in ready:
+                        started.add(sid)
+                        finished.discard(sid)
+                        self.runs[sid] = self.runs.get(sid, 0) + 1
+                        self.order.append(sid)
+                        running[pool.submit(self.run_shard, self.shards[sid])] = sid
+                    ready = []
+
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        sid = running.pop(future)
+                        results[sid] = future.result()
+                        finished.add(sid)
+
+                        for dependent in sorted(self.dependents[sid]):
+                            remaining[dependent].discard(sid)
+                            if not remaining[dependent] and dependent not in started:
+                                ready.append(dependent)
+
+                        for affected in sorted(self.affected_shards(self._changed_files(sid)) - {sid}):
+                            if affected in finished and affected not in ready:
+                                if self.runs[affected] <= self.max_requeues:
+                                    ready.append(affected)
+                            elif affected in running.values():
+                                dirty.add(affected)
+
+                        if sid in dirty:
+                            dirty.discard(sid)
+                            if self.runs[sid] <= self.max_requeues:
+                                ready.append(sid)
+        finally:
+            WriteEvents.unsubscribe(self._on_write)
+        return results
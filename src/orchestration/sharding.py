@@ -0,0 +1,82 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from .import_graph import ImportGraph
+
+
+@dataclass(slots=True)
+class Shard:
+    """A group of files processed together by one Auditor -> Fixer -> Judge loop."""
+
+    id: int
+    files: List[str] = field(default_factory=list)
+    size: int = 0  # total bytes, used to balance the work
+
+
+def connected_components(graph: ImportGraph) -> List[List[str]]:
+    """Groups of files linked by imports (in either direction)."""
+    neighbours: Dict[str, Set[str]] = {f: set() for f in graph}
+    for src, targets in graph.items():
+        for dst in targets:
+            if dst in neighbours:
+                neighbours[src].add(dst)
+                neighbours[dst].add(src)
+
+    seen: Set[str] = set()
+    components = []
+    for start in sorted(neighbours):
+        if start in seen:
+            continue
+        # BFS order keeps files that import each other next to each other
+        order, queue = [], deque([start])
+        seen.add(start)
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for nxt in sorted(neighbours[node] - seen):
+                seen.add(nxt)
+                queue.append(nxt)
+        components.append(order)
+    return components
+
+
+def shard_files(graph: ImportGraph, max_files: int = 8, sizes: Optional[Dict[str, int]] = None) -> List[Shard]:
+    """
+    Split a project into shards that can be fixed concurrently.
+
+    Files that import each other stay in the same shard whenever the component
+    fits in `max_files`; larger components are cut into consecutive BFS chunks.
+    Small components are packed together so each shard is worth one LLM call.
+
+    Args:
+        graph: import graph of the project
+        max_files: maximum number of files per shard
+        sizes: optional file sizes in bytes (for balancing)
+
+    Returns:
+        shards, largest first (so the longest jobs start early)
+    """
+    sizes = sizes or {}
+    max_files = max(1, max_files)
+    pieces: List[List[str]] = []
+    for component in connected_components(graph):
+        for i in range(0, len(component), max_files):
+            pieces.append(component[i:i + max_files])
+
+    # first-fit decreasing on file count
+    pieces.sort(key=lambda p: (-len(p), p[0]))
+    bins: List[List[str]] = []
+    for piece in pieces:
+        for b in bins:
+            if len(b) + len(piece) <= max_files:
+                b.extend(piece)
+                break
+        else:
+            bins.append(list(piece))
+
+    shards = [Shard(id=0, files=b, size=sum(sizes.get(f, 0) for f in b)) for b in bins]
+    shards.sort(key=lambda s: (-s.size, -len(s.files), s.files[0]))
+    for i, shard in enumerate(shards):
+        shard.id = i
+    return shards
@@ -0,0 +1,218 @@
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from ..agents.fixer import FixerAgent, FixerAnswerError
+from ..agents.judge import JudgeAgent, Verdict
+from ..tools.analysis.PylintParser import PylintMessage
+from ..tools.file_operations.DirectoryScanner import iter_directory
+from ..tools.file_operations.PatchApplier import PatchError
+from ..tools.file_operations.WriteTool import WriteTool
+from ..tools.file_operations.WriteTransaction import BACKUP_DIR_NAME, snapshot_file
+
+OVERLAY_DIR_NAME = "overlays"
+
+
+class Overlay:
+    """
+    Private copy of the project where one fix candidate is written and judged.
+
+    Every file is hardlinked (reflinked or copied when the filesystem cannot
+    link), so creating an overlay costs one directory entry per file. The
+    candidate files are written with WriteTool's atomic replace, which swaps
+    in a new inode: the project files behind the links are never modified.
+    """
+
+    def __init__(self, root: Union[str, Path], directory: Union[str, Path]):
+        """
+        Args:
+            root: project root to mirror
+            directory: where the overlay is built (must not exist yet)
+        """
+        self.source = Path(root).resolve()
+        self.root = Path(directory)
+        self._writer = WriteTool(create_backup=False)
+        self.root.mkdir(parents=True)
+        for entry in iter_directory(self.source, include_dirs=False, use_gitignore=False):
+            target = self.root / entry.path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            snapshot_file(self.source / entry.path, target)
+
+    @classmethod
+    def create(cls, root: Union[str, Path]) -> "Overlay":
+        """Overlay under `<root>/_sandbox_backup/overlays/` (same filesystem, so links work)."""
+        root = Path(root).resolve()
+        return cls(root, root / BACKUP_DIR_NAME / OVERLAY_DIR_NAME / uuid.uuid4().hex[:12])
+
+    def write(self, rel_path: str, content: str) -> str:
+        """Write one candidate file; returns an error message or ""."""
+        path = self.root / rel_path
+        error = self._writer.validate_content(path, content)
+        if error:
+            return error
+        ok, message = self._writer.write_atomic(path, content)
+        return "" if ok else f"Error: {message}"
+
+    def remove(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def judge_in_overlay(
+    root: Union[str, Path],
+    judge: JudgeAgent,
+    proposed: Dict[str, str],
+    files: List[str],
+    baseline: float,
+    tests: Optional[List[str]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Verdict:
+    """
+    Judge uncommitted files in a fresh overlay of root.
+
+    The tree itself only ever holds accepted fixes, so the verdict never
+    depends on another shard's change still waiting for its own judgement.
+
+    Args:
+        root: project root
+        judge: Judge of the project (its runner and test timeout are reused)
+        proposed: relative path -> new content
+        files: files judged (the shard)
+        baseline: pylint score the fix must keep
+        tests: test files to run (default: the test files among `files`)
+        cancel: optional event stopping the evaluation
+    """
+    overlay = Overlay.create(root)
+    try:
+        for path, content in proposed.items():
+            error = overlay.write(path, content)
+            if error:
+                return Verdict(passed=False, score=0.0, syntax_errors=[f"{path}: {error}"])
+        return JudgeAgent(overlay.root, judge.runner, judge.test_timeout).evaluate(files, baseline, cancel, tests)
+    finally:
+        overlay.remove()
+
+
+@dataclass(slots=True)
+class Candidate:
+    index: int
+    files: Dict[str, str] = field(default_factory=dict)
+    verdict: Optional[Verdict] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+@dataclass(slots=True)
+class SpeculationResult:
+    winner: Optional[Candidate]
+    candidates: List[Candidate] = field(default_factory=list)
+
+    @property
+    def best(self) -> Optional[Candidate]:
+        """Winner, or else the judged candidate with the highest score (for feedback)."""
+        if self.winner is not None:
+            return self.winner
+        judged = [c for c in self.candidates if c.verdict is not None and not c.verdict.cancelled]
+        return max(judged, key=lambda c: c.verdict.score, default=None)
+
+
+class SpeculativeFixer:
+    """
+    Asks the Fixer for K candidates at once and judges each in its own overlay.
+
+    The first candidate whose verdict passes wins; the others are cancelled
+    (their pytest runs are killed, pending checks are skipped). An LLM call
+    already in flight cannot be aborted: `run()` waits for it and discards
+    the answer, so no candidate thread outlives the call (nor keeps using
+    quota or logging behind the caller's back). The caller then applies the
+    winner to the real tree, which has not been touched by any candidate.
+    """
+
+    def __init__(self, root: Union[str, Path], fixer: FixerAgent, judge: JudgeAgent, candidates: int = 3):
+        """
+        Args:
+            root: project root
+            fixer: agent generating the candidates
+            judge: Judge of the project (its runner and test timeout are reused)
+            candidates: number of candidates generated concurrently
+        """
+        self.root = Path(root).resolve()
+        self.fixer = fixer
+        self.judge = judge
+        self.candidates = max(1, candidates)
+
+    def _attempt(self, index: int, sources: Dict[str, str], plan: str, feedback: Optional[str],
+                 shard_id: Optional[int], messages: Optional[List[PylintMessage]], baseline: float,
+                 tests: Optional[List[str]], cancel: threading.Event) -> Candidate:
+        candidate = Candidate(index)
+        if cancel.is_set():
+            return candidate
+        start = time.perf_counter()
+        try:
+            candidate.files = self.fixer.fix(
+                sources, plan, feedback, shard_id=shard_id, messages=messages,
+                candidate=index, candidates=self.candidates,
+            )
+        except PatchError as e:
+            candidate.error = f"Patch conflict: {e}"
+        except FixerAnswerError as e:
+            candidate.error = f"Invalid answer: {e}"
+        except Exception as e:
+            # one failed LLM call must not sink the other candidates
+            candidate.error = f"{type(e).__name__}: {e}"
+        if candidate.error or not candidate.files or cancel.is_set():
+            candidate.elapsed = time.perf_counter() - start
+            return candidate
+
+        candidate.verdict = judge_in_overlay(self.root, self.judge, candidate.files, sorted(sources),
+                                             baseline, tests, cancel)
+        candidate.elapsed = time.perf_counter() - start
+        return candidate
+
+    def run(
+        self,
+        sources: Dict[str, str],
+        plan: str,
+        baseline: float,
+        feedback: Optional[str] = None,
+        shard_id: Optional[int] = None,
+        messages: Optional[List[PylintMessage]] = None,
+        tests: Optional[List[str]] = None,
+    ) -> SpeculationResult:
+        """
+        Args:
+            sources: accepted content of the shard files
+            plan: the Auditor's plan
+            baseline: pylint score the candidates must keep
+            feedback: the Judge's objections to the previous attempt
+            shard_id: shard id recorded in the log
+            messages: pylint findings (for context packing)
+            tests: test files run by the Judge (default: the test files among the sources)
+        """
+        cancel = threading.Event()
+        result = SpeculationResult(winner=None)
+        pool = ThreadPoolExecutor(max_workers=self.candidates, thread_name_prefix="candidate")
+        futures = []
+        try:
+            futures = [
+                pool.submit(self._attempt, i + 1, sources, plan, feedback, shard_id, messages, baseline, tests, cancel)
+                for i in range(self.candidates)
+            ]
+            for future in as_completed(futures):
+                candidate = future.result()
+                if candidate.verdict is not None and candidate.verdict.passed:
+                    result.winner = candidate
+                    break
+        finally:
+            cancel.set()
+            # join the losers: they stop at their next cancel check
+            pool.shutdown(wait=True, cancel_futures=True)
+        result.candidates = sorted(
+            (f.result() for f in futures if not f.cancelled() and f.exception() is None),
+            key=lambda c: c.index,
+        )
+        return result
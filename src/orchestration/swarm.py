@@ -0,0 +1,209 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Union
+
+from .import_graph import ImportGraph, build_import_graph, tests_for
+from .scheduler import DependencyScheduler
+from .sharding import Shard, shard_files
+from .workflow import build_shard_graph
+from ..agents.auditor import AuditorAgent
+from ..agents.fixer import FixerAgent
+from ..agents.judge import JudgeAgent
+from ..agents.llm import DEFAULT_MODEL
+from ..middleware.context_packer import ContextPacker
+from ..tools.analysis.AnalysisCache import AnalysisCache
+from ..tools.analysis.PylintRunner import PylintRunner, discover_python_files
+
+
+@dataclass(slots=True)
+class ShardResult:
+    shard_id: int
+    files: List[str]
+    passed: bool = False
+    iterations: int = 0
+    score_before: Optional[float] = None
+    score_after: Optional[float] = None
+    changed_files: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    runs: int = 1  # > 1 when re-queued after a dependency changed
+
+
+@dataclass(slots=True)
+class SwarmReport:
+    """Merged outcome of all shards."""
+
+    target_dir: str
+    results: List[ShardResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def files(self) -> int:
+        return sum(len(r.files) for r in self.results)
+
+    @property
+    def passed(self) -> int:
+        return sum(1 for r in self.results if r.passed)
+
+    @property
+    def changed_files(self) -> List[str]:
+        return sorted(f for r in self.results for f in r.changed_files)
+
+    @property
+    def errors(self) -> List[ShardResult]:
+        return [r for r in self.results if r.error]
+
+    def to_dict(self) -> dict:
+        return {
+            "target_dir": self.target_dir,
+            "elapsed": self.elapsed,
+            "files": self.files,
+            "shards": len(self.results),
+            "passed": self.passed,
+            "changed_files": self.changed_files,
+            "results": [asdict(r) for r in self.results],
+        }
+
+
+class Swarm:
+    """
+    Runs one Auditor -> Fixer -> Judge graph per shard, `workers` shards at a time.
+
+    Shards never share files, so their loops are independent: LLM round trips
+    overlap, and each shard's fixes are judged in an overlay and committed on
+    their own. The Judge runs every test that imports a shard file, wherever
+    the test lives.
+    With `schedule` (the default) shards run in import order through a
+    DependencyScheduler, and a shard is re-checked only when a module it
+    imports was changed after it finished.
+    """
+
+    def __init__(
+        self,
+        target_dir: Union[str, Path],
+        llm: Any,
+        model_name: str = DEFAULT_MODEL,
+        workers: int = 4,
+        max_iterations: int = 3,
+        max_shard_files: int = 8,
+        runner: Optional[PylintRunner] = None,
+        on_result: Optional[Callable[[ShardResult], None]] = None,
+        schedule: bool = True,
+        max_requeues: int = 1,
+        context_budget: Optional[int] = 6000,
+        candidates: int = 1,
+    ):
+        """
+        Args:
+            target_dir: sandbox root holding the project to refactor
+            llm: chat model (or callable) shared by the agents
+            model_name: model name recorded in the experiment log
+            workers: shards processed concurrently
+            max_iterations: Fixer attempts per shard
+            max_shard_files: maximum files per shard
+            runner: PylintRunner used by the Judge (default: cached, in-process)
+            on_result: callback receiving each ShardResult as soon as it is done
+            schedule: order shards by imports and re-queue dependents of changed files
+            max_requeues: extra runs allowed per shard when a dependency changed
+            context_budget: token budget of the code shown to the Auditor and the
+                Fixer (packed around the pylint findings); None sends whole files
+            candidates: fix candidates generated and judged concurrently per
+                iteration (1: a single attempt)
+        """
+        self.root = Path(target_dir).resolve()
+        self.workers = max(1, workers)
+        self.max_iterations = max(1, max_iterations)
+        self.max_shard_files = max_shard_files
+        self.on_result = on_result
+        self.schedule = schedule
+        self.max_requeues = max_requeues
+        self.import_graph: Optional[ImportGraph] = None
+        runner = runner or PylintRunner(max_workers=1, cache=AnalysisCache.for_sandbox("pylint", root=self.root))
+        self.judge = JudgeAgent(self.root, runner)
+        packer = ContextPacker(context_budget) if context_budget else None
+        self.graph = build_shard_graph(
+            self.root, AuditorAgent(llm, model_name, packer), FixerAgent(llm, model_name, packer), self.judge,
+            candidates=candidates, tests_for=self.tests_for,
+        )
+
+    def plan(self) -> List[Shard]:
+        files = [p.relative_to(self.root).as_posix() for p in discover_python_files(self.root)]
+        sizes = {f: (self.root / f).stat().st_size for f in files}
+        self.import_graph = build_import_graph(self.root, files)
+        return shard_files(self.import_graph, self.max_shard_files, sizes)
+
+    def tests_for(self, files: List[str]) -> List[str]:
+        """Tests the Judge runs for a shard: every test file importing one of its files."""
+        if self.import_graph is None or not set(files) <= set(self.import_graph):
+            self.plan()
+        return tests_for(self.import_graph, files)
+
+    def run_shard(self, shard: Shard) -> ShardResult:
+        result = ShardResult(shard_id=shard.id, files=list(shard.files))
+        start = time.perf_counter()
+        try:
+            state = self.graph.invoke(
+                {"shard": shard, "max_iterations": self.max_iterations, "changed": []},
+                {"recursion_limit": 2 * self.max_iterations + 10},
+            )
+            verdict = state.get("verdict")
+            result.passed = bool(verdict and verdict.passed)
+            result.iterations = state.get("iteration", 0)
+            result.score_before = state.get("score_before")
+            result.score_after = verdict.score if verdict and verdict.passed else result.score_before
+            result.changed_files = list(state.get("changed") or [])
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def run(self, shards: Optional[List[Shard]] = None) -> SwarmReport:
+        start = time.perf_counter()
+        shards = self.plan() if shards is None else shards
+        report = SwarmReport(target_dir=str(self.root))
+        if self.schedule:
+            report.results = self._run_scheduled(shards)
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shard") as pool:
+                futures = [pool.submit(self.run_shard, shard) for shard in shards]
+                for future in as_completed(futures):
+                    result = future.result()
+                    report.results.append(result)
+                    if self.on_result is not None:
+                        self.on_result(result)
+        report.results.sort(key=lambda r: r.shard_id)
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def _run_scheduled(self, shards: List[Shard]) -> List[ShardResult]:
+        files = [f for shard in shards for f in shard.files]
+        graph = self.import_graph
+        if graph is None or not set(files) <= set(graph):
+            graph = build_import_graph(self.root, files)
+        previous: dict = {}
+
+        def run_one(shard: Shard) -> ShardResult:
+            result = self.run_shard(shard)
+            earlier = previous.get(shard.id)
+            if earlier is not None:
+                # a re-check keeps what the earlier runs already changed
+                result.runs = earlier.runs + 1
+                result.changed_files = sorted(set(earlier.changed_files) | set(result.changed_files))
+                if earlier.score_before is not None:
+                    result.score_before = earlier.score_before
+            previous[shard.id] = result
+            if self.on_result is not None:
+                self.on_result(result)
+            return result
+
+        scheduler = DependencyScheduler(
+            graph, shards, run_one, self.root, workers=self.workers, max_requeues=self.max_requeues,
+        )
+        return list(scheduler.run().values())
+
+
+def run_swarm(target_dir: Union[str, Path], llm: Any, **options) -> SwarmReport:
+    """Shard `target_dir` by imports and refactor the shards in dependency order (see Swarm)."""
+    return Swarm(target_dir, llm, **options).run()
@@ -0,0 +1,162 @@
+import operator
+from pathlib import Path
+from typing import Annotated, Callable, Dict, List, Optional, TypedDict
+
+from langgraph.graph import END, StateGraph
+
+from .sharding import Shard
+from .speculation import SpeculativeFixer, judge_in_overlay
+from ..agents.auditor import AuditorAgent
+from ..agents.fixer import FixerAgent, FixerAnswerError
+from ..agents.judge import JudgeAgent, Verdict
+from ..tools.analysis.PylintParser import PylintMessage
+from ..tools.file_operations.PatchApplier import PatchError
+from ..tools.file_operations.WriteTransaction import TransactionError, WriteTransaction
+
+
+class ShardState(TypedDict, total=False):
+    """State of one shard's Auditor -> Fixer -> Judge loop."""
+
+    shard: Shard
+    sources: Dict[str, str]  # accepted content of the shard files
+    score_before: float
+    plan: str
+    findings: List[PylintMessage]  # pylint messages before the first fix
+    iteration: int
+    max_iterations: int
+    proposed: Dict[str, str]  # Fixer output awaiting judgement (never on the tree before it passes)
+    fix_error: Optional[str]
+    speculative: Optional[Verdict]  # verdict already given in a candidate overlay
+    feedback: Optional[str]
+    verdict: Optional[Verdict]
+    changed: Annotated[List[str], operator.add]  # files changed by accepted fixes
+
+
+def read_sources(root: Path, files: List[str]) -> Dict[str, str]:
+    sources = {}
+    for rel in files:
+        try:
+            sources[rel] = (root / rel).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+    return sources
+
+
+def build_shard_graph(
+    root: Path,
+    auditor: AuditorAgent,
+    fixer: FixerAgent,
+    judge: JudgeAgent,
+    candidates: int = 1,
+    tests_for: Optional[Callable[[List[str]], List[str]]] = None,
+):
+    """
+    Compile the per-shard LangGraph workflow.
+
+    audit -> fix -> judge, and judge -> fix again while the verdict fails and
+    iterations remain. Each fix is judged in an overlay of the tree and only
+    committed (as one WriteTransaction) once it passed, so the tree only ever
+    holds accepted fixes and no shard is judged against another shard's
+    unjudged change.
+
+    With `candidates` > 1 the fix step generates that many candidates at once
+    and judges them in overlays (see SpeculativeFixer): only the first passing
+    candidate reaches the tree, and the judge step reuses its verdict.
+
+    `tests_for(shard files)` chooses the tests the Judge runs (e.g. every test
+    importing the shard, see import_graph.tests_for); by default only the test
+    files inside the shard run.
+    """
+    speculator = SpeculativeFixer(root, fixer, judge, candidates) if candidates > 1 else None
+
+    def shard_tests(state: ShardState) -> Optional[List[str]]:
+        return tests_for(state["shard"].files) if tests_for is not None else None
+
+    def apply(proposed: Dict[str, str]) -> str:
+        """Commit an accepted fix; returns an error message or ""."""
+        txn = WriteTransaction(root, keep_backup=False)
+        try:
+            for path, content in proposed.items():
+                txn.write(path, content)
+            txn.commit()
+        except TransactionError as e:
+            txn.rollback()
+            return str(e)
+        return ""
+
+    def speculate(state: ShardState, iteration: int) -> dict:
+        result = speculator.run(
+            state["sources"], state["plan"], state["score_before"], state.get("feedback"),
+            shard_id=state["shard"].id, messages=state.get("findings"), tests=shard_tests(state),
+        )
+        # the winner, or else the best candidate whose verdict drives the next attempt
+        best = result.best
+        if best is not None:
+            return {"iteration": iteration, "proposed": best.files, "fix_error": None, "speculative": best.verdict}
+        # nothing judged: a pass only if every candidate explicitly answered "no change"
+        errors = [c.error for c in result.candidates if c.error]
+        return {"iteration": iteration, "proposed": {}, "fix_error": errors[0] if errors else None,
+                "speculative": None}
+
+    def audit(state: ShardState) -> dict:
+        files = state["shard"].files
+        sources = read_sources(root, files)
+        report = judge.lint(list(sources))
+        result = auditor.audit(sources, report.messages, shard_id=state["shard"].id)
+        return {"sources": sources, "score_before": report.score(), "plan": result.plan,
+                "findings": report.messages, "iteration": 0}
+
+    def fix(state: ShardState) -> dict:
+        iteration = state.get("iteration", 0) + 1
+        if speculator is not None:
+            return speculate(state, iteration)
+        try:
+            proposed = fixer.fix(state["sources"], state["plan"], state.get("feedback"),
+                                 shard_id=state["shard"].id, messages=state.get("findings"))
+        except PatchError as e:
+            return {"iteration": iteration, "proposed": {}, "fix_error": f"Patch conflict: {e}", "speculative": None}
+        except FixerAnswerError as e:
+            return {"iteration": iteration, "proposed": {}, "fix_error": f"Invalid answer: {e}", "speculative": None}
+        # an empty answer means the model explicitly found nothing to change
+        return {"iteration": iteration, "proposed": proposed, "fix_error": None, "speculative": None}
+
+    def judge_node(state: ShardState) -> dict:
+        if state.get("fix_error"):
+            verdict = Verdict(passed=False, score=state["score_before"], syntax_errors=[state["fix_error"]])
+            return {"verdict": verdict, "feedback": verdict.feedback}
+        proposed = state.get("proposed") or {}
+        verdict = state.get("speculative")
+        if not proposed and verdict is None:
+            # nothing proposed: the shard is left as it is
+            verdict = Verdict(passed=True, score=state["score_before"])
+            return {"verdict": verdict, "feedback": None}
+
+        if verdict is None:
+            verdict = judge_in_overlay(root, judge, proposed, state["shard"].files, state["score_before"],
+                                       shard_tests(state))
+        if not verdict.passed:
+            return {"verdict": verdict, "feedback": verdict.feedback}
+        error = apply(proposed)
+        if error:
+            verdict = Verdict(passed=False, score=state["score_before"], syntax_errors=[error])
+            return {"verdict": verdict, "feedback": verdict.feedback}
+        sources = dict(state["sources"], **proposed)
+        return {"verdict": verdict, "sources": sources, "feedback": None, "changed": sorted(proposed)}
+
+    def route(state: ShardState) -> str:
+        verdict = state.get("verdict")
+        if verdict is not None and verdict.passed:
+            return "done"
+        if state.get("iteration", 0) >= state.get("max_iterations", 1):
+            return "done"
+        return "retry"
+
+    graph = StateGraph(ShardState)
+    graph.add_node("auditor", audit)
+    graph.add_node("fixer", fix)
+    graph.add_node("judge", judge_node)
+    graph.set_entry_point("auditor")
+    graph.add_edge("auditor", "fixer")
+    graph.add_edge("fixer", "judge")
+    graph.add_conditional_edges("judge", route, {"retry": "fixer", "done": END})
+    return graph.compile()
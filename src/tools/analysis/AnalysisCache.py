@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from ..file_operations import SandboxSetup
+
+# Sub-directory of the sandbox logs/ folder holding all analysis caches
+CACHE_DIRNAME = "analysis_cache"
+
+
+def content_digest(data: Union[bytes, str]) -> str:
+    """SHA-256 hex digest of file content (str is hashed as UTF-8)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def config_fingerprint(*parts: Union[str, Iterable[str]], root: Union[str, Path, None] = None) -> str:
+    """
+    Fingerprint of everything besides file content that influences a result.
+
+    Args:
+        parts: tool version, command line arguments, ...
+        root: optional project root; its lint configuration files are hashed too
+
+    Returns:
+        short hex digest
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        values = [part] if isinstance(part, str) else list(part)
+        for value in values:
+            h.update(value.encode("utf-8"))
+            h.update(b"\0")
+    if root is not None:
+        for name in (".pylintrc", "pylintrc", "pyproject.toml", "setup.cfg", "tox.ini"):
+            cfg = Path(root) / name
+            if cfg.is_file():
+                h.update(name.encode("utf-8"))
+                h.update(cfg.read_bytes())
+    return h.hexdigest()[:16]
+
+
+class AnalysisCache:
+    """
+    Persistent, size-bounded LRU cache of analysis results.
+
+    Entries are small JSON files named after their key (content hash + tool
+    fingerprint, plus the file path for path-dependent results), so an unchanged file is never re-analyzed across refactoring
+    iterations, and a modified file simply misses. Recency is kept in memory and
+    mirrored on disk through the entry mtime, so LRU order survives restarts.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_entries: int = 20000,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        """
+        Args:
+            cache_dir: directory holding the cache entries (created if missing)
+            max_entries: maximum number of entries kept
+            max_bytes: maximum total size of the entries on disk
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._load()
+
+    @classmethod
+    def for_sandbox(cls, namespace: str, root: Union[str, Path, None] = None, **kwargs) -> "AnalysisCache":
+        """Create the cache stored under `<sandbox>/logs/analysis_cache/<namespace>`."""
+        root = root or SandboxSetup.SANDBOX_ROOT
+        if root is None:
+            raise RuntimeError("Sandbox not initialized")
+        return cls(Path(root) / "logs" / CACHE_DIRNAME / namespace, **kwargs)
+
+    @staticmethod
+    def make_key(digest: str, fingerprint: str, rel_path: Optional[str] = None) -> str:
+        """
+        Cache key of one result.
+
+        Args:
+            digest: content digest of the analyzed file
+            fingerprint: tool/configuration fingerprint
+            rel_path: path relative to the analyzed root, for results that depend on
+                where the file lives (module name, import resolution, ...); leave it
+                out only when the cached value is rebound to its path on read
+        """
+        if rel_path is None:
+            return f"{digest}-{fingerprint}"
+        location = hashlib.sha256(rel_path.encode("utf-8")).hexdigest()[:16]
+        return f"{digest}-{fingerprint}-{location}"
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load(self) -> None:
+        found = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                st = entry.stat()
+                found.append((st.st_mtime_ns, entry.name[:-5], st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached value, or None on a miss."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self._drop(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        """Store a JSON-serializable value, evicting least recently used entries if needed."""
+        data = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        fd, tmp_name = tempfile.mkstemp(dir=str(self.cache_dir), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            key, _ = next(iter(self._entries.items()))
+            self._drop(key)
+
+    def _drop(self, key: str) -> None:
+        self._total_bytes -= self._entries.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._total_bytes, "hits": self.hits, "misses": self.misses}
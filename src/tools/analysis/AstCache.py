@@ -0,0 +1,112 @@
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Union
+
+# Note: this module must stay free of package-level imports, since
+# file_operations.WriteTool imports it while the packages are initializing.
+
+
+class AstCache:
+    """
+    Process-wide LRU cache of parsed modules, keyed by the SHA-256 of the source.
+
+    WriteTool validates syntax through this cache, so the analysis tools that run
+    right after a write (e.g. ComplexityAnalyzer) reuse the same tree instead of
+    parsing the file again. Syntax errors are cached too, so re-submitting the
+    same broken content costs a hash only.
+
+    Memory is bounded by entry count and by the total size of the cached sources
+    (a parsed tree is roughly proportional to its source).
+
+    Cached trees are shared: callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = 512, max_source_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            max_entries: maximum number of cached trees
+            max_source_bytes: maximum total length of the cached sources
+        """
+        self.max_entries = max_entries
+        self.max_source_bytes = max_source_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # digest -> (tree or SyntaxError, source length)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total = 0
+
+    def parse(self, source: str, filename: str = "<unknown>", digest: Optional[str] = None) -> ast.Module:
+        """
+        Return the parsed module for `source`, parsing it only on a cache miss.
+
+        Args:
+            source: Python source code
+            filename: file name used in syntax error messages
+            digest: precomputed SHA-256 hex digest of the UTF-8 source, if the caller has it
+
+        Raises:
+            SyntaxError: if the source does not parse
+        """
+        digest = digest or hashlib.sha256(source.encode("utf-8", "surrogatepass")).hexdigest()
+        with self._lock:
+            cached = self._entries.get(digest)
+            if cached is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+        if cached is not None:
+            return self._unwrap(cached[0])
+
+        try:
+            result: Union[ast.Module, SyntaxError] = ast.parse(source, filename=filename)
+        except SyntaxError as e:
+            result = e
+        with self._lock:
+            self.misses += 1
+            if digest not in self._entries:
+                self._entries[digest] = (result, len(source))
+                self._total += len(source)
+                self._evict()
+        return self._unwrap(result)
+
+    def get(self, digest: str) -> Optional[ast.Module]:
+        """Return a cached tree by content digest, or None (syntax errors included)."""
+        with self._lock:
+            cached = self._entries.get(digest)
+            if cached is None or isinstance(cached[0], SyntaxError):
+                return None
+            self._entries.move_to_end(digest)
+            return cached[0]
+
+    @staticmethod
+    def _unwrap(result):
+        if isinstance(result, SyntaxError):
+            raise SyntaxError(*result.args)
+        return result
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._total > self.max_source_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "source_bytes": self._total, "hits": self.hits, "misses": self.misses}
+
+
+# Shared instance used by WriteTool and the analysis tools
+AST_CACHE = AstCache()
+
+
+def parse_cached(source: str, filename: str = "<unknown>") -> ast.Module:
+    """Parse `source` through the shared AST_CACHE (see AstCache.parse)."""
+    return AST_CACHE.parse(source, filename)
@@ -0,0 +1,88 @@
+import math
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
+
+
+@dataclass(slots=True)
+class DefinitionMetrics:
+    """Metrics of one function, method or class."""
+
+    name: str  # qualified name, e.g. "Parser.parse"
+    kind: str  # "function" or "class"
+    lineno: int
+    end_lineno: int
+    complexity: int
+    max_nesting: int
+
+    @property
+    def loc(self) -> int:
+        return self.end_lineno - self.lineno + 1
+
+
+@dataclass(slots=True)
+class FileMetrics:
+    """Metrics of one Python file, computed from a single AST walk."""
+
+    path: str
+    loc: int = 0
+    sloc: int = 0
+    comments: int = 0
+    blank: int = 0
+    functions: int = 0
+    classes: int = 0
+    complexity: int = 0  # module-level complexity plus all function complexities
+    max_complexity: int = 0
+    max_nesting: int = 0
+    halstead_volume: float = 0.0
+    maintainability_index: float = 100.0
+    definitions: List[DefinitionMetrics] = field(default_factory=list)
+    error: Optional[str] = None  # set when the file could not be parsed
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FileMetrics":
+        data = dict(data)
+        data["definitions"] = [DefinitionMetrics(**d) for d in data.get("definitions", [])]
+        return cls(**data)
+
+
+def count_lines(source: str) -> Tuple[int, int, int, int]:
+    """
+    Count physical lines of a source text.
+
+    Returns:
+        (loc, sloc, comment lines, blank lines); docstrings count as source lines
+    """
+    loc = sloc = comments = blank = 0
+    for line in source.splitlines():
+        loc += 1
+        stripped = line.strip()
+        if not stripped:
+            blank += 1
+        elif stripped.startswith("#"):
+            comments += 1
+        else:
+            sloc += 1
+    return loc, sloc, comments, blank
+
+
+def halstead_volume(n_operators: int, n_operands: int, total_operators: int, total_operands: int) -> float:
+    """Halstead volume V = N * log2(n) from distinct (n) and total (N) operators/operands."""
+    vocabulary = n_operators + n_operands
+    length = total_operators + total_operands
+    if vocabulary <= 1:
+        return 0.0
+    return length * math.log2(vocabulary)
+
+
+def maintainability_index(volume: float, complexity: int, sloc: int) -> float:
+    """
+    Maintainability index on a 0-100 scale (Visual Studio variant):
+    MI = max(0, (171 - 5.2 ln V - 0.23 CC - 16.2 ln SLOC) * 100 / 171)
+    """
+    if sloc <= 0:
+        return 100.0
+    mi = 171 - 5.2 * math.log(max(volume, 1.0)) - 0.23 * complexity - 16.2 * math.log(sloc)
+    return round(max(0.0, min(100.0, mi * 100 / 171)), 2)
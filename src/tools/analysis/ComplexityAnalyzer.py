@@ -0,0 +1,291 @@
+import ast
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from .AnalysisCache import AnalysisCache, config_fingerprint, content_digest
+from .AstCache import parse_cached
+from .CodeMetrics import (
+    DefinitionMetrics,
+    FileMetrics,
+    count_lines,
+    halstead_volume,
+    maintainability_index,
+)
+from .PylintRunner import discover_python_files
+from ..file_operations import SandboxSetup
+
+# Bump when the metric definitions change, to invalidate cached results
+METRICS_VERSION = "1"
+
+_DECISION_NODES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler, ast.match_case)
+_NESTING_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try, ast.Match)
+if hasattr(ast, "TryStar"):
+    _NESTING_NODES += (ast.TryStar,)
+_OPERATOR_NODES = (ast.operator, ast.boolop, ast.cmpop, ast.unaryop)
+
+
+class _Scope:
+    __slots__ = ("name", "kind", "node", "complexity", "depth", "max_nesting")
+
+    def __init__(self, name: str, kind: str, node: Optional[ast.AST]):
+        self.name = name
+        self.kind = kind
+        self.node = node
+        self.complexity = 1 if kind != "class" else 0
+        self.depth = 0
+        self.max_nesting = 0
+
+
+class _MetricsVisitor:
+    """
+    Collect every metric in one recursive walk of the tree: cyclomatic complexity
+    and nesting depth per definition, definition counts and Halstead operators/operands.
+    """
+
+    def __init__(self):
+        self.definitions: List[DefinitionMetrics] = []
+        self.functions = 0
+        self.classes = 0
+        self.function_complexity = 0
+        self.max_complexity = 0
+        self.max_nesting = 0
+        self.operators: set = set()
+        self.operands: set = set()
+        self.total_operators = 0
+        self.total_operands = 0
+        self._scopes: List[_Scope] = [_Scope("<module>", "module", None)]
+        self._elifs: set = set()
+
+    @property
+    def module_complexity(self) -> int:
+        return self._scopes[0].complexity
+
+    @property
+    def module_nesting(self) -> int:
+        return self._scopes[0].max_nesting
+
+    def visit(self, node: ast.AST) -> None:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            self._visit_definition(node)
+            return
+
+        scope = self._scopes[-1]
+        self._count(node, scope)
+
+        nests = isinstance(node, _NESTING_NODES) and id(node) not in self._elifs
+        if nests:
+            scope.depth += 1
+            scope.max_nesting = max(scope.max_nesting, scope.depth)
+        if isinstance(node, ast.If) and len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If):
+            # "elif" is a nested If in the AST but not an extra nesting level
+            self._elifs.add(id(node.orelse[0]))
+
+        for child in ast.iter_child_nodes(node):
+            self.visit(child)
+
+        if nests:
+            scope.depth -= 1
+
+    def _count(self, node: ast.AST, scope: _Scope) -> None:
+        if isinstance(node, _DECISION_NODES):
+            scope.complexity += 1
+        elif isinstance(node, ast.comprehension):
+            scope.complexity += 1 + len(node.ifs)
+        elif isinstance(node, ast.BoolOp):
+            scope.complexity += len(node.values) - 1
+
+        if isinstance(node, _OPERATOR_NODES):
+            self.operators.add(type(node).__name__)
+            self.total_operators += 1
+        elif isinstance(node, ast.Name):
+            self.operands.add(node.id)
+            self.total_operands += 1
+        elif isinstance(node, ast.Constant):
+            self.operands.add(repr(node.value))
+            self.total_operands += 1
+
+    def _visit_definition(self, node) -> None:
+        is_class = isinstance(node, ast.ClassDef)
+        parent = self._scopes[-1]
+        qualname = node.name if parent.kind == "module" else f"{parent.name}.{node.name}"
+        scope = _Scope(qualname, "class" if is_class else "function", node)
+        self._scopes.append(scope)
+        for child in ast.iter_child_nodes(node):
+            self.visit(child)
+        self._scopes.pop()
+
+        if is_class:
+            self.classes += 1
+            complexity = max(scope.complexity, 1)
+        else:
+            self.functions += 1
+            complexity = scope.complexity
+            self.function_complexity += complexity
+            self.max_complexity = max(self.max_complexity, complexity)
+            if parent.kind == "class":
+                parent.complexity += complexity
+        self.max_nesting = max(self.max_nesting, scope.max_nesting)
+        self.definitions.append(DefinitionMetrics(
+            name=qualname,
+            kind=scope.kind,
+            lineno=node.lineno,
+            end_lineno=node.end_lineno or node.lineno,
+            complexity=complexity,
+            max_nesting=scope.max_nesting,
+        ))
+
+
+def compute_metrics(source: str, path: str = "<string>", tree: Optional[ast.AST] = None) -> FileMetrics:
+    """
+    Compute all metrics of a source text with one parse and one AST walk.
+
+    Args:
+        source: Python source code
+        path: path reported in the result
+        tree: already parsed module for `source` (default: from the shared AST cache)
+
+    Returns:
+        FileMetrics (with `error` set if the source does not parse)
+    """
+    loc, sloc, comments, blank = count_lines(source)
+    metrics = FileMetrics(path=path, loc=loc, sloc=sloc, comments=comments, blank=blank)
+    if tree is None:
+        try:
+            tree = parse_cached(source, path)
+        except SyntaxError as e:
+            metrics.error = f"SyntaxError: {e}"
+            return metrics
+
+    visitor = _MetricsVisitor()
+    visitor.visit(tree)
+    visitor.definitions.sort(key=lambda d: (d.lineno, d.name))
+
+    metrics.functions = visitor.functions
+    metrics.classes = visitor.classes
+    metrics.complexity = visitor.module_complexity + visitor.function_complexity
+    metrics.max_complexity = visitor.max_complexity
+    metrics.max_nesting = max(visitor.max_nesting, visitor.module_nesting)
+    metrics.halstead_volume = round(halstead_volume(
+        len(visitor.operators), len(visitor.operands), visitor.total_operators, visitor.total_operands
+    ), 2)
+    metrics.maintainability_index = maintainability_index(metrics.halstead_volume, metrics.complexity, sloc)
+    metrics.definitions = visitor.definitions
+    return metrics
+
+
+def measure_definition(node: ast.AST) -> DefinitionMetrics:
+    """Metrics of a single function/class node, without walking the rest of the module."""
+    visitor = _MetricsVisitor()
+    visitor.visit(node)
+    # the outermost definition is recorded last
+    return visitor.definitions[-1]
+
+
+def count_decisions(statements: Iterable[ast.stmt]) -> int:
+    """Decision points of a list of statements, nested definitions excluded."""
+    visitor = _MetricsVisitor()
+    for stmt in statements:
+        if not isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            visitor.visit(stmt)
+    return visitor.module_complexity - 1
+
+
+def _analyze_path(path: str, rel: str) -> FileMetrics:
+    """Worker entry point: read and analyze one file."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return FileMetrics(path=rel, error=f"Read error: {e}")
+    return compute_metrics(source, rel)
+
+
+class ComplexityAnalyzer:
+    """
+    Repository-wide code metrics (complexity, nesting, LOC/SLOC, counts, maintainability index).
+
+    Each file is parsed and walked exactly once. Directories are processed by a
+    pool of worker processes; results can be cached by content hash so only
+    modified files are re-analyzed.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache: Optional[AnalysisCache] = None,
+        parallel_threshold: int = 64,
+    ):
+        """
+        Args:
+            max_workers: number of worker processes (default: CPU count)
+            cache: optional result cache (see AnalysisCache.for_sandbox("metrics"))
+            parallel_threshold: below this many files, analyze in the current process
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.cache = cache
+        self.parallel_threshold = parallel_threshold
+        self._fingerprint = config_fingerprint("code-metrics", METRICS_VERSION)
+
+    def analyze_source(self, source: str, path: str = "<string>") -> FileMetrics:
+        return compute_metrics(source, path)
+
+    def analyze_file(self, path: Union[str, Path], root: Union[str, Path, None] = None) -> FileMetrics:
+        path = Path(path)
+        rel = path.relative_to(root).as_posix() if root is not None else path.as_posix()
+        return _analyze_path(str(path), rel)
+
+    def analyze_directory(
+        self,
+        target_dir: Union[str, Path, None] = None,
+        files: Optional[Iterable[Union[str, Path]]] = None,
+    ) -> Dict[str, FileMetrics]:
+        """
+        Analyze every Python file of a directory (default: the sandbox root).
+
+        Args:
+            target_dir: root directory
+            files: optional subset of files, relative to target_dir
+
+        Returns:
+            {relative path: FileMetrics}, in path order
+        """
+        if target_dir is None:
+            if SandboxSetup.SANDBOX_ROOT is None:
+                raise RuntimeError("Sandbox not initialized and no target_dir given")
+            target_dir = SandboxSetup.SANDBOX_ROOT
+        root = Path(target_dir).resolve()
+        paths = discover_python_files(root) if files is None else [(root / f).resolve() for f in files]
+
+        results: Dict[str, FileMetrics] = {}
+        todo: List[tuple] = []
+        keys: Dict[str, str] = {}
+        for path in paths:
+            rel = path.relative_to(root).as_posix()
+            if self.cache is not None:
+                try:
+                    key = AnalysisCache.make_key(content_digest(path.read_bytes()), self._fingerprint)
+                except OSError:
+                    key = None
+                cached = self.cache.get(key) if key else None
+                if cached is not None:
+                    results[rel] = FileMetrics.from_dict(dict(cached, path=rel))
+                    continue
+                if key:
+                    keys[rel] = key
+            todo.append((str(path), rel))
+
+        for metrics in self._map(todo):
+            results[metrics.path] = metrics
+            if metrics.path in keys and metrics.error is None:
+                self.cache.put(keys[metrics.path], metrics.to_dict())
+
+        return {rel: results[rel] for rel in sorted(results)}
+
+    def _map(self, todo: List[tuple]) -> List[FileMetrics]:
+        if len(todo) < self.parallel_threshold or self.max_workers == 1:
+            return [_analyze_path(path, rel) for path, rel in todo]
+        chunksize = max(1, len(todo) // (self.max_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(_analyze_path, *zip(*todo), chunksize=chunksize))
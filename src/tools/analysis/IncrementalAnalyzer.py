@@ -0,0 +1,326 @@
+import ast
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .AstCache import parse_cached
+from .ComplexityAnalyzer import count_decisions, measure_definition
+from .PylintParser import PylintMessage
+from .PylintRunner import PylintRunner
+from ..file_operations import SandboxSetup, WriteEvents
+
+_DEF_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# Pseudo-definition used for statements outside any function/class
+MODULE = "<module>"
+
+
+@dataclass(slots=True)
+class DefinitionDelta:
+    """Change of one definition between two versions of a file."""
+
+    name: str
+    kind: str  # "function", "class" or "module"
+    change: str  # "added", "removed" or "modified"
+    complexity_before: Optional[int] = None
+    complexity_after: Optional[int] = None
+    lint_before: Optional[List[PylintMessage]] = None  # None: previous lint unknown
+    lint_after: Optional[List[PylintMessage]] = None
+
+
+@dataclass(slots=True)
+class MetricsDelta:
+    """Per-write delta: only the definitions that changed are re-scored."""
+
+    path: str
+    changes: List[DefinitionDelta] = field(default_factory=list)
+    syntax_error: Optional[str] = None
+    elapsed_ms: float = 0.0
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def complexity_delta(self) -> int:
+        return sum((c.complexity_after or 0) - (c.complexity_before or 0) for c in self.changes)
+
+    @property
+    def lint_delta(self) -> Optional[int]:
+        """Change in lint message count over changed definitions (None if unknown)."""
+        total = 0
+        for c in self.changes:
+            if c.lint_after is None or (c.lint_before is None and c.change != "added"):
+                return None
+            total += len(c.lint_after) - len(c.lint_before or [])
+        return total
+
+    @property
+    def verdict(self) -> str:
+        """Return "improved", "regressed" or "unchanged" (lint first, then complexity)."""
+        if self.syntax_error:
+            return "regressed"
+        lint = self.lint_delta
+        if lint:
+            return "improved" if lint < 0 else "regressed"
+        if self.complexity_delta:
+            return "improved" if self.complexity_delta < 0 else "regressed"
+        return "unchanged"
+
+
+def _own_signature(node: ast.AST) -> tuple:
+    """Structural signature of a node, with nested definitions reduced to their names."""
+    parts = []
+    for name, value in ast.iter_fields(node):
+        if name == "body":
+            parts.append(tuple(
+                ("def", stmt.name) if isinstance(stmt, _DEF_NODES) else ast.dump(stmt) for stmt in value
+            ))
+        elif isinstance(value, list):
+            parts.append(tuple(ast.dump(v) if isinstance(v, ast.AST) else repr(v) for v in value))
+        elif isinstance(value, ast.AST):
+            parts.append(ast.dump(value))
+        else:
+            parts.append(repr(value))
+    return tuple(parts)
+
+
+def _index_definitions(tree: ast.Module) -> Dict[str, ast.AST]:
+    """Map qualified names to definition nodes (module body, class and function bodies)."""
+    found: Dict[str, ast.AST] = {}
+
+    def walk(body, prefix):
+        for stmt in body:
+            if isinstance(stmt, _DEF_NODES):
+                name = prefix + stmt.name
+                found[name] = stmt
+                walk(stmt.body, name + ".")
+
+    walk(tree.body, "")
+    return found
+
+
+def _innermost(definitions: Dict[str, ast.AST]) -> List[Tuple[int, int, str]]:
+    """Line spans sorted so that inner definitions come before their parents."""
+    spans = [(n.lineno, n.end_lineno or n.lineno, name) for name, n in definitions.items()]
+    return sorted(spans, key=lambda s: s[1] - s[0])
+
+
+def _owner(line: int, spans: List[Tuple[int, int, str]]) -> str:
+    for start, end, name in spans:
+        if start <= line <= end:
+            return name
+    return MODULE
+
+
+def _assign(messages: Optional[List[PylintMessage]], spans, wanted: set) -> Optional[Dict[str, list]]:
+    if messages is None:
+        return None
+    grouped: Dict[str, list] = {name: [] for name in wanted}
+    for msg in messages:
+        owner = _owner(msg.line, spans)
+        if owner in grouped:
+            grouped[owner].append(msg)
+    return grouped
+
+
+def _own_complexity(node: ast.AST, kind: str) -> int:
+    """
+    Complexity owned by a node, excluding nested definitions (they get their own entry),
+    so summing a delta never counts a method twice.
+    """
+    if kind == "function":
+        return measure_definition(node).complexity
+    decisions = count_decisions(node.body)
+    return decisions + 1 if kind == "module" else decisions
+
+
+def _lint_content(runner: PylintRunner, source: str, path: str, root: Path) -> Optional[List[PylintMessage]]:
+    """Lint messages of this exact content of path, or None if it is no longer on disk."""
+    cached = runner.cached_messages(source, path, root)
+    if cached is not None:
+        return cached
+    if _read_current(root / path) != source:
+        return None
+    messages = [m for m in runner.run(root, files=[path]).messages if m.path == path]
+    # the file may have been rewritten while pylint was reading it
+    return messages if _read_current(root / path) == source else None
+
+
+def _read_current(path: Path) -> Optional[str]:
+    try:
+        with path.open("r", encoding="utf-8", newline="") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def compute_write_delta(
+    old_source: Optional[str],
+    new_source: str,
+    path: str,
+    runner: Optional[PylintRunner] = None,
+    root: Optional[Path] = None,
+) -> MetricsDelta:
+    """
+    Diff two versions of a file at function/class granularity and re-score only what changed.
+
+    Args:
+        old_source: previous content (None for a new file)
+        new_source: content just written
+        path: file path relative to root
+        runner: optional PylintRunner; when given, new_source is linted (served from
+            its cache if already seen) and messages are kept only for changed definitions.
+            pylint reads the file on disk, so if the file no longer holds new_source (a
+            later write or a rollback), the lint is left unknown rather than attributed
+            to the wrong version. Previous messages come from the runner's cache only.
+        root: sandbox root (default: SandboxSetup.SANDBOX_ROOT)
+
+    Returns:
+        MetricsDelta
+    """
+    start = time.perf_counter()
+    delta = MetricsDelta(path=path)
+    try:
+        new_tree = parse_cached(new_source, path)
+    except SyntaxError as e:
+        delta.syntax_error = str(e)
+        delta.elapsed_ms = (time.perf_counter() - start) * 1000
+        return delta
+    try:
+        old_tree = parse_cached(old_source, path) if old_source is not None else ast.Module(body=[], type_ignores=[])
+    except SyntaxError:
+        old_tree = ast.Module(body=[], type_ignores=[])
+
+    old_defs, new_defs = _index_definitions(old_tree), _index_definitions(new_tree)
+    changed: Dict[str, str] = {}
+    for name in new_defs.keys() - old_defs.keys():
+        changed[name] = "added"
+    for name in old_defs.keys() - new_defs.keys():
+        changed[name] = "removed"
+    for name in new_defs.keys() & old_defs.keys():
+        if _own_signature(old_defs[name]) != _own_signature(new_defs[name]):
+            changed[name] = "modified"
+    if _own_signature(old_tree) != _own_signature(new_tree):
+        changed[MODULE] = "modified" if old_source is not None else "added"
+
+    # Lint only matters for the changed definitions
+    lint_before = lint_after = None
+    if runner is not None and changed:
+        root = Path(root or SandboxSetup.SANDBOX_ROOT).resolve()
+        if old_source is not None:
+            lint_before = runner.cached_messages(old_source, path, root)
+        lint_after = _lint_content(runner, new_source, path, root)
+    before = _assign(lint_before, _innermost(old_defs), set(changed))
+    after = _assign(lint_after, _innermost(new_defs), set(changed))
+
+    for name in sorted(changed, key=lambda n: (n != MODULE, n)):
+        old_node, new_node = old_defs.get(name), new_defs.get(name)
+        if name == MODULE:
+            kind = "module"
+            old_node = old_tree if old_source is not None else None
+            new_node = new_tree
+        else:
+            kind = "class" if isinstance(new_node or old_node, ast.ClassDef) else "function"
+        entry = DefinitionDelta(
+            name=name,
+            kind=kind,
+            change=changed[name],
+            complexity_before=_own_complexity(old_node, kind) if old_node is not None else None,
+            complexity_after=_own_complexity(new_node, kind) if new_node is not None else None,
+        )
+        if before is not None:
+            entry.lint_before = before[name]
+        if after is not None:
+            entry.lint_after = after[name]
+        delta.changes.append(entry)
+
+    delta.elapsed_ms = (time.perf_counter() - start) * 1000
+    return delta
+
+
+class DeltaTracker:
+    """
+    Emit a MetricsDelta for every file written through WriteTool.
+
+    The tracker subscribes to write events and only queues them: the deltas
+    (and the lint run, when a runner is given) are computed by a background
+    thread, so a write never waits for the analysis. `flush()` waits until
+    the queued writes have been scored; `latest(path).verdict` then tells
+    whether the file improved or regressed.
+    """
+
+    def __init__(
+        self,
+        runner: Optional[PylintRunner] = None,
+        on_delta: Optional[Callable[[MetricsDelta], None]] = None,
+        history: int = 256,
+    ):
+        """
+        Args:
+            runner: optional PylintRunner (ideally with an AnalysisCache) for lint deltas
+            on_delta: optional callback receiving each delta
+            history: number of deltas kept in memory
+        """
+        self.runner = runner
+        self.on_delta = on_delta
+        self.deltas: "deque[MetricsDelta]" = deque(maxlen=history)
+        self._latest: Dict[str, MetricsDelta] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[WriteEvents.WriteEvent]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> "DeltaTracker":
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, name="delta-tracker", daemon=True)
+            self._worker.start()
+        WriteEvents.subscribe(self._on_write, with_old_content=True)
+        return self
+
+    def stop(self) -> None:
+        """Stop listening, then score the writes still queued."""
+        WriteEvents.unsubscribe(self._on_write)
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def flush(self) -> None:
+        """Wait until every queued write has been scored."""
+        self._queue.join()
+
+    def __enter__(self) -> "DeltaTracker":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _on_write(self, event: WriteEvents.WriteEvent) -> None:
+        if event.path.suffix == ".py":
+            self._queue.put(event)
+
+    def _work(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                self._score(event)
+            except Exception as e:
+                print(f"Warning: delta of {event.relative_path} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _score(self, event: WriteEvents.WriteEvent) -> None:
+        root = event.path.parents[len(Path(event.relative_path).parts) - 1]
+        delta = compute_write_delta(event.old_content, event.new_content, event.relative_path, self.runner, root)
+        with self._lock:
+            self.deltas.append(delta)
+            self._latest[delta.path] = delta
+        if self.on_delta is not None:
+            self.on_delta(delta)
+
+    def latest(self, path: str) -> Optional[MetricsDelta]:
+        with self._lock:
+            return self._latest.get(path)
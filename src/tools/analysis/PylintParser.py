@@ -0,0 +1,123 @@
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+# Pylint message categories, as reported in the JSON "type" field
+CATEGORIES = ("fatal", "error", "warning", "refactor", "convention", "info")
+
+
+@dataclass(frozen=True, slots=True)
+class PylintMessage:
+    """One pylint message, typed from the JSON reporter output."""
+
+    path: str
+    line: int
+    column: int
+    symbol: str
+    message_id: str
+    category: str
+    message: str
+    module: str = ""
+    obj: str = ""
+    end_line: Optional[int] = None
+    end_column: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        """Serialize back to pylint's JSON reporter layout."""
+        return {
+            "type": self.category,
+            "module": self.module,
+            "obj": self.obj,
+            "line": self.line,
+            "column": self.column,
+            "endLine": self.end_line,
+            "endColumn": self.end_column,
+            "path": self.path,
+            "symbol": self.symbol,
+            "message": self.message,
+            "message-id": self.message_id,
+        }
+
+
+@dataclass
+class PylintReport:
+    """
+    Aggregated result of a pylint run over a set of files.
+
+    Attributes:
+        files: analyzed file paths (relative to the analyzed root)
+        messages: all messages, sorted by path then line
+        statements: number of statements per file (used for scoring)
+    """
+
+    files: List[str] = field(default_factory=list)
+    messages: List[PylintMessage] = field(default_factory=list)
+    statements: Dict[str, int] = field(default_factory=dict)
+
+    def by_file(self) -> Dict[str, List[PylintMessage]]:
+        """Group messages per file path (every analyzed file gets an entry)."""
+        grouped: Dict[str, List[PylintMessage]] = {f: [] for f in self.files}
+        for msg in self.messages:
+            grouped.setdefault(msg.path, []).append(msg)
+        return grouped
+
+    def score(self, path: Optional[str] = None) -> float:
+        """
+        Compute pylint's default 0-10 evaluation for the whole report or one file.
+
+        Uses pylint's formula: 10 - ((5 * error + warning + refactor + convention) / statement) * 10
+        """
+        messages = self.messages if path is None else [m for m in self.messages if m.path == path]
+        statements = sum(self.statements.values()) if path is None else self.statements.get(path, 0)
+        if any(m.category == "fatal" for m in messages):
+            return 0.0
+        if statements == 0:
+            return 10.0
+        counts = {c: 0 for c in CATEGORIES}
+        for m in messages:
+            counts[m.category] = counts.get(m.category, 0) + 1
+        penalty = 5 * counts["error"] + counts["warning"] + counts["refactor"] + counts["convention"]
+        return max(0.0, 10.0 - (penalty / statements) * 10)
+
+
+def parse_pylint_output(output: Union[str, list]) -> List[PylintMessage]:
+    """
+    Parse pylint JSON reporter output into typed message records.
+
+    Args:
+        output: raw JSON text produced by `--output-format=json`, or the decoded list
+
+    Returns:
+        list of PylintMessage
+
+    Raises:
+        ValueError: if the output is not a JSON list of messages
+    """
+    if isinstance(output, str):
+        output = output.strip()
+        if not output:
+            return []
+        try:
+            output = json.loads(output)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid pylint JSON output: {e}") from e
+
+    if not isinstance(output, list):
+        raise ValueError("Invalid pylint JSON output: expected a list of messages")
+
+    return [
+        PylintMessage(
+            path=item.get("path", ""),
+            line=item.get("line") or 0,
+            column=item.get("column") or 0,
+            symbol=item.get("symbol", ""),
+            message_id=item.get("message-id", ""),
+            category=item.get("type", ""),
+            message=item.get("message", ""),
+            module=item.get("module", ""),
+            obj=item.get("obj", ""),
+            end_line=item.get("endLine"),
+            end_column=item.get("endColumn"),
+        )
+        for item in output
+    ]
@@ -0,0 +1,240 @@
+import heapq
+import io
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .AnalysisCache import AnalysisCache, config_fingerprint, content_digest
+from .PylintParser import PylintReport, parse_pylint_output
+from ..file_operations import SandboxSetup
+
+# Directories that never contain project code to audit
+EXCLUDED_DIRS = {"_sandbox_backup", "logs", "__pycache__"}
+
+# Arguments always passed to pylint: no stats persistence between runs,
+# no score line and no nested multiprocessing inside our own workers.
+DEFAULT_PYLINT_ARGS = ("--persistent=n", "--score=n", "--jobs=1")
+
+_IN_PROCESS_LOCK = threading.Lock()
+
+
+def discover_python_files(root: Union[str, Path]) -> List[Path]:
+    """Find the .py files to audit under root, skipping sandbox/tooling folders."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDED_DIRS and not d.startswith("."))
+        found.extend(Path(dirpath) / name for name in sorted(filenames) if name.endswith(".py"))
+    return found
+
+
+def _lint_files(files: Sequence[str], args: Sequence[str]) -> Tuple[list, Dict[str, int]]:
+    """
+    Worker entry point: lint a group of files in-process with pylint's API.
+
+    Args:
+        files: absolute file paths
+        args: extra pylint command line arguments
+
+    Returns:
+        (messages as JSON dicts with absolute paths, statement count per absolute path)
+    """
+    from astroid import MANAGER
+    from pylint.lint import Run
+    from pylint.reporters import JSONReporter
+
+    class _CollectingReporter(JSONReporter):
+        """JSON reporter that also remembers which file each module came from."""
+
+        def __init__(self, output):
+            super().__init__(output)
+            self.module_files: Dict[str, str] = {}
+
+        def on_set_current_module(self, module: str, filepath: Optional[str]) -> None:
+            super().on_set_current_module(module, filepath)
+            if filepath:
+                self.module_files[module] = os.path.abspath(filepath)
+
+    stream = io.StringIO()
+    reporter = _CollectingReporter(stream)
+    try:
+        run = Run([*args, *files], reporter=reporter, exit=False)
+        by_module = run.linter.stats.by_module
+    finally:
+        # Astroid caches every parsed module; keep long-lived workers bounded
+        MANAGER.clear_cache()
+
+    messages = json.loads(stream.getvalue() or "[]")
+    for item in messages:
+        item["path"] = os.path.abspath(item.get("path", ""))
+    statements = {
+        path: by_module.get(module, {}).get("statement", 0)
+        for module, path in reporter.module_files.items()
+    }
+    return messages, statements
+
+
+class PylintRunner:
+    """
+    Run pylint over a whole sandbox, in-process, across a pool of worker processes.
+
+    Files are split into size-balanced groups; each worker lints a whole group with
+    a single `pylint.lint.Run` call, so no subprocess is spawned per file.
+    Messages are parsed into `PylintMessage` records with paths relative to the root.
+
+    With an `AnalysisCache`, files whose content and path (and pylint version/configuration)
+    are unchanged since a previous run are served from the cache: in the
+    Auditor -> Fixer -> Judge loop only the files rewritten by WriteTool are re-linted.
+
+    Note: cross-module checks (e.g. duplicate-code) only see the files of one group.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        pylint_args: Iterable[str] = (),
+        groups_per_worker: int = 4,
+        mp_context=None,
+        cache: Optional[AnalysisCache] = None,
+    ):
+        """
+        Args:
+            max_workers: number of worker processes (default: CPU count)
+            pylint_args: extra pylint arguments (e.g. "--disable=C0114")
+            groups_per_worker: file groups per worker, for load balancing
+            mp_context: optional multiprocessing context for the pool
+            cache: optional result cache (see AnalysisCache.for_sandbox("pylint"))
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.pylint_args = tuple(DEFAULT_PYLINT_ARGS) + tuple(pylint_args)
+        self.groups_per_worker = max(1, groups_per_worker)
+        self.mp_context = mp_context
+        self.cache = cache
+
+    @staticmethod
+    def discover(root: Union[str, Path]) -> List[Path]:
+        """Find the .py files to audit under root (see discover_python_files)."""
+        return discover_python_files(root)
+
+    def run(
+        self,
+        target_dir: Union[str, Path, None] = None,
+        files: Optional[Iterable[Union[str, Path]]] = None,
+    ) -> PylintReport:
+        """
+        Lint a directory (default: the sandbox root) or an explicit list of files.
+
+        Args:
+            target_dir: root directory; relative file paths are resolved against it
+            files: optional subset of files to lint
+
+        Returns:
+            PylintReport with paths relative to target_dir
+        """
+        if target_dir is None:
+            if SandboxSetup.SANDBOX_ROOT is None:
+                raise RuntimeError("Sandbox not initialized and no target_dir given")
+            target_dir = SandboxSetup.SANDBOX_ROOT
+        root = Path(target_dir).resolve()
+
+        paths = self.discover(root) if files is None else [(root / f).resolve() for f in files]
+        report = PylintReport(files=[self._relative(p, root) for p in paths])
+        if not paths:
+            return report
+
+        to_lint, cache_keys = self._use_cache(paths, root, report) if self.cache is not None else (paths, {})
+
+        for messages, statements in self._lint_groups(self._group(to_lint)) if to_lint else []:
+            per_file: Dict[str, list] = {path: [] for path in statements}
+            for item in messages:
+                per_file.setdefault(item["path"], []).append(item)
+                item["path"] = self._relative(item["path"], root)
+            report.messages.extend(parse_pylint_output(messages))
+            for path, count in statements.items():
+                report.statements[self._relative(path, root)] = count
+                if path in cache_keys:
+                    cached = [{k: v for k, v in m.items() if k != "path"} for m in per_file[path]]
+                    self.cache.put(cache_keys[path], {"messages": cached, "statements": count})
+
+        report.messages.sort(key=lambda m: (m.path, m.line, m.column, m.message_id))
+        return report
+
+    def cached_messages(self, content: Union[str, bytes], rel_path: str, root: Union[str, Path]) -> Optional[list]:
+        """
+        Messages previously computed for this exact content, without running pylint.
+
+        Returns:
+            list of PylintMessage with `rel_path` as path, or None if not cached
+        """
+        if self.cache is None:
+            return None
+        from pylint import __version__ as pylint_version
+
+        fingerprint = config_fingerprint(pylint_version, self.pylint_args, root=Path(root).resolve())
+        cached = self.cache.get(AnalysisCache.make_key(content_digest(content), fingerprint, rel_path))
+        if cached is None:
+            return None
+        return parse_pylint_output([dict(m, path=rel_path) for m in cached["messages"]])
+
+    def _use_cache(self, paths: List[Path], root: Path, report: PylintReport):
+        """Fill the report from cached results; return (files still to lint, cache key per file)."""
+        from pylint import __version__ as pylint_version
+
+        fingerprint = config_fingerprint(pylint_version, self.pylint_args, root=root)
+        to_lint: List[Path] = []
+        cache_keys: Dict[str, str] = {}
+        for path in paths:
+            rel = self._relative(path, root)
+            try:
+                # pylint output depends on the location too (module/obj names, imports)
+                key = AnalysisCache.make_key(content_digest(path.read_bytes()), fingerprint, rel)
+            except OSError:
+                to_lint.append(path)
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                to_lint.append(path)
+                cache_keys[str(path)] = key
+                continue
+            report.statements[rel] = cached["statements"]
+            report.messages.extend(parse_pylint_output([dict(m, path=rel) for m in cached["messages"]]))
+        return to_lint, cache_keys
+
+    def _lint_groups(self, groups: List[List[str]]):
+        if len(groups) == 1 or self.max_workers == 1:
+            # pylint/astroid keep global state: in-process runs from several threads must not overlap
+            with _IN_PROCESS_LOCK:
+                return [_lint_files(group, self.pylint_args) for group in groups]
+        workers = min(self.max_workers, len(groups))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=self.mp_context) as pool:
+            return list(pool.map(_lint_files, groups, [self.pylint_args] * len(groups)))
+
+    def _group(self, paths: List[Path]) -> List[List[str]]:
+        """Split files into size-balanced groups (largest files placed first)."""
+        n_groups = min(len(paths), self.max_workers * self.groups_per_worker)
+        if self.max_workers == 1:
+            n_groups = 1
+        heap = [(0, i) for i in range(n_groups)]
+        groups: List[List[str]] = [[] for _ in range(n_groups)]
+        sized = sorted(((self._size(p), str(p)) for p in paths), reverse=True)
+        for size, path in sized:
+            total, i = heapq.heappop(heap)
+            groups[i].append(path)
+            heapq.heappush(heap, (total + size, i))
+        return [g for g in groups if g]
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _relative(path: Union[str, Path], root: Path) -> str:
+        try:
+            return Path(path).relative_to(root).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
@@ -0,0 +1,71 @@
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .AstCache import AST_CACHE
+
+# qualified name -> (first line including decorators, last line), 1-based inclusive
+SymbolSpans = Dict[str, Tuple[int, int]]
+
+_DEF_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+_lock = threading.Lock()
+_indexes: "OrderedDict[str, SymbolSpans]" = OrderedDict()
+_MAX_INDEXES = 1024
+
+
+def build_symbol_index(source: str) -> SymbolSpans:
+    """
+    Map every function/class (including methods and nested definitions) to its line span.
+
+    The index is cached by content hash and built from the shared parsed AST.
+
+    Raises:
+        SyntaxError: if the source does not parse
+    """
+    digest = hashlib.sha256(source.encode("utf-8", "surrogatepass")).hexdigest()
+    with _lock:
+        spans = _indexes.get(digest)
+        if spans is not None:
+            _indexes.move_to_end(digest)
+            return spans
+
+    tree = AST_CACHE.parse(source, digest=digest)
+    spans = {}
+
+    def walk(body, prefix):
+        for node in body:
+            if isinstance(node, _DEF_NODES):
+                name = prefix + node.name
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                spans[name] = (start, node.end_lineno or node.lineno)
+                walk(node.body, name + ".")
+
+    walk(tree.body, "")
+    with _lock:
+        _indexes[digest] = spans
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return spans
+
+
+def find_symbol(source: str, name: str) -> Optional[Tuple[int, int]]:
+    """
+    Locate a symbol by qualified name ("Class.method") or by unambiguous short name.
+
+    Returns:
+        (start_line, end_line), or None if missing or ambiguous
+    """
+    spans = build_symbol_index(source)
+    if name in spans:
+        return spans[name]
+    matches = [q for q in spans if q.rsplit(".", 1)[-1] == name]
+    return spans[matches[0]] if len(matches) == 1 else None
+
+
+def list_symbols(source: str) -> List[str]:
+    """Qualified names of all definitions, in source order."""
+    spans = build_symbol_index(source)
+    return sorted(spans, key=lambda q: spans[q])
@@ -0,0 +1,29 @@
+from .AnalysisCache import AnalysisCache, content_digest, config_fingerprint
+from .AstCache import AstCache, AST_CACHE, parse_cached
+from .CodeMetrics import DefinitionMetrics, FileMetrics
+from .ComplexityAnalyzer import ComplexityAnalyzer, compute_metrics
+from .IncrementalAnalyzer import DefinitionDelta, MetricsDelta, DeltaTracker, compute_write_delta
+from .PylintParser import PylintMessage, PylintReport, parse_pylint_output
+from .PylintRunner import PylintRunner, discover_python_files
+
+__all__ = [
+    "AnalysisCache",
+    "content_digest",
+    "config_fingerprint",
+    "AstCache",
+    "AST_CACHE",
+    "parse_cached",
+    "DefinitionMetrics",
+    "FileMetrics",
+    "ComplexityAnalyzer",
+    "compute_metrics",
+    "DefinitionDelta",
+    "MetricsDelta",
+    "DeltaTracker",
+    "compute_write_delta",
+    "PylintMessage",
+    "PylintReport",
+    "parse_pylint_output",
+    "PylintRunner",
+    "discover_python_files",
+]
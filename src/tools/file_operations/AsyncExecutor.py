@@ -0,0 +1,138 @@
+import asyncio
+import functools
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class BoundedExecutor:
+    """
+    Runs blocking file I/O off the event loop, with backpressure.
+
+    Calls go to a shared thread pool; at most `limit` calls per event loop are
+    submitted at once, the others wait on an asyncio.Semaphore (without
+    blocking the loop), so a burst of agent tool calls cannot queue unbounded
+    work. `run_exclusive` additionally serializes calls sharing a key (e.g.
+    writes to the same file keep their call order).
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, limit: Optional[int] = None):
+        """
+        Args:
+            max_workers: thread pool size (default: min(32, cpu_count + 4))
+            limit: in-flight calls per event loop (default: 2 * max_workers)
+        """
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.limit = limit or 2 * self.max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # asyncio primitives belong to one loop: keep them per loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._key_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, list]]" = weakref.WeakKeyDictionary()
+        self.in_flight = 0
+        self.waiting = 0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool-io")
+        return self._pool
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            sem = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+        return sem
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Await `func(*args, **kwargs)` executed on the I/O thread pool."""
+        future = await self._submit(asyncio.get_running_loop(), func, args, kwargs)
+        return await future
+
+    async def _submit(self, loop: asyncio.AbstractEventLoop, func: Callable[..., Any], args: tuple,
+                      kwargs: dict, on_done: Optional[Callable[[], None]] = None) -> asyncio.Future:
+        """
+        Wait for a slot, then start the call on the pool.
+
+        The slot (and `on_done`) is released when the call has really finished,
+        from the pool future's done callback: a caller cancelled while the
+        thread still runs does not let more work in than `limit`.
+        """
+        sem = self._semaphore(loop)
+        self.waiting += 1
+        try:
+            await sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+        def finished() -> None:
+            self.in_flight -= 1
+            sem.release()
+            if on_done is not None:
+                on_done()
+
+        try:
+            pool_future = self._executor().submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            finished()
+            raise
+
+        def done(_) -> None:
+            try:
+                loop.call_soon_threadsafe(finished)
+            except RuntimeError:
+                pass  # loop closed: its semaphore is gone with it
+
+        pool_future.add_done_callback(done)
+        return asyncio.wrap_future(pool_future, loop=loop)
+
+    async def run_exclusive(self, key: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Like `run`, but calls with the same key run one at a time, in arrival order."""
+        loop = asyncio.get_running_loop()
+        locks = self._key_locks.get(loop)
+        if locks is None:
+            locks = self._key_locks[loop] = {}
+        entry = locks.get(key)
+        if entry is None:
+            entry = locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1  # callers holding or waiting for the lock
+
+        def forget() -> None:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del locks[key]
+
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            forget()
+            raise
+
+        def unlock() -> None:
+            # like the slot, the key stays held until the call has finished
+            entry[0].release()
+            forget()
+
+        try:
+            future = await self._submit(loop, func, args, kwargs, on_done=unlock)
+        except BaseException:
+            unlock()
+            raise
+        return await future
+
+    def stats(self) -> dict:
+        return {"max_workers": self.max_workers, "limit": self.limit, "in_flight": self.in_flight, "waiting": self.waiting}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+
+# Shared executor used by the async variants of the file tools
+IO_EXECUTOR = BoundedExecutor()
@@ -0,0 +1,378 @@
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from . import SandboxSetup
+from . import WriteEvents
+
+BACKUP_DIR_NAME = "_sandbox_backup"
+STORE_DIR_NAME = "store"
+
+# Small files barely shrink and cost a zlib call on every restore
+_MIN_COMPRESS_SIZE = 512
+
+# Index record of version n, stored at offset (n - 1) * size: version (0 once
+# dropped by gc), raw sha256, content size, timestamp
+_RECORD = struct.Struct("<I32sQd")
+_TOMBSTONE = _RECORD.pack(0, bytes(32), 0, 0.0)
+INDEX_SUFFIX = ".ver"
+
+
+@dataclass(slots=True)
+class BackupVersion:
+    """One saved version of a sandbox file."""
+
+    path: str  # relative to the sandbox root, POSIX separators
+    version: int  # 1, 2, 3... per file
+    digest: str  # sha256 of the raw content
+    size: int
+    timestamp: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class BackupStore:
+    """
+    Content-addressed, deduplicated snapshot store for sandbox files.
+
+    Layout under `<sandbox>/_sandbox_backup/store/`:
+        objects/ab/abcdef...      file content, keyed by sha256 (".z" suffix when zlib-compressed)
+        index/<sha1(path)>.ver    one fixed-size record per version of that file,
+                                  version n at offset (n - 1) * record size
+
+    Identical contents are stored once whatever the file or the iteration, saving
+    an unchanged file adds nothing, and version numbers never collide (unlike
+    timestamped copies). Reading or restoring a version costs one seek and record
+    read in the index and one object read, however many versions the file has. `gc()` applies the retention policy and drops unreferenced objects.
+    """
+
+    def __init__(self, directory: Union[str, Path], compress: bool = True):
+        """
+        Args:
+            directory: store directory (created if missing)
+            compress: zlib-compress new objects
+        """
+        self.directory = Path(directory)
+        self.compress = compress
+        self._objects = self.directory / "objects"
+        self._index = self.directory / "index"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._index.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # relative path -> latest BackupVersion (avoids re-reading the index on every save)
+        self._latest: Dict[str, Optional[BackupVersion]] = {}
+
+    @classmethod
+    def for_sandbox(cls, root: Optional[Union[str, Path]] = None, compress: bool = True) -> "BackupStore":
+        """Store inside `<root>/_sandbox_backup` (default root: the current sandbox)."""
+        root = root if root is not None else SandboxSetup.SANDBOX_ROOT
+        if root is None:
+            raise RuntimeError("Sandbox not initialized")
+        return cls(Path(root) / BACKUP_DIR_NAME / STORE_DIR_NAME, compress=compress)
+
+    # ---- objects ---------------------------------------------------------
+
+    def _object_path(self, digest: str, compressed: bool) -> Path:
+        return self._objects / digest[:2] / (digest[2:] + (".z" if compressed else ""))
+
+    def _put_object(self, digest: str, data: bytes) -> None:
+        if self._object_path(digest, True).exists() or self._object_path(digest, False).exists():
+            return
+        compressed = self.compress and len(data) >= _MIN_COMPRESS_SIZE
+        target = self._object_path(digest, compressed)
+        target.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(target.parent))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(data, 6) if compressed else data)
+            os.replace(tmp, target)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def read_object(self, digest: str) -> bytes:
+        """
+        Raw content of an object.
+
+        Raises:
+            FileNotFoundError: unknown digest
+        """
+        try:
+            return zlib.decompress(self._object_path(digest, True).read_bytes())
+        except FileNotFoundError:
+            return self._object_path(digest, False).read_bytes()
+
+    # ---- versions --------------------------------------------------------
+
+    def _index_file(self, rel_path: str) -> Path:
+        index_file = self._index / (hashlib.sha1(rel_path.encode("utf-8")).hexdigest() + INDEX_SUFFIX)
+        legacy = index_file.with_suffix(".jsonl")
+        if legacy.exists():
+            self._convert_legacy_index(legacy, index_file)
+        return index_file
+
+    @staticmethod
+    def _convert_legacy_index(legacy: Path, index_file: Path) -> None:
+        """Turn a JSON-lines index (one line per version) into fixed-size records."""
+        records = {}
+        for line in legacy.read_text(encoding="utf-8").splitlines():
+            try:
+                entry = BackupVersion(**json.loads(line))
+            except (ValueError, TypeError):
+                continue  # truncated line from an interrupted append
+            records[entry.version] = _pack(entry)
+        data = b"".join(records.get(n, _TOMBSTONE) for n in range(1, max(records, default=0) + 1))
+        tmp = index_file.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, index_file)
+        legacy.unlink()
+
+    @staticmethod
+    def _unpack(rel_path: str, record: bytes) -> Optional[BackupVersion]:
+        if len(record) != _RECORD.size:
+            return None  # truncated record from an interrupted save
+        version, digest, size, timestamp = _RECORD.unpack(record)
+        if version == 0:
+            return None
+        return BackupVersion(path=rel_path, version=version, digest=digest.hex(), size=size, timestamp=timestamp)
+
+    def _read_records(self, rel_path: str) -> List[Optional[BackupVersion]]:
+        """Index records in version order (None for versions dropped by gc)."""
+        try:
+            data = self._index_file(rel_path).read_bytes()
+        except FileNotFoundError:
+            return []
+        size = _RECORD.size
+        return [self._unpack(rel_path, data[i:i + size]) for i in range(0, len(data) - size + 1, size)]
+
+    def versions(self, rel_path: str) -> List[BackupVersion]:
+        """All saved versions of a file, oldest first."""
+        return [entry for entry in self._read_records(rel_path) if entry is not None]
+
+    def latest(self, rel_path: str) -> Optional[BackupVersion]:
+        with self._lock:
+            return self._latest_locked(rel_path)
+
+    def _latest_locked(self, rel_path: str) -> Optional[BackupVersion]:
+        if rel_path not in self._latest:
+            latest = None
+            try:
+                with self._index_file(rel_path).open("rb") as f:
+                    count = f.seek(0, os.SEEK_END) // _RECORD.size
+                    if count:
+                        f.seek((count - 1) * _RECORD.size)
+                        latest = self._unpack(rel_path, f.read(_RECORD.size))
+            except FileNotFoundError:
+                pass
+            self._latest[rel_path] = latest
+        return self._latest[rel_path]
+
+    def save(self, rel_path: str, data: bytes) -> BackupVersion:
+        """
+        Record `data` as the newest version of rel_path (no-op if it equals the latest).
+
+        Returns:
+            the new version, or the existing latest one when nothing changed
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            latest = self._latest_locked(rel_path)
+            if latest is not None and latest.digest == digest:
+                return latest
+            self._put_object(digest, data)
+            entry = BackupVersion(
+                path=rel_path,
+                version=(latest.version if latest else 0) + 1,
+                digest=digest,
+                size=len(data),
+                timestamp=time.time(),
+            )
+            # written at its fixed offset: a record torn by a crash is simply overwritten
+            fd = os.open(self._index_file(rel_path), os.O_WRONLY | os.O_CREAT, 0o644)
+            try:
+                os.pwrite(fd, _pack(entry), (entry.version - 1) * _RECORD.size)
+            finally:
+                os.close(fd)
+            self._latest[rel_path] = entry
+        return entry
+
+    def snapshot(self, path: Union[str, Path], root: Optional[Union[str, Path]] = None) -> BackupVersion:
+        """
+        Save the current content of a sandbox file.
+
+        Args:
+            path: file to save (absolute, or relative to root)
+            root: sandbox root (default: SandboxSetup.SANDBOX_ROOT)
+        """
+        root = Path(root if root is not None else SandboxSetup.SANDBOX_ROOT).resolve()
+        path = (root / path).resolve()
+        return self.save(path.relative_to(root).as_posix(), path.read_bytes())
+
+    def get(self, rel_path: str, version: Optional[int] = None) -> Optional[BackupVersion]:
+        """A given version (default: latest); negative numbers count from the end."""
+        latest = self.latest(rel_path)
+        if version is None or latest is None:
+            return latest
+        if version < 0:
+            # gc only drops the oldest versions, so the kept ones are consecutive
+            version = latest.version + 1 + version
+        if not 0 < version <= latest.version:
+            return None
+        try:
+            with self._index_file(rel_path).open("rb") as f:
+                f.seek((version - 1) * _RECORD.size)
+                return self._unpack(rel_path, f.read(_RECORD.size))
+        except FileNotFoundError:
+            return None
+
+    def read(self, rel_path: str, version: Optional[int] = None) -> bytes:
+        """
+        Content of a saved version.
+
+        Raises:
+            KeyError: no such version
+        """
+        entry = self.get(rel_path, version)
+        if entry is None:
+            raise KeyError(f"No backup version {version} for {rel_path}")
+        return self.read_object(entry.digest)
+
+    def restore(self, rel_path: str, version: Optional[int] = None, root: Optional[Union[str, Path]] = None) -> BackupVersion:
+        """
+        Atomically put a saved version back in the sandbox and notify write listeners.
+
+        Raises:
+            KeyError: no such version
+        """
+        entry = self.get(rel_path, version)
+        if entry is None:
+            raise KeyError(f"No backup version {version} for {rel_path}")
+        data = self.read_object(entry.digest)
+        root = Path(root if root is not None else SandboxSetup.SANDBOX_ROOT).resolve()
+        target = root / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(target.parent))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+        try:
+            WriteEvents.publish(WriteEvents.WriteEvent(
+                path=target.resolve(), relative_path=rel_path, new_content=data.decode("utf-8"),
+            ))
+        except UnicodeDecodeError:
+            pass
+        return entry
+
+    # ---- retention -------------------------------------------------------
+
+    def gc(self, keep_last: int = 10, max_age: Optional[float] = None) -> dict:
+        """
+        Apply the retention policy, then delete objects no version refers to.
+
+        A version is kept if it is among the `keep_last` newest of its file and,
+        when `max_age` (seconds) is set, younger than that. The newest version
+        of every file is always kept. With `max_age`, committed WriteTransaction
+        directories older than that are removed too.
+
+        Returns:
+            {"versions_removed": n, "objects_removed": n, "bytes_freed": n, "transactions_removed": n}
+        """
+        now = time.time()
+        removed_versions = 0
+        referenced = set()
+        with self._lock:
+            for legacy in self._index.glob("*.jsonl"):
+                self._convert_legacy_index(legacy, legacy.with_suffix(INDEX_SUFFIX))
+            for index_file in self._index.glob(f"*{INDEX_SUFFIX}"):
+                data = index_file.read_bytes()
+                size = _RECORD.size
+                entries = [e for e in (self._unpack("", data[i:i + size])
+                                       for i in range(0, len(data) - size + 1, size)) if e is not None]
+                kept = entries[-keep_last:] if keep_last > 0 else []
+                if max_age is not None:
+                    kept = [e for e in kept if now - e.timestamp <= max_age]
+                if entries and (not kept or kept[-1] is not entries[-1]):
+                    kept.append(entries[-1])
+                removed_versions += len(entries) - len(kept)
+                referenced.update(e.digest for e in kept)
+                kept_versions = {e.version for e in kept}
+                dropped = [e.version for e in entries if e.version not in kept_versions]
+                if dropped:
+                    # records stay at their offsets: dropped versions become tombstones
+                    with index_file.open("r+b") as f:
+                        for version in dropped:
+                            f.seek((version - 1) * size)
+                            f.write(_TOMBSTONE)
+            self._latest.clear()
+
+            removed_objects = freed = 0
+            for bucket in self._objects.iterdir():
+                for obj in bucket.iterdir():
+                    digest = bucket.name + obj.name.removesuffix(".z")
+                    if digest not in referenced:
+                        freed += obj.stat().st_size
+                        obj.unlink()
+                        removed_objects += 1
+        removed_txns = 0
+        if max_age is not None:
+            for txn_dir in self.directory.parent.glob("txn-*"):
+                try:
+                    manifest = json.loads((txn_dir / "manifest.json").read_text(encoding="utf-8"))
+                    expired = now - txn_dir.stat().st_mtime > max_age
+                except (OSError, ValueError):
+                    continue
+                if manifest.get("state") == "committed" and expired:
+                    shutil.rmtree(txn_dir, ignore_errors=True)
+                    removed_txns += 1
+        return {
+            "versions_removed": removed_versions,
+            "objects_removed": removed_objects,
+            "bytes_freed": freed,
+            "transactions_removed": removed_txns,
+        }
+
+    def stats(self) -> dict:
+        objects = [o for bucket in self._objects.iterdir() for o in bucket.iterdir()]
+        return {
+            "files": sum(1 for _ in self._index.glob(f"*{INDEX_SUFFIX}")),
+            "objects": len(objects),
+            "bytes": sum(o.stat().st_size for o in objects),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._objects.mkdir(parents=True, exist_ok=True)
+            self._index.mkdir(parents=True, exist_ok=True)
+            self._latest.clear()
+
+
+def _pack(entry: BackupVersion) -> bytes:
+    return _RECORD.pack(entry.version, bytes.fromhex(entry.digest), entry.size, entry.timestamp)
+
+
+_stores: Dict[Path, BackupStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_backup_store(root: Optional[Union[str, Path]] = None) -> BackupStore:
+    """Shared store of a sandbox (one instance per root, so version numbers stay consistent)."""
+    root = Path(root if root is not None else SandboxSetup.SANDBOX_ROOT).resolve()
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None or not store.directory.exists():
+            store = _stores[root] = BackupStore.for_sandbox(root)
+        return store
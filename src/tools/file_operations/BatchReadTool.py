@@ -0,0 +1,87 @@
+from langchain.tools import BaseTool
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Union
+import json
+
+from .ReadCache import READ_CACHE
+from .AsyncExecutor import IO_EXECUTOR
+from . import SandboxSetup
+
+
+def parse_list_argument(value: Union[str, List], name: str) -> list:
+    """
+    Accept a real list or its JSON encoding (LLMs often send the list as a string).
+
+    Raises:
+        ValueError: if the value is not a list
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"'{name}' must be a JSON list: {e}") from e
+    if not isinstance(value, list):
+        raise ValueError(f"'{name}' must be a list")
+    return value
+
+
+class BatchReadTool(BaseTool):
+    """
+    Tool that reads several sandbox files in a single call.
+
+    All paths are validated in one pass against the sandbox root, then the
+    files are read concurrently (through the shared READ_CACHE). The result is
+    one JSON payload, so reading N files costs a single tool call.
+    """
+
+    name = "read files"
+    description: str = (
+        "Reads several files at once. "
+        "Input should be a list of file paths (or a JSON array string). "
+        "Example: [\"src/a.py\", \"src/b.py\"] "
+        "Returns a JSON object with a 'files' list of {file_path, content, error}."
+    )
+    max_workers: int = 8
+
+    def _run(self, file_paths: Union[str, List[str]]) -> str:
+        """
+        Read many files.
+
+        Args:
+            file_paths: list of paths relative to the sandbox root
+
+        Returns:
+            JSON payload: {"files": [...], "read": n, "failed": m} or an error message
+        """
+        if SandboxSetup.SANDBOX_ROOT is None:
+            return "Error: Sandbox not initialized"
+        try:
+            file_paths = [str(p) for p in parse_list_argument(file_paths, "file_paths")]
+        except ValueError as e:
+            return f"Error: {e}"
+
+        resolved = SandboxSetup.get_resolver().validate_many(file_paths)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(file_paths) or 1))) as pool:
+            files = list(pool.map(self._read_one, file_paths, resolved))
+
+        failed = sum(1 for f in files if f["error"])
+        return json.dumps(
+            {"files": files, "read": len(files) - failed, "failed": failed},
+            ensure_ascii=False,
+        )
+
+    @staticmethod
+    def _read_one(file_path: str, path: Optional[Path]) -> dict:
+        if path is None:
+            return {"file_path": file_path, "content": None, "error": f"Unsafe or invalid file path: {file_path}"}
+        if not path.is_file():
+            return {"file_path": file_path, "content": None, "error": f"The file at {file_path} does not exist."}
+        try:
+            return {"file_path": file_path, "content": READ_CACHE.read_text(path), "error": None}
+        except Exception as e:
+            return {"file_path": file_path, "content": None, "error": f"Error reading file: {e}"}
+
+    async def _arun(self, file_paths: Union[str, List[str]]) -> str:
+        """Asynchronous batch read."""
+        return await IO_EXECUTOR.run(self._run, file_paths)
@@ -0,0 +1,101 @@
+from langchain.tools import BaseTool
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Union
+import json
+
+from .BatchReadTool import parse_list_argument
+from .WriteTool import WriteTool
+from .WriteTransaction import TransactionError, WriteTransaction
+from .AsyncExecutor import IO_EXECUTOR
+from . import SandboxSetup
+
+
+class BatchWriteTool(BaseTool):
+    """
+    Tool that writes several sandbox files in a single call.
+
+    Every edit is checked first (path, size, Python syntax, duplicate targets);
+    if any check fails nothing is written. Valid batches are staged concurrently
+    and applied as one WriteTransaction (all files or none, originals kept in
+    `_sandbox_backup`), and the outcome comes back as one JSON payload.
+    """
+
+    name = "write files"
+    description: str = (
+        "Writes several files at once. "
+        "Input should be a list of {\"file_path\": ..., \"content\": ...} objects (or a JSON array string). "
+        "Example: [{\"file_path\": \"src/a.py\", \"content\": \"x = 1\\n\"}] "
+        "All edits are validated before anything is written. "
+        "Returns a JSON object with a 'results' list of {file_path, ok, message}."
+    )
+    create_backup: bool = True
+    max_workers: int = 8
+
+    def _run(self, edits: Union[str, List[Dict[str, str]]]) -> str:
+        """
+        Validate then write many files.
+
+        Args:
+            edits: list of {"file_path": str, "content": str}
+
+        Returns:
+            JSON payload: {"results": [...], "written": n, "failed": m} or an error message
+        """
+        if SandboxSetup.SANDBOX_ROOT is None:
+            return "Error: Sandbox not initialized"
+        try:
+            edits = parse_list_argument(edits, "edits")
+            pairs = [(str(e["file_path"]), e["content"]) for e in edits]
+        except (ValueError, TypeError, KeyError) as e:
+            return f"Error: each edit needs 'file_path' and 'content' ({e})"
+        if any(not isinstance(content, str) for _, content in pairs):
+            return "Error: 'content' must be a string"
+
+        writer = WriteTool(create_backup=self.create_backup)
+        resolver = SandboxSetup.get_resolver()
+        root = resolver.root
+        resolved = resolver.validate_many([p for p, _ in pairs])
+
+        # Validation pass: nothing is written unless every edit is acceptable
+        errors: List[str] = []
+        seen = set()
+        for (file_path, content), path in zip(pairs, resolved):
+            if path is None:
+                errors.append(f"Error: Unsafe or invalid file path: {file_path}")
+            elif path in seen:
+                errors.append(f"Error: Duplicate target in batch: {file_path}")
+            else:
+                seen.add(path)
+                errors.append(writer.validate_content(path, content))
+
+        if any(errors):
+            results = [
+                {"file_path": file_path, "ok": False, "message": error or "Skipped: batch rejected"}
+                for (file_path, _), error in zip(pairs, errors)
+            ]
+            return json.dumps({"results": results, "written": 0, "failed": len(results)}, ensure_ascii=False)
+
+        # Stage concurrently, then apply everything in one transaction
+        txn = WriteTransaction(root, writer=writer, keep_backup=self.create_backup)
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(pairs) or 1))) as pool:
+                list(pool.map(lambda item: txn.stage_resolved(item[1], item[0][1]), zip(pairs, resolved)))
+            txn.commit()
+        except (OSError, TransactionError) as e:
+            txn.rollback()
+            results = [
+                {"file_path": file_path, "ok": False, "message": f"Error: batch rolled back: {e}"}
+                for file_path, _ in pairs
+            ]
+            return json.dumps({"results": results, "written": 0, "failed": len(results)}, ensure_ascii=False)
+
+        backup_info = f" (Backup: {txn.directory})" if self.create_backup else ""
+        results = [
+            {"file_path": file_path, "ok": True, "message": f"Success: Wrote {len(content.encode('utf-8'))} bytes to {file_path}{backup_info}"}
+            for file_path, content in pairs
+        ]
+        return json.dumps({"results": results, "written": len(results), "failed": 0}, ensure_ascii=False)
+
+    async def _arun(self, edits: Union[str, List[Dict[str, str]]]) -> str:
+        """Asynchronous batch write."""
+        return await IO_EXECUTOR.run(self._run, edits)
@@ -0,0 +1,276 @@
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Directories never worth showing to an agent
+DEFAULT_IGNORES = ("_sandbox_backup", "logs", "__pycache__", ".git")
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translate a gitignore-style glob to a regex over POSIX relative paths.
+
+    `*` and `?` stop at "/", `**` crosses directories. A pattern without a
+    slash matches a name at any depth; with a slash it is anchored at the base.
+    """
+    anchored = "/" in pattern.rstrip("/")
+    pattern = pattern.strip("/")
+    out, i = [], 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ("^" if anchored else "^(?:.*/)?") + "".join(out) + "$"
+
+
+@dataclass(slots=True)
+class _IgnoreRule:
+    regex: "re.Pattern"
+    negate: bool
+    dir_only: bool
+    base: str  # directory of the .gitignore, relative to the scan root ("" for the root)
+
+
+class GitIgnore:
+    """Ordered gitignore rules; the last matching rule wins (supports !negation)."""
+
+    def __init__(self):
+        self.rules: List[_IgnoreRule] = []
+
+    def add_file(self, gitignore: Path, base: str = "") -> None:
+        try:
+            lines = gitignore.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            return
+        self.add_patterns(lines, base)
+
+    def add_patterns(self, patterns: Iterable[str], base: str = "") -> None:
+        for line in patterns:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            if line.startswith("\\"):
+                line = line[1:]
+            self.rules.append(_IgnoreRule(
+                regex=re.compile(glob_to_regex(line)),
+                negate=negate,
+                dir_only=line.endswith("/"),
+                base=base,
+            ))
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        result = False
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.base:
+                if not rel_path.startswith(rule.base + "/"):
+                    continue
+                candidate = rel_path[len(rule.base) + 1:]
+            else:
+                candidate = rel_path
+            if rule.regex.match(candidate):
+                result = not rule.negate
+        return result
+
+    def copy(self) -> "GitIgnore":
+        clone = GitIgnore()
+        clone.rules = list(self.rules)
+        return clone
+
+
+@dataclass(slots=True)
+class ScanEntry:
+    """One file or directory found by the scanner."""
+
+    path: str  # relative to the scan root, POSIX separators
+    is_dir: bool
+    depth: int
+    size: Optional[int] = None  # only with metadata
+    mtime: Optional[float] = None
+
+
+@dataclass(slots=True)
+class ScanPage:
+    """A page of scan results; pass `next_cursor` back to continue."""
+
+    entries: List[ScanEntry] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def _parts(rel_path: str) -> Tuple[str, ...]:
+    return tuple(rel_path.split("/")) if rel_path else ()
+
+
+def iter_directory(
+    root: Union[str, Path],
+    pattern: Optional[str] = None,
+    suffixes: Optional[Sequence[str]] = None,
+    max_depth: Optional[int] = None,
+    include_dirs: bool = True,
+    ignore: Sequence[str] = DEFAULT_IGNORES,
+    use_gitignore: bool = True,
+    with_metadata: bool = False,
+    after: Optional[str] = None,
+    gitignore_root: Optional[Union[str, Path]] = None,
+) -> Iterator[ScanEntry]:
+    """
+    Walk a directory tree with os.scandir, depth-first, names sorted at each level.
+
+    Entries come in a stable order (lexicographic on path components), so
+    `after` can resume a walk: whole subtrees that sort before it are skipped
+    without being read. Directory symlinks are listed but never followed.
+
+    Args:
+        root: directory to walk
+        pattern: glob on the relative path (e.g. "*.py", "src/**/test_*.py");
+            directories are still traversed when they do not match
+        suffixes: keep only files with one of these suffixes (e.g. [".py"])
+        max_depth: 1 lists only the direct children (default: unlimited)
+        include_dirs: yield directories as well as files
+        ignore: directory/file names skipped entirely
+        use_gitignore: apply .gitignore files found in the tree
+        with_metadata: fill size/mtime from the entry's stat (cached by scandir;
+            free on Windows, one lstat per returned entry elsewhere)
+        after: resume after this relative path (exclusive)
+        gitignore_root: top of the repository when root is one of its subdirectories
+            (e.g. the sandbox root): the .gitignore files from there down to root
+            apply too, as they would for git (default: root)
+
+    Yields:
+        ScanEntry
+
+    Raises:
+        ValueError: max_depth below 1, or root not inside gitignore_root
+    """
+    if max_depth is not None and max_depth < 1:
+        raise ValueError(f"max_depth must be at least 1, got {max_depth}")
+    root = Path(root)
+    matcher = re.compile(glob_to_regex(pattern)) if pattern else None
+    suffixes = tuple(suffixes) if suffixes else None
+    ignored_names = frozenset(ignore)
+    after_parts = _parts(after) if after else None
+
+    # Rule bases and matched paths are relative to gitignore_root; entries stay relative to root
+    gitignore = GitIgnore()
+    prefix = ""
+    if use_gitignore:
+        top = Path(gitignore_root).resolve() if gitignore_root is not None else None
+        if top is not None and top != root.resolve():
+            prefix = root.resolve().relative_to(top).as_posix()
+            base = ""
+            gitignore.add_file(top / ".gitignore")
+            for part in _parts(prefix):
+                base = f"{base}/{part}" if base else part
+                gitignore.add_file(top / base / ".gitignore", base=base)
+        else:
+            gitignore.add_file(root / ".gitignore")
+
+    def walk(directory: str, rel_dir: str, depth: int, rules: GitIgnore) -> Iterator[ScanEntry]:
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return
+        for entry in entries:
+            name = entry.name
+            if name in ignored_names:
+                continue
+            rel = f"{rel_dir}/{name}" if rel_dir else name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if rules.rules and rules.ignored(f"{prefix}/{rel}" if prefix else rel, is_dir):
+                continue
+
+            descend = is_dir and (max_depth is None or depth < max_depth)
+            if after_parts is not None:
+                parts = _parts(rel)
+                if parts <= after_parts:
+                    # the subtree may still contain entries after the cursor
+                    if descend and after_parts[:len(parts)] == parts:
+                        yield from walk(entry.path, rel, depth + 1, _child_rules(entry.path, rel, rules))
+                    continue
+
+            wanted = (include_dirs or not is_dir)
+            if wanted and not is_dir and suffixes is not None and not name.endswith(suffixes):
+                wanted = False
+            if wanted and matcher is not None and not matcher.match(rel):
+                wanted = False
+            if wanted:
+                item = ScanEntry(path=rel, is_dir=is_dir, depth=depth)
+                if with_metadata:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        item.size = st.st_size
+                        item.mtime = st.st_mtime
+                    except OSError:
+                        pass
+                yield item
+            if descend:
+                yield from walk(entry.path, rel, depth + 1, _child_rules(entry.path, rel, rules))
+
+    def _child_rules(path: str, rel: str, rules: GitIgnore) -> GitIgnore:
+        if not use_gitignore:
+            return rules
+        nested = os.path.join(path, ".gitignore")
+        if not os.path.isfile(nested):
+            return rules
+        child = rules.copy()
+        child.add_file(Path(nested), base=f"{prefix}/{rel}" if prefix else rel)
+        return child
+
+    yield from walk(str(root), "", 1, gitignore)
+
+
+def scan_directory(root: Union[str, Path], limit: Optional[int] = None, cursor: Optional[str] = None, **options) -> ScanPage:
+    """
+    One page of `iter_directory` results.
+
+    Args:
+        root: directory to walk
+        limit: maximum entries in the page (default: everything)
+        cursor: `next_cursor` of the previous page
+        **options: filters accepted by iter_directory
+
+    Returns:
+        ScanPage (next_cursor is None on the last page)
+    """
+    page = ScanPage()
+    walker = iter_directory(root, after=cursor, **options)
+    for entry in walker:
+        if limit is not None and len(page.entries) >= limit:
+            page.next_cursor = page.entries[-1].path if page.entries else cursor
+            break
+        page.entries.append(entry)
+    walker.close()
+    return page
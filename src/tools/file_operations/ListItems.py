@@ -1,7 +1,10 @@
 from langchain.tools import BaseTool
+from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
+from .AsyncExecutor import IO_EXECUTOR
+from .DirectoryScanner import scan_directory
 from . import SandboxSetup
 
 
@@ -12,20 +15,45 @@ class ListItems(BaseTool):
     Notes:
     - Input: a directory path string.
     - Output: newline-separated names of items, or an error message.
+    - With `recursive` (or any filter), the tree is walked by DirectoryScanner:
+      paths relative to dir_path, directories ending with "/", ignore rules
+      applied, and a "Next cursor:" line when the page is truncated.
     """
 
     name = "list items"
     description: str = (
         "Lists items in a directory. Input should be a directory path string. "
+        "Optional: recursive=true to walk subdirectories, pattern (glob such as '*.py' "
+        "or 'src/**/test_*.py'), max_depth, limit and cursor (from 'Next cursor:') "
+        "for pagination, with_metadata=true for size and modification time, "
+        "changed_since=<generation> to list only files changed since then. "
         "Returns a newline-separated list of entries or an error message."
     )
 
-    def _run(self, dir_path: str) -> str:
+    def _run(
+        self,
+        dir_path: str,
+        recursive: bool = False,
+        pattern: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        with_metadata: bool = False,
+        changed_since: Optional[int] = None,
+    ) -> str:
         """
         List items in the given directory path.
 
         Args:
             dir_path: Path to the directory to list.
+            recursive: walk subdirectories (ignoring .gitignore'd files, _sandbox_backup, logs, __pycache__)
+            pattern: glob filter on the relative path
+            max_depth: maximum depth, requires recursive (1 = direct children)
+            limit: maximum number of entries returned
+            cursor: resume after this path (value of the previous "Next cursor:" line)
+            with_metadata: append size in bytes and modification time to each entry
+            changed_since: list "<kind>\t<path>" for files changed after this index
+                generation (see SandboxIndex), followed by the current generation
 
         Returns:
             Newline-separated string of entry names, or an error message string.
@@ -34,20 +62,24 @@ class ListItems(BaseTool):
         if SandboxSetup.SANDBOX_ROOT is None:
             return "Error: Sandbox not initialized"
 
-        # Resolve against sandbox root and ensure containment
+        # Resolve against sandbox root and ensure containment (memoized by the sandbox resolver)
         try:
-            p = (Path(SandboxSetup.SANDBOX_ROOT) / dir_path).resolve()
+            p = SandboxSetup.get_resolver().resolve(dir_path)
         except Exception as e:
             return f"Error resolving path: {e}"
 
-        try:
-            p.relative_to(Path(SandboxSetup.SANDBOX_ROOT))
-        except Exception:
+        if p is None:
             return f"Error: Path outside sandbox: {dir_path}"
 
         if not p.exists() or not p.is_dir():
             return f"Error listing directory: not a directory: {dir_path}"
 
+        if changed_since is not None:
+            return self._changes(p, changed_since)
+
+        if recursive or pattern or max_depth is not None or limit or cursor or with_metadata:
+            return self._scan(p, recursive, pattern, max_depth, limit, cursor, with_metadata)
+
         try:
             entries = [item.name for item in p.iterdir()]
             entries.sort()
@@ -55,6 +87,50 @@ class ListItems(BaseTool):
         except Exception as e:
             return f"Error listing directory: {str(e)}"
 
-    async def _arun(self, dir_path: str) -> str:
-        """Async wrapper that delegates to the synchronous implementation."""
-        return self._run(dir_path)
+    def _changes(self, p: Path, generation: int) -> str:
+        """Files changed under p since an index generation, answered from the sandbox index."""
+        index = SandboxSetup.SANDBOX_INDEX
+        if index is None:
+            return "Error: Sandbox index not available"
+        rel_dir = SandboxSetup.get_resolver().relative(p)
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        lines = [
+            f"{change.kind}\t{change.path[len(prefix):]}"
+            for change in index.changes_since(generation)
+            if change.path.startswith(prefix)
+        ]
+        lines.append(f"Generation: {index.generation}")
+        return "\n".join(lines)
+
+    def _scan(self, p: Path, recursive, pattern, max_depth, limit, cursor, with_metadata) -> str:
+        """Filtered / recursive / paginated listing through DirectoryScanner."""
+        if limit is not None and limit < 1:
+            return "Error: limit must be at least 1"
+        if max_depth is not None and not recursive:
+            return "Error: max_depth requires recursive=true"
+        if max_depth is not None and max_depth < 1:
+            return "Error: max_depth must be at least 1"
+        depth = max_depth if recursive else 1
+        try:
+            # .gitignore files above a listed subdirectory apply too
+            page = scan_directory(
+                p, limit=limit, cursor=cursor, pattern=pattern, max_depth=depth, with_metadata=with_metadata,
+                gitignore_root=SandboxSetup.SANDBOX_ROOT,
+            )
+        except Exception as e:
+            return f"Error listing directory: {str(e)}"
+
+        lines = []
+        for entry in page.entries:
+            line = entry.path + ("/" if entry.is_dir else "")
+            if with_metadata and entry.size is not None:
+                modified = datetime.fromtimestamp(entry.mtime).isoformat(timespec="seconds")
+                line += f"\t{entry.size}\t{modified}"
+            lines.append(line)
+        if page.next_cursor is not None:
+            lines.append(f"Next cursor: {page.next_cursor}")
+        return "\n".join(lines)
+
+    async def _arun(self, dir_path: str, **kwargs) -> str:
+        """Async listing: the directory walk runs on the bounded tool executor."""
+        return await IO_EXECUTOR.run(self._run, dir_path, **kwargs)
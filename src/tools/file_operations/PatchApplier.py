@@ -0,0 +1,338 @@
+import ast
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from ..analysis.AstCache import parse_cached
+
+SEARCH_MARKER = "<<<<<<< SEARCH"
+DIVIDER = "======="
+REPLACE_MARKER = ">>>>>>> REPLACE"
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_LINE_BREAK = re.compile(r"(\r?\n)")
+
+
+def split_lines(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Split on "\n" / "\r\n" only (unlike str.splitlines, which also breaks on
+    form feeds, "\x85", "\u2028"...), keeping each line's own terminator.
+
+    Returns:
+        (lines without terminator, terminator of each line; "" for an unterminated last line)
+    """
+    parts = _LINE_BREAK.split(text)
+    lines, endings = parts[0::2], parts[1::2] + [""]
+    if lines[-1] == "":
+        lines.pop()
+        endings.pop()
+    return lines, endings
+
+
+class PatchError(ValueError):
+    """The patch is malformed or does not apply to the current file."""
+
+
+@dataclass(slots=True)
+class Hunk:
+    """
+    One edit: `old` lines replaced by `new` lines (without line terminators).
+
+    `start` is the 1-based line of the old text given by a unified diff header
+    (None for search/replace blocks, which are located by content only).
+    """
+
+    old: List[str] = field(default_factory=list)
+    new: List[str] = field(default_factory=list)
+    start: Optional[int] = None
+    old_eof_newline: bool = True  # "\ No newline at end of file" after a "-" or " " line
+    new_eof_newline: bool = True  # same, after a "+" or " " line
+
+
+@dataclass(slots=True)
+class Edit:
+    """A located hunk: original lines [start, end) become `new` (0-based)."""
+
+    start: int
+    end: int
+    new: List[str]
+
+
+@dataclass(slots=True)
+class PatchResult:
+    content: str
+    edits: List[Edit]
+    added: int = 0
+    removed: int = 0
+
+
+def parse_unified_diff(text: str) -> List[Hunk]:
+    """
+    Parse the hunks of a unified diff for a single file.
+
+    "---"/"+++"/"diff" header lines are ignored; the hunk line counts are
+    checked against the body so truncated diffs are rejected.
+    """
+    hunks: List[Hunk] = []
+    current: Optional[Hunk] = None
+    expected = (0, 0)
+    last = ""
+    for line in split_lines(text)[0]:
+        match = _HUNK_HEADER.match(line)
+        if match:
+            _check_counts(current, expected, len(hunks))
+            current = Hunk(start=int(match.group(1)))
+            expected = (int(match.group(2) or 1), int(match.group(4) or 1))
+            hunks.append(current)
+            last = ""
+            continue
+        if current is None:
+            continue  # file headers and anything before the first hunk
+        if line.startswith("\\"):
+            # "\ No newline at end of file" applies to the previous line
+            if last in ("-", " "):
+                current.old_eof_newline = False
+            if last in ("+", " "):
+                current.new_eof_newline = False
+            continue
+        if len(current.old) >= expected[0] and len(current.new) >= expected[1]:
+            if line.startswith(("--- ", "+++ ", "diff ")) or not line.strip():
+                continue  # next file header or trailing blank line
+        tag, body = (line[:1] or " "), line[1:]
+        if tag == " ":
+            current.old.append(body)
+            current.new.append(body)
+        elif tag == "-":
+            current.old.append(body)
+        elif tag == "+":
+            current.new.append(body)
+        else:
+            raise PatchError(f"Unexpected line in hunk {len(hunks)}: {line!r}")
+        last = tag
+    _check_counts(current, expected, len(hunks))
+    if not hunks:
+        raise PatchError("No hunks found in the diff")
+    return hunks
+
+
+def _check_counts(hunk: Optional[Hunk], expected: Tuple[int, int], number: int) -> None:
+    if hunk is not None and (len(hunk.old), len(hunk.new)) != expected:
+        raise PatchError(
+            f"Hunk {number} is malformed: expected -{expected[0]} +{expected[1]} lines, "
+            f"got -{len(hunk.old)} +{len(hunk.new)}"
+        )
+
+
+def parse_search_replace(text: str) -> List[Hunk]:
+    """
+    Parse search/replace blocks:
+
+        <<<<<<< SEARCH
+        lines to find (exactly once in the file)
+        =======
+        replacement lines
+        >>>>>>> REPLACE
+    """
+    hunks: List[Hunk] = []
+    state = None
+    for line in split_lines(text)[0]:
+        marker = line.strip()
+        if state is None:
+            if marker == SEARCH_MARKER:
+                hunks.append(Hunk())
+                state = "search"
+        elif state == "search":
+            if marker == DIVIDER:
+                state = "replace"
+            else:
+                hunks[-1].old.append(line)
+        elif marker == REPLACE_MARKER:
+            state = None
+        else:
+            hunks[-1].new.append(line)
+    if state is not None:
+        raise PatchError(f"Search/replace block {len(hunks)} is not terminated")
+    if not hunks:
+        raise PatchError("No search/replace blocks found")
+    for number, hunk in enumerate(hunks, 1):
+        if not hunk.old:
+            raise PatchError(f"Search/replace block {number} has an empty SEARCH section")
+    return hunks
+
+
+def parse_patch(text: str) -> List[Hunk]:
+    """Parse either search/replace blocks or a unified diff (detected from the text)."""
+    if SEARCH_MARKER in text:
+        return parse_search_replace(text)
+    return parse_unified_diff(text)
+
+
+def _occurrences(lines: List[str], block: List[str], begin: int = 0) -> List[int]:
+    first, size = block[0], len(block)
+    return [
+        i for i in range(begin, len(lines) - size + 1)
+        if lines[i] == first and lines[i:i + size] == block
+    ]
+
+
+def locate(lines: List[str], hunks: List[Hunk]) -> List[Edit]:
+    """
+    Find where each hunk applies in the original lines.
+
+    Unified hunks are tried at their header line first, then at the closest
+    position after the previous hunk; search blocks must match exactly once.
+    Any hunk that cannot be placed, or that overlaps another one, fails the
+    whole patch: nothing is applied partially.
+    """
+    edits: List[Edit] = []
+    floor = 0  # unified hunks are ordered: each one starts after the previous
+    for number, hunk in enumerate(hunks, 1):
+        if hunk.start is None:
+            found = _occurrences(lines, hunk.old)
+            if not found:
+                raise PatchError(f"Conflict in block {number}: SEARCH text not found")
+            if len(found) > 1:
+                lines_at = ", ".join(str(i + 1) for i in found[:5])
+                raise PatchError(f"Conflict in block {number}: SEARCH text matches several places (lines {lines_at})")
+            position = found[0]
+        elif not hunk.old:
+            # pure insertion: "@@ -N,0" inserts after line N
+            position = min(max(hunk.start, floor), len(lines))
+        else:
+            hint = max(hunk.start - 1, 0)
+            found = _occurrences(lines, hunk.old, floor)
+            if not found:
+                raise PatchError(f"Conflict in hunk {number}: context does not match the file near line {hunk.start}")
+            position = min(found, key=lambda i: (abs(i - hint), i))
+        edit = Edit(position, position + len(hunk.old), hunk.new)
+        edits.append(edit)
+        if hunk.start is not None:
+            floor = edit.end
+
+    edits.sort(key=lambda e: (e.start, e.end))
+    for previous, edit in zip(edits, edits[1:]):
+        # two insertions at the same line have no defined order either
+        if edit.start < previous.end or (edit.start == previous.end == edit.end == previous.start):
+            raise PatchError(f"Conflict: hunks overlap at line {edit.start + 1}")
+    return edits
+
+
+def apply_patch(original: str, patch: str) -> PatchResult:
+    """
+    Apply a unified diff or search/replace blocks to `original`.
+
+    Raises:
+        PatchError: malformed patch or conflicting hunks
+    """
+    hunks = parse_patch(patch)
+    lines, endings = split_lines(original)
+    # terminator of new lines that replace nothing: the most common one of the file
+    newline = "\r\n" if endings.count("\r\n") > endings.count("\n") else "\n"
+    edits = locate(lines, hunks)
+
+    eof_newline = original.endswith("\n") or not original
+    for hunk in hunks:
+        if not hunk.new_eof_newline:
+            eof_newline = False
+        elif not hunk.old_eof_newline:
+            eof_newline = True
+
+    # untouched lines keep their terminator; new lines take the one of the line they replace
+    result: List[Tuple[str, str]] = []
+    cursor = 0
+    for edit in edits:
+        result.extend(zip(lines[cursor:edit.start], endings[cursor:edit.start]))
+        eol = endings[edit.start] if edit.start < len(lines) and endings[edit.start] else newline
+        result.extend((line, eol) for line in edit.new)
+        cursor = edit.end
+    result.extend(zip(lines[cursor:], endings[cursor:]))
+
+    content = "".join(line + (eol or newline) for line, eol in result[:-1])
+    if result:
+        line, eol = result[-1]
+        content += line + ((eol or newline) if eof_newline else "")
+    return PatchResult(
+        content=content,
+        edits=edits,
+        added=sum(len(e.new) for e in edits),
+        removed=sum(e.end - e.start for e in edits),
+    )
+
+
+def _top_level_spans(tree: ast.Module) -> List[Tuple[int, int]]:
+    """0-based [start, end) line ranges of the module's top-level statements."""
+    spans = []
+    for node in tree.body:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", ())])
+        spans.append((start - 1, node.end_lineno or node.lineno))
+    return spans
+
+
+def affected_regions(tree: ast.Module, edits: List[Edit]) -> List[Tuple[int, int, int]]:
+    """
+    Regions of the new file to re-parse, as (new start, new end, old start).
+
+    Each edit is widened to the top-level statements it touches, so a region
+    always holds whole statements and parses on its own.
+    """
+    spans = _top_level_spans(tree)
+    widened = []
+    for edit in edits:
+        lo, hi = edit.start, edit.end
+        for start, end in spans:
+            if edit.start == edit.end:
+                touches = start < edit.start < end  # insertion inside a statement
+            else:
+                touches = start < edit.end and end > edit.start
+            if touches:
+                lo, hi = min(lo, start), max(hi, end)
+        widened.append([lo, hi, [edit]])
+
+    merged: List[list] = []
+    for region in sorted(widened, key=lambda r: (r[0], r[1])):
+        if merged and region[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], region[1])
+            merged[-1][2].extend(region[2])
+        else:
+            merged.append(region)
+
+    regions = []
+    shift = 0
+    for lo, hi, region_edits in merged:
+        delta = sum(len(e.new) - (e.end - e.start) for e in region_edits)
+        regions.append((lo + shift, hi + shift + delta, lo))
+        shift += delta
+    return regions
+
+
+def patched_syntax_error(original: str, result: PatchResult, filename: str = "<unknown>") -> str:
+    """
+    Syntax check of a patched file that only re-parses what the patch touched.
+
+    The original tree comes from the shared AST cache; only the top-level
+    statements overlapping an edit are parsed again. If a region does not
+    parse on its own (or the original did not parse), the whole new file is
+    parsed so the error message carries the right line numbers.
+
+    Returns:
+        the syntax error message, or "" if the patched file is valid
+    """
+    try:
+        tree = parse_cached(original, filename)
+    except SyntaxError:
+        tree = None
+
+    if tree is not None:
+        new_lines = split_lines(result.content)[0]
+        try:
+            for start, end, _ in affected_regions(tree, result.edits):
+                ast.parse("\n".join(new_lines[start:end]), filename=filename)
+            return ""
+        except SyntaxError:
+            pass  # confirm (and locate) with a full parse
+
+    try:
+        parse_cached(result.content, filename)
+        return ""
+    except SyntaxError as e:
+        return str(e)
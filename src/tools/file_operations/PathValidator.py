@@ -1,5 +1,7 @@
 from pathlib import Path
-from typing import Union
+from typing import Iterable, List, Optional, Union
+
+from .SandboxResolver import resolver_for
 
 def validate_path(file_path: Union[str, Path], root_dir: Union[str, Path]) -> bool:
     """
@@ -13,20 +15,22 @@ def validate_path(file_path: Union[str, Path], root_dir: Union[str, Path]) -> bo
         bool: True if safe, False if dangerous
     """
 
-    # Resolve both paths to absolute
-    root_dir = Path(root_dir).resolve()
-    file_path = Path(root_dir / file_path).resolve()
-
-    # 1️⃣ Check if file is inside the sandbox root
+    # Root resolved once per sandbox, target resolutions memoized (see SandboxResolver)
     try:
-        file_path.relative_to(root_dir)
-    except ValueError:
-        # File is outside root_dir → dangerous
+        return resolver_for(root_dir).validate(file_path) is not None
+    except (TypeError, ValueError, OSError):
         return False
 
-    # 2️⃣ Only allow .py files
-    if file_path.suffix != ".py":
-        return False
 
-    # ✅ Safe path
-    return True
+def validate_paths(file_paths: Iterable[Union[str, Path]], root_dir: Union[str, Path]) -> List[Optional[Path]]:
+    """
+    Validate many requested paths in one pass (the sandbox root is resolved once).
+
+    Args:
+        file_paths: user-requested file paths
+        root_dir (str | Path): sandbox root directory
+
+    Returns:
+        list: resolved Path for each safe path, None for each dangerous one (same order)
+    """
+    return resolver_for(root_dir).validate_many(file_paths)
@@ -0,0 +1,125 @@
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from . import WriteEvents
+
+# (st_mtime_ns, st_size, st_ino): any change means the cached content is stale
+Signature = Tuple[int, int, int]
+
+
+class ReadCache:
+    """
+    Bounded LRU cache of decoded file contents for the read tools.
+
+    Every lookup costs one `os.stat`: an entry is only served if the file's
+    (mtime_ns, size, inode) still match, so external edits are always seen.
+    Writes made through WriteTool also drop the entry immediately.
+    Files above `mmap_threshold` bytes are decoded straight from a memory map
+    instead of being copied into an intermediate buffer first.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        mmap_threshold: int = 1024 * 1024,
+        max_entry_bytes: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_entries: maximum number of cached files
+            max_bytes: maximum total size of cached contents
+            mmap_threshold: files at least this large are read through mmap
+            max_entry_bytes: larger files are served but not cached (default: max_bytes // 8)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.mmap_threshold = mmap_threshold
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Signature, str]]" = OrderedDict()
+        self._total = 0
+
+    def read_text(self, path: Union[str, Path]) -> str:
+        """
+        Return the UTF-8 content of a file (universal newlines, like open() in text mode).
+
+        Raises:
+            OSError / UnicodeDecodeError: same errors as a plain read
+        """
+        key = str(path)
+        st = os.stat(key)
+        sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == sig:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        content = self._load(key, st.st_size)
+        if st.st_size <= self.max_entry_bytes:
+            with self._lock:
+                self._drop(key)
+                self._entries[key] = (sig, content)
+                self._total += st.st_size
+                self._evict()
+        return content
+
+    def _load(self, path: str, size: int) -> str:
+        with open(path, "rb") as f:
+            if size and size >= self.mmap_threshold:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    content = str(mm, "utf-8")
+            else:
+                content = f.read().decode("utf-8")
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        return content
+
+    def invalidate(self, path: Union[str, Path, None] = None) -> None:
+        """Drop one file (or everything when path is None)."""
+        with self._lock:
+            if path is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._total = 0
+            elif str(path) in self._entries:
+                self.invalidations += 1
+                self._drop(str(path))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total -= entry[0][1]
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._total > self.max_bytes):
+            _, (sig, _) = self._entries.popitem(last=False)
+            self._total -= sig[1]
+
+    def _on_write(self, event: WriteEvents.WriteEvent) -> None:
+        self.invalidate(event.path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+# Shared instance used by ReadTool; kept coherent with WriteTool writes
+READ_CACHE = ReadCache()
+WriteEvents.subscribe(READ_CACHE._on_write)
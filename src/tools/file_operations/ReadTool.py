@@ -1,55 +1,182 @@
 from langchain.tools import BaseTool
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Tuple
 
-from .PathValidator import validate_path
+from .AsyncExecutor import IO_EXECUTOR
+from .ReadCache import READ_CACHE
 from . import SandboxSetup
+from ..analysis.SymbolIndex import find_symbol, list_symbols
 
 class ReadTool(BaseTool):
+    """
+    Tool that reads a file inside the sandbox.
+
+    Contents are served through the shared READ_CACHE (see ReadCache), so repeated
+    reads of an unchanged file skip the disk; `ReadTool.cache_stats()` exposes
+    the hit/miss counters.
+
+    Besides whole-file reads, the tool can return a line range, a byte range or a
+    single function/class (`symbol`), so agents only pay for the code they need.
+    `iter_chunks` streams a file without holding it fully in memory.
+    """
+
     name = "read file"
     description: str = (
         "Reads and returns the content of a file. "
         "Input should be a file path as string. "
+        "Optional: start_line/end_line (1-based, inclusive) to read a line range, "
+        "start_byte/end_byte for a byte range, or symbol (e.g. 'MyClass.method') "
+        "to read a single function or class. "
         "Returns the file content as text."
     )
 
-    def _run(self, file_path: str) -> str:
+    def _resolve(self, file_path: str) -> Tuple[Optional[Path], str]:
+        """Validate a sandbox file path; returns (resolved path, "") or (None, error message)."""
+        # Ensure sandbox is configured
+        if SandboxSetup.SANDBOX_ROOT is None:
+            return None, "Error: Sandbox not initialized"
+
+        # Validate path against sandbox rules (memoized by the sandbox resolver)
+        path = SandboxSetup.get_resolver().validate(file_path)
+        if path is None:
+            return None, f"Error: Unsafe or invalid file path: {file_path}"
+
+        if not path.is_file():
+            return None, f"Error: The file at {file_path} does not exist."
+        return path, ""
+
+    def _run(
+        self,
+        file_path: str,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        start_byte: Optional[int] = None,
+        end_byte: Optional[int] = None,
+        symbol: Optional[str] = None,
+    ) -> str:
         """
         Read file content from the given path.
-        
+
         Args:
             file_path: Path to the file to read
-            
+            start_line: first line to return (1-based, inclusive)
+            end_line: last line to return (1-based, inclusive)
+            start_byte: first byte offset to return
+            end_byte: byte offset where reading stops (exclusive)
+            symbol: qualified or unambiguous name of a function/class to return
+
         Returns:
             File content as string or error message
         """
+        path, error = self._resolve(file_path)
+        if path is None:
+            return error
 
-        # Ensure sandbox is configured
-        if SandboxSetup.SANDBOX_ROOT is None:
-            return "Error: Sandbox not initialized"
+        if start_byte is not None or end_byte is not None:
+            return self._read_bytes(path, start_byte or 0, end_byte)
 
-        # Validate path against sandbox rules
         try:
-            ok = validate_path(file_path, SandboxSetup.SANDBOX_ROOT)
+            # Served from the shared cache when the file is unchanged since the last read
+            content = READ_CACHE.read_text(path)
         except Exception as e:
-            return f"Error validating path: {e}"
+            return f"Error reading file: {str(e)}"
 
-        if not ok:
-            return f"Error: Unsafe or invalid file path: {file_path}"
+        if symbol is not None:
+            try:
+                span = find_symbol(content, symbol)
+            except SyntaxError as e:
+                return f"Error: Cannot index symbols, invalid Python syntax - {e}"
+            if span is None:
+                available = ", ".join(list_symbols(content)[:50])
+                return f"Error: Symbol '{symbol}' not found or ambiguous in {file_path}. Available: {available}"
+            start_line, end_line = span
 
-        path = Path(SandboxSetup.SANDBOX_ROOT) / file_path
-        path = path.resolve()
+        if start_line is not None or end_line is not None:
+            lines = content.splitlines(keepends=True)
+            start = max(1, start_line or 1)
+            end = len(lines) if end_line is None else end_line
+            if start > end:
+                return f"Error: Invalid line range {start_line}-{end_line}"
+            return "".join(lines[start - 1:end])
 
-        if not path.is_file():
-            return f"Error: The file at {file_path} does not exist."
+        return content
 
+    def _read_bytes(self, path: Path, start: int, end: Optional[int]) -> str:
+        """Read a byte range straight from disk (multi-byte characters cut at the edges are replaced)."""
+        if start < 0 or (end is not None and end < start):
+            return f"Error: Invalid byte range {start}-{end}"
         try:
-            with path.open("r", encoding="utf-8") as file:
-                content = file.read()
-            return content
+            with path.open("rb") as f:
+                f.seek(start)
+                data = f.read() if end is None else f.read(end - start)
+            return data.decode("utf-8", errors="replace")
         except Exception as e:
             return f"Error reading file: {str(e)}"
 
-    async def _arun(self, file_path: str) -> str:
-        """Asynchronous read of the contents of a file."""
-        return self._run(file_path)
\ No newline at end of file
+    def iter_chunks(
+        self,
+        file_path: str,
+        chunk_size: int = 64 * 1024,
+        whole_lines: bool = True,
+        max_line: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Stream a file as text chunks without loading it fully in memory.
+
+        Args:
+            file_path: Path to the file to read
+            chunk_size: approximate number of characters per chunk
+            whole_lines: only split chunks at line boundaries
+            max_line: longest partial line held back to complete it (default 4 * chunk_size);
+                a longer line (minified or generated data) is emitted in pieces
+
+        Yields:
+            text chunks; an invalid path yields a single error message, and a read or
+            decoding error ends the stream with an "Error reading file: ..." chunk
+        """
+        path, error = self._resolve(file_path)
+        if path is None:
+            yield error
+            return
+
+        max_line = max_line or 4 * chunk_size
+        carry = ""
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                while True:
+                    block = f.read(chunk_size)
+                    if not block:
+                        break
+                    if whole_lines:
+                        block = carry + block
+                        cut = block.rfind("\n") + 1
+                        if cut == 0:
+                            if len(block) < max_line:
+                                carry = block
+                                continue
+                            cut = len(block)
+                        block, carry = block[:cut], block[cut:]
+                    yield block
+        except (OSError, UnicodeDecodeError) as e:
+            # binary or unreadable file: end the stream with an error chunk, like _run
+            yield f"Error reading file: {str(e)}"
+            return
+        if carry:
+            yield carry
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """Hit/miss/invalidation counters of the shared read cache."""
+        return READ_CACHE.stats()
+
+    async def _arun(
+        self,
+        file_path: str,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        start_byte: Optional[int] = None,
+        end_byte: Optional[int] = None,
+        symbol: Optional[str] = None,
+    ) -> str:
+        """Asynchronous read: the file I/O runs on the bounded tool executor, not on the event loop."""
+        return await IO_EXECUTOR.run(self._run, file_path, start_line, end_line, start_byte, end_byte, symbol)
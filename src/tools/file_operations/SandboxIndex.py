@@ -0,0 +1,504 @@
+import bisect
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from .DirectoryScanner import DEFAULT_IGNORES, GitIgnore, iter_directory
+from . import WriteEvents
+
+# Files larger than this are indexed without a content hash
+MAX_HASH_BYTES = 16 * 1024 * 1024
+
+
+@dataclass(slots=True)
+class IndexedFile:
+    """Indexed state of one sandbox file."""
+
+    path: str  # relative to the sandbox root, POSIX separators
+    size: int
+    mtime_ns: int
+    digest: Optional[str]  # sha256 of the content (None above MAX_HASH_BYTES or not hashed yet)
+    generation: int  # index generation of the last change
+
+
+@dataclass(slots=True)
+class FileChange:
+    generation: int
+    path: str
+    kind: str  # "added", "modified" or "deleted"
+
+
+def _hash_file(path: str, size: int) -> Optional[str]:
+    if size > MAX_HASH_BYTES:
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class SandboxIndex:
+    """
+    In-memory index of the sandbox files (size, mtime, sha256) with a change log.
+
+    Built once by `setup_project_sandbox` from stat data only: contents are
+    hashed when a file changes or when `digest()` is asked for it, so setup
+    does not read the whole repository. Then kept current incrementally:
+    writes made through the tools update it directly (write events), and
+    `start_watching()` follows external changes with inotify on Linux or a
+    polling thread elsewhere. Every change bumps `generation`; callers keep
+    the generation of an iteration and later ask `changes_since(generation)`,
+    which costs O(changes) instead of re-scanning the repository.
+
+    The same ignore rules as the directory scanner apply (_sandbox_backup,
+    logs, __pycache__, .git and the root .gitignore).
+    """
+
+    def __init__(self, root: Union[str, Path], max_changes: int = 100_000, on_directory_change: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            root: sandbox root
+            max_changes: change log length; older generations fall back to "everything changed"
+            on_directory_change: called when directories appear or disappear
+                (used to invalidate the sandbox path resolver)
+        """
+        self.root = Path(root).resolve()
+        self.max_changes = max_changes
+        self.on_directory_change = on_directory_change
+        self.generation = 0
+        self._files: Dict[str, IndexedFile] = {}
+        self._changes: List[FileChange] = []
+        self._change_generations: List[int] = []
+        self._oldest_generation = 0
+        self._lock = threading.RLock()
+        self._ignored_names = frozenset(DEFAULT_IGNORES)
+        self._gitignore = GitIgnore()
+        self._gitignore.add_file(self.root / ".gitignore")
+        self._watcher: Optional["_Watcher"] = None
+
+    # ---- building & updating -----------------------------------------------
+
+    def build(self, hash_files: bool = False) -> "SandboxIndex":
+        """
+        Scan the whole sandbox (done once, at setup).
+
+        Args:
+            hash_files: hash every file now instead of on demand. Without it, a
+                file rewritten with identical content before being hashed is
+                reported once as modified.
+        """
+        files = {}
+        for entry in iter_directory(self.root, include_dirs=False):
+            full = os.path.join(self.root, entry.path)
+            try:
+                st = os.stat(full)
+                digest = _hash_file(full, st.st_size) if hash_files else None
+            except OSError:
+                continue
+            files[entry.path] = IndexedFile(entry.path, st.st_size, st.st_mtime_ns, digest, 0)
+        with self._lock:
+            self._files = files
+        return self
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        parts = rel_path.split("/")
+        if any(p in self._ignored_names for p in parts):
+            return True
+        return bool(self._gitignore.rules) and self._gitignore.ignored(rel_path, is_dir)
+
+    def _record(self, path: str, kind: str) -> int:
+        self.generation += 1
+        self._changes.append(FileChange(self.generation, path, kind))
+        self._change_generations.append(self.generation)
+        if len(self._changes) > self.max_changes:
+            drop = len(self._changes) - self.max_changes
+            self._oldest_generation = self._changes[drop - 1].generation
+            del self._changes[:drop]
+            del self._change_generations[:drop]
+        return self.generation
+
+    def refresh_path(self, rel_path: str, content: Optional[bytes] = None) -> Optional[str]:
+        """
+        Re-check one file (stat, and hash only if size/mtime moved).
+
+        Args:
+            rel_path: path relative to the root
+            content: bytes just written, if known (saves re-reading the file)
+
+        Returns:
+            the change kind recorded, or None if nothing changed
+        """
+        if self.is_ignored(rel_path):
+            return None
+        full = os.path.join(self.root, rel_path)
+        try:
+            st = os.stat(full)
+            exists = not stat.S_ISDIR(st.st_mode)
+        except OSError:
+            exists = False
+
+        with self._lock:
+            current = self._files.get(rel_path)
+            if not exists:
+                if current is None:
+                    return None
+                del self._files[rel_path]
+                self._record(rel_path, "deleted")
+                return "deleted"
+            if current is not None and current.size == st.st_size and current.mtime_ns == st.st_mtime_ns:
+                return None
+
+        try:
+            if content is not None and len(content) == st.st_size:
+                digest = hashlib.sha256(content).hexdigest() if st.st_size <= MAX_HASH_BYTES else None
+            else:
+                digest = _hash_file(full, st.st_size)
+        except OSError:
+            return None
+
+        with self._lock:
+            current = self._files.get(rel_path)
+            if current is not None and current.digest == digest and digest is not None:
+                # touched but identical: refresh the stat data without a new generation
+                current.size, current.mtime_ns = st.st_size, st.st_mtime_ns
+                return None
+            kind = "added" if current is None else "modified"
+            generation = self._record(rel_path, kind)
+            self._files[rel_path] = IndexedFile(rel_path, st.st_size, st.st_mtime_ns, digest, generation)
+            return kind
+
+    def refresh_directory(self, rel_dir: str = "") -> int:
+        """
+        Reconcile a subtree with the disk (polling pass, or after a directory event).
+
+        Returns:
+            number of changes recorded
+        """
+        base = self.root / rel_dir if rel_dir else self.root
+        prefix = rel_dir + "/" if rel_dir else ""
+        seen = set()
+        changes = 0
+        if base.is_dir():
+            for entry in iter_directory(base, include_dirs=False, gitignore_root=self.root):
+                rel = prefix + entry.path
+                seen.add(rel)
+                if self.refresh_path(rel):
+                    changes += 1
+        with self._lock:
+            gone = [p for p in self._files if p.startswith(prefix) and p not in seen]
+        for rel in gone:
+            if self.refresh_path(rel):
+                changes += 1
+        return changes
+
+    def refresh(self) -> int:
+        """Full reconciliation with the disk; returns the number of changes recorded."""
+        return self.refresh_directory("")
+
+    def _on_write(self, event: WriteEvents.WriteEvent) -> None:
+        try:
+            event.path.relative_to(self.root)
+        except ValueError:
+            return
+        self.refresh_path(event.relative_path, event.new_content.encode("utf-8"))
+
+    def _directories_changed(self) -> None:
+        if self.on_directory_change is not None:
+            self.on_directory_change()
+
+    # ---- queries -----------------------------------------------------------
+
+    def get(self, rel_path: str) -> Optional[IndexedFile]:
+        with self._lock:
+            return self._files.get(rel_path)
+
+    def digest(self, rel_path: str) -> Optional[str]:
+        """sha256 of an indexed file, hashed on first request (None if not indexed or too large)."""
+        with self._lock:
+            entry = self._files.get(rel_path)
+        if entry is None or entry.digest is not None:
+            return entry.digest if entry is not None else None
+        full = os.path.join(self.root, rel_path)
+        try:
+            digest = _hash_file(full, entry.size)
+            st = os.stat(full)
+        except OSError:
+            return None
+        with self._lock:
+            # only keep it if the file did not move under us (the next refresh will see it)
+            if self._files.get(rel_path) is entry and (entry.size, entry.mtime_ns) == (st.st_size, st.st_mtime_ns):
+                entry.digest = digest
+        return digest
+
+    def files(self, suffix: Optional[str] = None) -> List[IndexedFile]:
+        with self._lock:
+            items = list(self._files.values())
+        if suffix is not None:
+            items = [f for f in items if f.path.endswith(suffix)]
+        return sorted(items, key=lambda f: f.path)
+
+    def changes_since(self, generation: int) -> List[FileChange]:
+        """
+        Net changes after `generation`, one entry per path: a file added then
+        deleted is not reported, deleted then re-created counts as modified.
+
+        If the change log no longer reaches back that far, every indexed file is
+        reported as modified.
+        """
+        with self._lock:
+            if generation < self._oldest_generation:
+                return [FileChange(self.generation, p, "modified") for p in sorted(self._files)]
+            start = bisect.bisect_right(self._change_generations, generation)
+            first: Dict[str, str] = {}
+            latest: Dict[str, FileChange] = {}
+            for change in self._changes[start:]:
+                first.setdefault(change.path, change.kind)
+                latest[change.path] = change
+
+        net = []
+        for path, change in latest.items():
+            if first[path] == "added":
+                if change.kind == "deleted":
+                    continue
+                kind = "added"
+            else:
+                kind = "deleted" if change.kind == "deleted" else "modified"
+            net.append(FileChange(change.generation, path, kind))
+        return sorted(net, key=lambda c: c.generation)
+
+    def changed_files_since(self, generation: int, suffix: Optional[str] = ".py") -> List[str]:
+        """Paths added or modified since `generation` that still exist (e.g. to re-lint only those)."""
+        return [
+            c.path for c in self.changes_since(generation)
+            if c.kind != "deleted" and (suffix is None or c.path.endswith(suffix))
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "generation": self.generation,
+                "changes_logged": len(self._changes),
+                "watcher": type(self._watcher).__name__ if self._watcher else None,
+            }
+
+    # ---- watching ----------------------------------------------------------
+
+    def start_watching(self, mode: str = "auto", interval: float = 1.0) -> str:
+        """
+        Follow external changes in a background thread.
+
+        Args:
+            mode: "auto" (inotify on Linux, else polling), "inotify" or "poll"
+            interval: polling period in seconds (also the inotify wake-up period)
+
+        Returns:
+            the mode actually used
+        """
+        self.stop_watching()
+        watcher: Optional[_Watcher] = None
+        if mode in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                watcher = _InotifyWatcher(self, interval)
+            except OSError:
+                if mode == "inotify":
+                    raise
+        if watcher is None:
+            watcher = _PollingWatcher(self, interval)
+        self._watcher = watcher
+        watcher.start()
+        return watcher.mode
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def attach(self) -> "SandboxIndex":
+        """Keep the index in sync with writes made through the tools."""
+        WriteEvents.subscribe(self._on_write)
+        return self
+
+    def close(self) -> None:
+        WriteEvents.unsubscribe(self._on_write)
+        self.stop_watching()
+
+
+class _Watcher(ABC):
+    mode = ""
+
+    def __init__(self, index: SandboxIndex, interval: float):
+        self.index = index
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name=f"sandbox-index-{self.mode}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    @abstractmethod
+    def _loop(self) -> None:
+        """Body of the watcher thread; returns once `_stop` is set."""
+
+
+class _PollingWatcher(_Watcher):
+    mode = "poll"
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.index.refresh()
+            except Exception as e:
+                print(f"Warning: sandbox index refresh failed: {e}")
+
+
+# inotify(7) constants
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE | _IN_ATTRIB | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE
+    | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _InotifyWatcher(_Watcher):
+    """Linux inotify through ctypes: one watch per (non-ignored) directory."""
+
+    mode = "inotify"
+
+    def __init__(self, index: SandboxIndex, interval: float):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        self._dirs: Dict[int, str] = {}
+        super().__init__(index, interval)
+        try:
+            self._watch_tree("")
+        except OSError:
+            os.close(fd)
+            raise
+
+    def _add_watch(self, rel_dir: str) -> None:
+        full = os.path.join(self.index.root, rel_dir) if rel_dir else str(self.index.root)
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(full), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch failed for {full}: {os.strerror(err)}")
+        self._dirs[wd] = rel_dir
+
+    def _watch_tree(self, rel_dir: str) -> None:
+        self._add_watch(rel_dir)
+        base = os.path.join(self.index.root, rel_dir) if rel_dir else str(self.index.root)
+        prefix = rel_dir + "/" if rel_dir else ""
+        for entry in iter_directory(base, gitignore_root=self.index.root):
+            if entry.is_dir:
+                self._add_watch(prefix + entry.path)
+
+    def _loop(self) -> None:
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([self._fd], [], [], self.interval)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(self._fd, 256 * 1024)
+                except BlockingIOError:
+                    continue
+                try:
+                    self._handle(data)
+                except Exception as e:
+                    print(f"Warning: sandbox index update failed: {e}")
+        finally:
+            os.close(self._fd)
+
+    def _move_watches(self, old: str, new: Optional[str]) -> None:
+        """Re-map the watches of a moved directory tree (new=None: moved out of the sandbox or ignored)."""
+        prefix = old + "/"
+        for wd, rel_dir in list(self._dirs.items()):
+            if rel_dir != old and not rel_dir.startswith(prefix):
+                continue
+            if new is None:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+            else:
+                self._dirs[wd] = new + rel_dir[len(old):]
+
+    def _handle(self, data: bytes) -> None:
+        paths = set()
+        rescans = set()
+        moved_from: Dict[int, str] = {}  # cookie -> old path of a directory moved away
+        directories_changed = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size: offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+
+            if mask & _IN_Q_OVERFLOW:
+                rescans.add("")
+                directories_changed = True
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            rel_dir = self._dirs.get(wd)
+            if rel_dir is None or not name:
+                continue
+            rel = (rel_dir + "/" if rel_dir else "") + os.fsdecode(name)
+            if mask & _IN_ISDIR:
+                directories_changed = True
+                if mask & _IN_MOVED_FROM:
+                    moved_from[cookie] = rel
+                if self.index.is_ignored(rel, is_dir=True):
+                    continue
+                if mask & _IN_MOVED_TO and cookie in moved_from:
+                    # moved inside the sandbox: the watches follow the inode
+                    self._move_watches(moved_from.pop(cookie), rel)
+                elif mask & (_IN_CREATE | _IN_MOVED_TO):
+                    try:
+                        self._watch_tree(rel)
+                    except OSError:
+                        pass
+                rescans.add(rel)
+            elif not self.index.is_ignored(rel):
+                paths.add(rel)
+
+        for old in moved_from.values():
+            self._move_watches(old, None)
+        if directories_changed:
+            self.index._directories_changed()
+        for rel in rescans:
+            self.index.refresh_directory(rel)
+        for rel in paths:
+            self.index.refresh_path(rel)
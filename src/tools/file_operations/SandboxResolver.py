@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+
+class SandboxResolver:
+    """
+    Resolves and validates paths inside one sandbox, with memoization.
+
+    The root is resolved once. Each requested path is resolved with a single
+    `os.path.realpath` and the outcome is memoized, so a repeated tool call
+    costs one dict lookup and returns the same cached Path object.
+
+    Memoized results are dropped when `invalidate()` bumps the generation
+    (directory watchers call it when directories are created, moved or
+    removed) and expire after `ttl` seconds, so a directory swapped for a
+    symlink from outside is noticed quickly. Writes made by the tools never
+    need an invalidation: they only create regular files and directories,
+    which cannot change where an already-resolved path points.
+    """
+
+    def __init__(self, root: Union[str, Path], ttl: float = 2.0, max_entries: int = 65536):
+        """
+        Args:
+            root: sandbox root directory
+            ttl: seconds a memoized resolution stays valid
+            max_entries: memo size; the memo is reset when it grows past it
+        """
+        self.root = Path(root).resolve()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._root_str = str(self.root)
+        self._prefix = os.path.join(self._root_str, "")
+        # requested path -> (generation, expiry, resolved path or None if outside)
+        self._memo: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _resolve_uncached(self, key: str) -> Optional[Path]:
+        try:
+            real = os.path.realpath(os.path.join(self._root_str, key))
+        except (OSError, ValueError):
+            return None
+        if real != self._root_str and not real.startswith(self._prefix):
+            return None
+        return Path(real)
+
+    def resolve(self, file_path: Union[str, Path]) -> Optional[Path]:
+        """
+        Resolve a path (relative to the root, or absolute) and check containment.
+
+        Returns:
+            the resolved absolute Path, or None if it falls outside the sandbox
+        """
+        key = file_path if isinstance(file_path, str) else os.fspath(file_path)
+        entry = self._memo.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[0] == self.generation and entry[1] > now:
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        result = self._resolve_uncached(key)
+        with self._lock:
+            if len(self._memo) >= self.max_entries:
+                self._memo.clear()
+            self._memo[key] = (self.generation, now + self.ttl, result)
+        return result
+
+    def validate(self, file_path: Union[str, Path]) -> Optional[Path]:
+        """Resolved path if it is a safe Python file path (inside the sandbox, .py), else None."""
+        path = self.resolve(file_path)
+        if path is None or path.suffix != ".py":
+            return None
+        return path
+
+    def validate_many(self, file_paths: Iterable[Union[str, Path]]) -> List[Optional[Path]]:
+        """`validate` for many paths at once (same order)."""
+        validate = self.validate
+        return [validate(p) for p in file_paths]
+
+    def relative(self, path: Path) -> str:
+        """POSIX path of a resolved sandbox path, relative to the root."""
+        text = str(path)
+        if text == self._root_str:
+            return "."
+        return text[len(self._prefix):].replace(os.sep, "/")
+
+    def invalidate(self) -> None:
+        """Forget every memoized resolution (call after directories changed)."""
+        with self._lock:
+            self.generation += 1
+            self._memo.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._memo), "hits": self.hits, "misses": self.misses, "generation": self.generation}
+
+
+_resolvers: Dict[str, SandboxResolver] = {}
+_resolvers_lock = threading.Lock()
+_MAX_RESOLVERS = 32
+
+
+def resolver_for(root: Union[str, Path]) -> SandboxResolver:
+    """Shared resolver of a root directory (created on first use)."""
+    key = os.path.abspath(root)
+    resolver = _resolvers.get(key)
+    if resolver is None:
+        with _resolvers_lock:
+            resolver = _resolvers.get(key)
+            if resolver is None:
+                if len(_resolvers) >= _MAX_RESOLVERS:
+                    _resolvers.clear()
+                resolver = _resolvers[key] = SandboxResolver(root)
+    return resolver
+
+
+def register_resolver(root: Union[str, Path], resolver: SandboxResolver) -> None:
+    """Make `resolver` the shared resolver of root (used by setup_project_sandbox)."""
+    with _resolvers_lock:
+        _resolvers[os.path.abspath(root)] = resolver
+        _resolvers[str(resolver.root)] = resolver
@@ -1,24 +1,38 @@
 from pathlib import Path
 from typing import Optional
 
+from .SandboxIndex import SandboxIndex
+from .SandboxResolver import SandboxResolver, register_resolver, resolver_for
+
 
 
 SANDBOX_ROOT: Optional[Path] = None
 
+# Path resolver of the current sandbox (root resolved once, memoized validations)
+SANDBOX_RESOLVER: Optional[SandboxResolver] = None
+
+# File index of the current sandbox (sizes, mtimes, hashes, change log)
+SANDBOX_INDEX: Optional[SandboxIndex] = None
 
 
-def setup_project_sandbox(project_root):
+
+def setup_project_sandbox(project_root, build_index: bool = True, watch: bool = False):
     """
     Initialize the secure sandbox environment.
 
     Args:
         project_root (str | Path): Path to the Python project.
+        build_index (bool): index every file (size, mtime; contents are hashed
+            lazily) so changes can later be queried with
+            SANDBOX_INDEX.changes_since(generation)
+        watch (bool): keep the index current with external changes too
+            (inotify on Linux, polling elsewhere); tool writes are always tracked
 
     Returns:
         Path: validated absolute sandbox path
     """
 
-    global SANDBOX_ROOT
+    global SANDBOX_ROOT, SANDBOX_RESOLVER, SANDBOX_INDEX
 
     # 1️⃣ Resolve absolute path
     root = Path(project_root).resolve()
@@ -30,15 +44,43 @@ def setup_project_sandbox(project_root):
 
     # 3️⃣ Store globally
     SANDBOX_ROOT = root
+    SANDBOX_RESOLVER = SandboxResolver(root)
+    register_resolver(root, SANDBOX_RESOLVER)
 
-    # 4️⃣ Backup folder
+    # 4️⃣ Backup folder (commits interrupted by a crash are rolled back first)
     backup_dir = root / "_sandbox_backup"
     backup_dir.mkdir(exist_ok=True)
+    from .WriteTransaction import WriteTransaction
+    recovered = WriteTransaction.recover(root)
+    if recovered:
+        print(f"Warning: rolled back {recovered} interrupted transaction(s) in {root}")
 
     # 5️⃣ Logs folder
     logs_dir = root / "logs"
     logs_dir.mkdir(exist_ok=True)
 
+    # 6️⃣ File index (replaces the one of a previous sandbox)
+    if SANDBOX_INDEX is not None:
+        SANDBOX_INDEX.close()
+        SANDBOX_INDEX = None
+    if build_index:
+        SANDBOX_INDEX = SandboxIndex(root, on_directory_change=SANDBOX_RESOLVER.invalidate).build().attach()
+        if watch:
+            SANDBOX_INDEX.start_watching()
    
 
     return SANDBOX_ROOT
+
+
+def get_resolver() -> Optional[SandboxResolver]:
+    """
+    Resolver of the current sandbox, or None if it is not initialized.
+
+    Follows SANDBOX_ROOT even if it was reassigned without setup_project_sandbox.
+    """
+    resolver = SANDBOX_RESOLVER
+    if SANDBOX_ROOT is None:
+        return None
+    if resolver is not None and (SANDBOX_ROOT is resolver.root or SANDBOX_ROOT == resolver.root):
+        return resolver
+    return resolver_for(SANDBOX_ROOT)
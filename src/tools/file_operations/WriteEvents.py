@@ -0,0 +1,72 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+WriteListener = Callable[["WriteEvent"], None]
+
+
+@dataclass(frozen=True)
+class WriteEvent:
+    """
+    A file successfully written inside the sandbox.
+
+    Attributes:
+        path: absolute resolved path of the written file
+        relative_path: path relative to the sandbox root (POSIX separators)
+        new_content: content now on disk
+        old_content: previous content, only filled when a listener asked for it
+            (None if the file did not exist or no listener needs it)
+        backup: backup reference returned by the writer, if any
+    """
+
+    path: Path
+    relative_path: str
+    new_content: str
+    old_content: Optional[str] = None
+    backup: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+_lock = threading.Lock()
+_listeners: List[Tuple[WriteListener, bool]] = []
+
+
+def subscribe(listener: WriteListener, with_old_content: bool = False) -> WriteListener:
+    """
+    Register a callback invoked after every successful write.
+
+    Args:
+        listener: callable receiving a WriteEvent
+        with_old_content: ask writers to capture the previous file content
+
+    Returns:
+        the listener (so it can be used as a decorator)
+    """
+    with _lock:
+        _listeners.append((listener, with_old_content))
+    return listener
+
+
+def unsubscribe(listener: WriteListener) -> None:
+    with _lock:
+        # bound methods are recreated on each access: compare by equality
+        _listeners[:] = [(l, old) for l, old in _listeners if l != listener]
+
+
+def wants_old_content() -> bool:
+    """True if a listener needs the previous content (writers read it before writing)."""
+    with _lock:
+        return any(old for _, old in _listeners)
+
+
+def publish(event: WriteEvent) -> None:
+    """Notify all listeners; a failing listener never fails the write itself."""
+    with _lock:
+        listeners = [l for l, _ in _listeners]
+    for listener in listeners:
+        try:
+            listener(event)
+        except Exception as e:
+            print(f"Warning: write listener {getattr(listener, '__name__', listener)} failed: {e}")
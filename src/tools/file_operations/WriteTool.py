@@ -2,12 +2,14 @@ from langchain.tools import BaseTool
 from pathlib import Path
 from typing import Optional
 import tempfile
-import shutil
-import ast
 import os
 
-from .PathValidator import validate_path
 from . import SandboxSetup
+from . import WriteEvents
+from .AsyncExecutor import IO_EXECUTOR
+from .BackupStore import get_backup_store
+from .PatchApplier import PatchError, apply_patch, patched_syntax_error
+from ..analysis.AstCache import parse_cached
 
 
 class WriteTool(BaseTool):
@@ -16,9 +18,14 @@ class WriteTool(BaseTool):
         "Writes content to a file. "
         "Input should be a JSON string with 'file_path' and 'content' keys. "
         "Example: {\"file_path\": \"path/to/file.py\", \"content\": \"print('hello')\"} "
-        "Creates parent directories if they don't exist."
+        "Creates parent directories if they don't exist. "
+        "For small changes send 'patch' instead of 'content': a unified diff or "
+        "search/replace blocks (<<<<<<< SEARCH / ======= / >>>>>>> REPLACE) "
+        "applied to the current file; conflicting hunks fail without writing."
     )
     create_backup: bool = True
+    max_file_size: int = 5 * 1024 * 1024  # 5 MB
+    validate_python: bool = True
 
     def __init__(
         self, 
@@ -39,14 +46,17 @@ class WriteTool(BaseTool):
         self.validate_python = True
 
     def _validate_python_syntax(self, content: str) -> tuple[bool, str]:
-        """Validate Python syntax for given content using ast.parse."""
+        """Validate Python syntax for given content.
+
+        The tree is kept in the shared AST cache so post-write analysis reuses it.
+        """
         try:
-            ast.parse(content)
+            parse_cached(content)
             return True, ""
         except SyntaxError as e:
             return False, str(e)
 
-    def _write_atomically(self, path: Path, content: str) -> tuple[bool, str]:
+    def write_atomic(self, path: Path, content: str) -> tuple[bool, str]:
         """Write content to a temp file then atomically replace the destination.
 
         Returns (success: bool, message: str).
@@ -74,33 +84,34 @@ class WriteTool(BaseTool):
 
     def _create_backup(self, file_path: Path) -> Optional[str]:
         """
-        Create a timestamped backup of existing file.
+        Save the current content of an existing file in the sandbox backup store.
+
+        Versions are content-addressed and deduplicated (see BackupStore), so an
+        unchanged file costs nothing and versions never collide.
         
         Args:
             file_path: Path to file to backup
             
         Returns:
-            Path to backup file or None if file doesn't exist
+            Backup reference "<relative path>@v<version>" or None if file doesn't exist
         """
         if not file_path.exists():
             return None
         
         try:
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = file_path.parent / f"{file_path.stem}.backup_{timestamp}{file_path.suffix}"
-            shutil.copy2(file_path, backup_path)
-            return str(backup_path)
+            entry = get_backup_store(SandboxSetup.SANDBOX_ROOT).snapshot(file_path, SandboxSetup.SANDBOX_ROOT)
+            return f"{entry.path}@v{entry.version}"
         except Exception as e:
             return f"Backup failed: {str(e)}"
 
-    def _run(self, file_path: str, content: str) -> str:
+    def _run(self, file_path: str, content: Optional[str] = None, patch: Optional[str] = None) -> str:
         """
         Write content to file with safety checks.
         
         Args:
             file_path: Path where to write the file
             content: Content to write to the file
+            patch: Unified diff or search/replace blocks to apply instead of content
             
         Returns:
             Success message or error description
@@ -108,20 +119,51 @@ class WriteTool(BaseTool):
         # Ensure sandbox is configured
         if SandboxSetup.SANDBOX_ROOT is None:
             return "Error: Sandbox not initialized"
+        if (content is None) == (patch is None):
+            return "Error: Provide either 'content' or 'patch'"
+
+        # Validate path (.py and containment, memoized by the sandbox resolver)
+        resolver = SandboxSetup.get_resolver()
+        path = resolver.validate(file_path)
+        if path is None:
+            return f"Error: Unsafe or invalid file path: {file_path}"
+
+        if patch is not None:
+            return self._apply_patch(path, file_path, patch, resolver.root)
+
+        error = self.validate_content(path, content)
+        if error:
+            return error
+        return self._write_resolved(path, file_path, content, resolver.root)
+
+    def _apply_patch(self, path: Path, file_path: str, patch: str, root: Path) -> str:
+        """
+        Apply a patch to the current file, then write the result like a full write.
 
-        # Validate path (PathValidator enforces .py and containment)
+        Only the top-level definitions touched by the patch are re-parsed for
+        the syntax check (see PatchApplier.patched_syntax_error).
+        """
         try:
-            ok = validate_path(file_path, SandboxSetup.SANDBOX_ROOT)
-        except Exception as e:
-            return f"Error validating path: {e}"
+            original = path.read_text(encoding="utf-8") if path.exists() else ""
+        except (OSError, UnicodeDecodeError) as e:
+            return f"Error: Cannot read file to patch: {e}"
+        try:
+            result = apply_patch(original, patch)
+        except PatchError as e:
+            return f"Error: Patch does not apply - {e}"
 
-        if not ok:
-            return f"Error: Unsafe or invalid file path: {file_path}"
+        error = self.validate_content(path, result.content, check_syntax=False)
+        if not error and self.validate_python and path.suffix == '.py':
+            message = patched_syntax_error(original, result, file_path)
+            if message:
+                error = f"Error: Invalid Python syntax - {message}"
+        if error:
+            return error
+        summary = f"Applied {len(result.edits)} hunk(s) (+{result.added} -{result.removed} lines), wrote"
+        return self._write_resolved(path, file_path, result.content, root, verb=summary)
 
-        # Convert to Path object under sandbox
-        path = Path(SandboxSetup.SANDBOX_ROOT) / file_path
-        path = path.resolve()
-        
+    def validate_content(self, path: Path, content: str, check_syntax: bool = True) -> str:
+        """Size and syntax checks done before any write; returns an error message or ""."""
         # Check content size
         content_size = len(content.encode('utf-8'))
         if content_size > self.max_file_size:
@@ -130,13 +172,37 @@ class WriteTool(BaseTool):
             return f"Error: Content too large ({size_mb:.2f}MB). Maximum: {max_mb:.2f}MB"
         
         # Validate Python syntax if it's a .py file and validation is enabled
-        if self.validate_python and path.suffix == '.py':
+        if check_syntax and self.validate_python and path.suffix == '.py':
             is_valid, error_msg = self._validate_python_syntax(content)
             if not is_valid:
                 return f"Error: Invalid Python syntax - {error_msg}"
-        
+        return ""
+
+    def _write_resolved(self, path: Path, file_path: str, content: str, root: Path, verb: str = "Wrote") -> str:
+        """
+        Back up, write and publish an already validated file.
+
+        Args:
+            path: resolved destination inside the sandbox
+            file_path: path as requested (used in messages)
+            content: content to write
+            root: resolved sandbox root
+            verb: how the success message starts
+
+        Returns:
+            Success message or error description
+        """
+        # Capture the previous content only if a write listener needs it
+        old_content = None
+        if WriteEvents.wants_old_content() and path.is_file():
+            try:
+                old_content = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                old_content = None
+
         # Create backup if file exists and backup is enabled
         backup_info = ""
+        backup_path = None
         if self.create_backup and path.exists():
             backup_path = self._create_backup(path)
             if backup_path:
@@ -144,11 +210,18 @@ class WriteTool(BaseTool):
         
         # Write file atomically
         try:
-            success, message = self._write_atomically(path, content)
+            success, message = self.write_atomic(path, content)
             
             if success:
                 file_size = path.stat().st_size
-                return f"Success: Wrote {file_size} bytes to {file_path}{backup_info}"
+                WriteEvents.publish(WriteEvents.WriteEvent(
+                    path=path,
+                    relative_path=path.relative_to(root).as_posix(),
+                    new_content=content,
+                    old_content=old_content,
+                    backup=backup_path,
+                ))
+                return f"Success: {verb} {file_size} bytes to {file_path}{backup_info}"
             else:
                 return f"Error: {message}"
                 
@@ -159,15 +232,36 @@ class WriteTool(BaseTool):
             return f"Error writing file: {str(e)}"
     
 
-    def _arun(self, file_path: str, content: str) -> str:
+    def transaction(self, keep_backup: bool = True):
         """
-        Async version - not implemented.
+        Open a WriteTransaction: edits staged through it are committed together
+        (or not at all) and the whole set can be rolled back in one call.
+
+        Args:
+            keep_backup: keep original snapshots after commit for a later rollback
+
+        Returns:
+            WriteTransaction bound to the current sandbox and this tool's checks
+        """
+        from .WriteTransaction import WriteTransaction
+        return WriteTransaction(writer=self, keep_backup=keep_backup)
+
+    async def _arun(self, file_path: str, content: Optional[str] = None, patch: Optional[str] = None) -> str:
+        """
+        Asynchronous write: validation, backup and the atomic write run on the
+        bounded tool executor, so the event loop keeps serving other agents.
+        Concurrent writes to the same file are applied in call order, so a
+        patch always sees the result of the previous write.
         
         Args:
             file_path: Path where to write the file
             content: Content to write to the file
+            patch: Unified diff or search/replace blocks to apply instead of content
             
-        Raises:
-            NotImplementedError: Async writing not supported
+        Returns:
+            Success message or error description
         """
-        raise NotImplementedError("Async writing not implemented")
\ No newline at end of file
+        resolver = SandboxSetup.get_resolver()
+        target = resolver.resolve(file_path) if resolver is not None else None
+        key = str(target) if target is not None else file_path
+        return await IO_EXECUTOR.run_exclusive(key, self._run, file_path, content, patch)
@@ -0,0 +1,413 @@
+import json
+import os
+import shutil
+import sys
+import threading
+import uuid
+import weakref
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from .PathValidator import validate_paths
+from . import SandboxSetup
+from . import WriteEvents
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+BACKUP_DIR_NAME = "_sandbox_backup"
+TXN_PREFIX = "txn-"
+# Next to each transaction directory; its owner holds an exclusive flock on it
+LOCK_SUFFIX = ".lock"
+
+# Linux ioctl that clones a file's extents (copy-on-write, e.g. btrfs / xfs)
+_FICLONE = 0x40049409
+
+
+class TransactionError(Exception):
+    """Raised when an edit is rejected or a transaction cannot be applied."""
+
+
+def _lock_owner(lock_path: Path) -> Optional[int]:
+    """
+    Open lock_path and take an exclusive, non-blocking flock on it.
+
+    Returns:
+        the locked file descriptor, or None if another owner (in any process) holds it
+    """
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+    return fd
+
+
+def _clone_file(src: Path, dst: Path) -> bool:
+    """Copy-on-write clone (reflink) of src into dst; False if unsupported."""
+    if not sys.platform.startswith("linux") or fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        try:
+            dst.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def snapshot_file(src: Path, dst: Path) -> str:
+    """
+    Keep the current content of src at dst as cheaply as the filesystem allows.
+
+    A hardlink is enough here because writers never modify files in place: the
+    destination is always swapped for a new inode with os.replace, so the old
+    inode stays untouched behind the link. Falls back to a reflink, then a copy.
+
+    Returns:
+        "hardlink", "reflink" or "copy"
+    """
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+    if _clone_file(src, dst):
+        return "reflink"
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+class WriteTransaction:
+    """
+    Stage several file writes and apply them together, with a single rollback.
+
+    Edits are written to `<sandbox>/_sandbox_backup/txn-<id>/` first; `commit()`
+    then snapshots each original (hardlink/reflink, no full copy) and swaps the
+    staged files in with os.replace. If any step fails, everything already
+    applied is restored, so the tree is never left half-fixed. A committed
+    transaction can still be rolled back (e.g. when the Judge rejects a fix);
+    rollback is one rename per file.
+
+    A manifest in the transaction directory makes an interrupted commit
+    recoverable with `WriteTransaction.recover()`. The owner keeps an exclusive
+    flock on `txn-<id>.lock` for as long as the transaction object lives, so
+    recovery, whatever the process, only touches transactions whose owner is gone.
+
+    Usage:
+        with WriteTool().transaction() as txn:
+            txn.write("a.py", new_a)
+            txn.write("b.py", new_b)
+        # committed on exit, rolled back if the block raised
+    """
+
+    def __init__(self, root: Optional[Union[str, Path]] = None, writer=None, keep_backup: bool = True):
+        """
+        Args:
+            root: sandbox root (default: SandboxSetup.SANDBOX_ROOT)
+            writer: WriteTool whose checks (size, Python syntax) apply to each edit
+            keep_backup: keep the original snapshots after commit, so the
+                transaction can be rolled back later (call `discard()` to drop them)
+        """
+        root = root if root is not None else SandboxSetup.SANDBOX_ROOT
+        if root is None:
+            raise TransactionError("Sandbox not initialized")
+        if writer is None:
+            from .WriteTool import WriteTool
+            writer = WriteTool(create_backup=False)
+        self.root = Path(root).resolve()
+        self.writer = writer
+        self.keep_backup = keep_backup
+        self.id = uuid.uuid4().hex[:12]
+        self.directory = self.root / BACKUP_DIR_NAME / f"{TXN_PREFIX}{self.id}"
+        self.state = "open"
+        # taken before the directory exists, released (by GC at the latest) after it is gone
+        self.directory.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.directory.with_name(self.directory.name + LOCK_SUFFIX)
+        lock_fd = _lock_owner(self._lock_path)
+        if lock_fd is None:
+            raise TransactionError(f"Transaction {self.id} is already owned")
+        self._release_lock = weakref.finalize(self, os.close, lock_fd)
+        self._lock = threading.Lock()
+        # relative path -> (slot, resolved path, content)
+        self._edits: Dict[str, tuple] = {}
+        self._applied: List[dict] = []
+        self._existed: Dict[str, bool] = {}
+
+    # ---- staging ---------------------------------------------------------
+
+    def write(self, file_path: str, content: str) -> None:
+        """
+        Stage a write (the last write to a path wins). Safe to call from several threads.
+
+        Raises:
+            TransactionError: invalid path, content rejected by the writer checks,
+                or transaction no longer open
+        """
+        if self.state != "open":
+            raise TransactionError(f"Transaction {self.id} is {self.state}")
+        path = validate_paths([file_path], self.root)[0]
+        if path is None:
+            raise TransactionError(f"Unsafe or invalid file path: {file_path}")
+        error = self.writer.validate_content(path, content)
+        if error:
+            raise TransactionError(f"{file_path}: {error}")
+
+        self.stage_resolved(path, content)
+
+    def stage_resolved(self, path: Path, content: str) -> None:
+        """Stage an already validated write (resolved path inside the sandbox)."""
+        rel = path.relative_to(self.root).as_posix()
+        with self._lock:
+            slot = self._edits[rel][0] if rel in self._edits else len(self._edits)
+            self._edits[rel] = (slot, path, content)
+        staged = self.directory / "staged" / str(slot)
+        staged.parent.mkdir(parents=True, exist_ok=True)
+        with open(staged, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    @property
+    def paths(self) -> List[str]:
+        """Relative paths staged so far."""
+        return sorted(self._edits)
+
+    # ---- commit / rollback -----------------------------------------------
+
+    def _save_manifest(self) -> None:
+        manifest = {
+            "id": self.id,
+            "state": self.state,
+            "files": [
+                {"slot": slot, "path": rel, "existed": self._existed.get(rel, False)}
+                for rel, (slot, _, _) in self._edits.items()
+            ],
+        }
+        tmp = self.directory / "manifest.json.tmp"
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, self.directory / "manifest.json")
+
+    def commit(self) -> List[str]:
+        """
+        Apply all staged writes.
+
+        Returns:
+            relative paths written
+
+        Raises:
+            TransactionError: if a file could not be applied (already applied files
+                are restored before raising)
+        """
+        if self.state != "open":
+            raise TransactionError(f"Transaction {self.id} is {self.state}")
+        if not self._edits:
+            self.state = "committed"
+            self._cleanup()
+            return []
+
+        originals = self.directory / "originals"
+        originals.mkdir(parents=True, exist_ok=True)
+        self._existed = {rel: path.exists() for rel, (_, path, _) in self._edits.items()}
+        self.state = "committing"
+        self._save_manifest()
+
+        capture_old = WriteEvents.wants_old_content()
+        events = []
+        try:
+            for rel, (slot, path, content) in sorted(self._edits.items(), key=lambda item: item[1][0]):
+                backup = None
+                old_content = None
+                if self._existed[rel]:
+                    if capture_old:
+                        try:
+                            old_content = path.read_text(encoding="utf-8")
+                        except (OSError, UnicodeDecodeError):
+                            old_content = None
+                    backup = originals / str(slot)
+                    snapshot_file(path, backup)
+                created_dirs = self._make_parents(path)
+                os.replace(self.directory / "staged" / str(slot), path)
+                self._applied.append({"rel": rel, "path": path, "backup": backup, "dirs": created_dirs})
+                events.append(WriteEvents.WriteEvent(
+                    path=path,
+                    relative_path=rel,
+                    new_content=content,
+                    old_content=old_content,
+                    backup=str(backup) if backup is not None else None,
+                ))
+        except OSError as e:
+            self._undo()
+            self.state = "rolled_back"
+            self._cleanup()
+            raise TransactionError(f"Commit of transaction {self.id} failed, changes rolled back: {e}") from e
+
+        self.state = "committed"
+        self._save_manifest()
+        if not self.keep_backup:
+            self._cleanup()
+        for event in events:
+            WriteEvents.publish(event)
+        return [a["rel"] for a in self._applied]
+
+    def _make_parents(self, path: Path) -> List[Path]:
+        created = []
+        parent = path.parent
+        while not parent.exists():
+            created.append(parent)
+            parent = parent.parent
+        for d in reversed(created):
+            d.mkdir(exist_ok=True)
+        return created
+
+    def _undo(self, with_events: bool = False) -> List[WriteEvents.WriteEvent]:
+        """Restore every applied file (newest first); optionally returns events for restored files."""
+        events = []
+        while self._applied:
+            applied = self._applied.pop()
+            path, backup = applied["path"], applied["backup"]
+            if backup is not None:
+                restored = None
+                if with_events:
+                    try:
+                        restored = backup.read_text(encoding="utf-8")
+                    except (OSError, UnicodeDecodeError):
+                        restored = None
+                os.replace(backup, path)
+                if restored is not None:
+                    events.append(WriteEvents.WriteEvent(
+                        path=path, relative_path=applied["rel"], new_content=restored,
+                    ))
+            else:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                for d in applied["dirs"]:
+                    try:
+                        d.rmdir()
+                    except OSError:
+                        break
+        return events
+
+    def rollback(self) -> None:
+        """
+        Abandon the transaction: drop staged edits, or restore the originals of a
+        committed transaction (requires keep_backup=True).
+        """
+        if self.state in ("open", "committing"):
+            self._undo()
+        elif self.state == "committed":
+            if not self.directory.exists():
+                raise TransactionError(f"Backups of transaction {self.id} were discarded")
+            for event in self._undo(with_events=True):
+                WriteEvents.publish(event)
+        elif self.state == "rolled_back":
+            return
+        self.state = "rolled_back"
+        self._cleanup()
+
+    def discard(self) -> None:
+        """Forget the backups of a committed transaction (it can no longer be rolled back)."""
+        if self.state == "open":
+            raise TransactionError(f"Transaction {self.id} is not committed")
+        self._cleanup()
+
+    def _cleanup(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+        if self._release_lock.alive:
+            try:
+                self._lock_path.unlink()
+            except FileNotFoundError:
+                pass
+            self._release_lock()
+
+    def __enter__(self) -> "WriteTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.rollback()
+        elif self.state == "open":
+            self.commit()
+
+    # ---- crash recovery --------------------------------------------------
+
+    @staticmethod
+    def recover(root: Optional[Union[str, Path]] = None) -> int:
+        """
+        Roll back transactions interrupted in the middle of a commit and delete
+        the directories of every other abandoned transaction (open, committed or
+        without manifest). A transaction is abandoned when the flock on its lock
+        file can be taken, i.e. its owner (in this or any other process) is gone;
+        without flock support, directories that have a lock file are left alone.
+        setup_project_sandbox runs it before any agent starts.
+
+        A file was applied when its staged copy is gone (os.replace consumed it);
+        such files are restored from their snapshot, or removed if they were new.
+
+        Returns:
+            number of transactions rolled back
+        """
+        root = Path(root if root is not None else SandboxSetup.SANDBOX_ROOT).resolve()
+        backup_dir = root / BACKUP_DIR_NAME
+        if not backup_dir.is_dir():
+            return 0
+        recovered = 0
+        for txn_dir in backup_dir.glob(f"{TXN_PREFIX}*"):
+            if not txn_dir.is_dir():
+                continue
+            lock_path = txn_dir.with_name(txn_dir.name + LOCK_SUFFIX)
+            owner = None
+            if lock_path.exists():
+                owner = _lock_owner(lock_path) if fcntl is not None else None
+                if owner is None:
+                    continue  # still owned (or liveness unknown)
+            try:
+                recovered += WriteTransaction._recover_directory(root, txn_dir)
+            finally:
+                if owner is not None:
+                    lock_path.unlink(missing_ok=True)
+                    os.close(owner)
+
+        # lock files left behind by an owner that died while cleaning up
+        for lock_path in backup_dir.glob(f"{TXN_PREFIX}*{LOCK_SUFFIX}"):
+            if fcntl is None or lock_path.with_suffix("").is_dir():
+                continue
+            owner = _lock_owner(lock_path)
+            if owner is not None:
+                lock_path.unlink(missing_ok=True)
+                os.close(owner)
+        return recovered
+
+    @staticmethod
+    def _recover_directory(root: Path, txn_dir: Path) -> int:
+        """Recover one abandoned transaction directory; returns 1 if a commit was rolled back."""
+        manifest_file = txn_dir / "manifest.json"
+        try:
+            manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = None
+        if manifest is None or manifest.get("state") != "committing":
+            shutil.rmtree(txn_dir, ignore_errors=True)
+            return 0
+        for entry in manifest["files"]:
+            slot, target = str(entry["slot"]), root / entry["path"]
+            if (txn_dir / "staged" / slot).exists():
+                continue
+            if entry["existed"]:
+                backup = txn_dir / "originals" / slot
+                if backup.exists():
+                    os.replace(backup, target)
+            else:
+                try:
+                    target.unlink()
+                except FileNotFoundError:
+                    pass
+        shutil.rmtree(txn_dir, ignore_errors=True)
+        return 1
@@ -1,14 +1,50 @@
 from .ReadTool import ReadTool
 from .WriteTool import WriteTool
+from .BatchReadTool import BatchReadTool
+from .BatchWriteTool import BatchWriteTool
+from .PatchApplier import PatchError, PatchResult, apply_patch
+from .WriteTransaction import WriteTransaction, TransactionError
 from .ListItems import ListItems
-from .PathValidator import validate_path
-from .SandboxSetup import setup_project_sandbox, SANDBOX_ROOT
+from .DirectoryScanner import ScanEntry, ScanPage, iter_directory, scan_directory
+from .PathValidator import validate_path, validate_paths
+from .ReadCache import ReadCache, READ_CACHE
+from .AsyncExecutor import BoundedExecutor, IO_EXECUTOR
+from .BackupStore import BackupStore, BackupVersion, get_backup_store
+from .SandboxSetup import setup_project_sandbox, get_resolver, SANDBOX_ROOT
+from .SandboxResolver import SandboxResolver
+from .SandboxIndex import SandboxIndex, IndexedFile, FileChange
+from .WriteEvents import WriteEvent
 
 __all__ = [
     "ReadTool",
     "WriteTool",
+    "BatchReadTool",
+    "BatchWriteTool",
+    "PatchError",
+    "PatchResult",
+    "apply_patch",
+    "WriteTransaction",
+    "TransactionError",
     "ListItems",
+    "ScanEntry",
+    "ScanPage",
+    "iter_directory",
+    "scan_directory",
     "validate_path",
+    "validate_paths",
+    "ReadCache",
+    "READ_CACHE",
+    "BoundedExecutor",
+    "IO_EXECUTOR",
+    "BackupStore",
+    "BackupVersion",
+    "get_backup_store",
     "setup_project_sandbox",
     "SANDBOX_ROOT",
+    "get_resolver",
+    "SandboxResolver",
+    "SandboxIndex",
+    "IndexedFile",
+    "FileChange",
+    "WriteEvent",
 ]
\ No newline at end of file
@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class JsonlLogStore:
+    """
+    Stockage append-only au format JSON Lines (une entrée JSON par ligne).
+
+    Chaque appel à `append` coûte O(1) : l'entrée est sérialisée puis placée dans
+    un tampon mémoire. Le tampon est écrit en fin de fichier (O_APPEND) par lots,
+    suivis d'un seul `fsync`, dès que `flush_every` entrées sont en attente ou que
+    `flush_interval` secondes se sont écoulées depuis la dernière écriture.
+
+    Avec `lock=True`, chaque lot est écrit sous un verrou exclusif sur le fichier,
+    ce qui permet à plusieurs processus de partager le même journal sans mélanger
+    leurs lignes.
+    """
+
+    def __init__(self, path: str, flush_every: int = 64, flush_interval: float = 1.0,
+                 fsync: bool = True, lock: bool = False):
+        """
+        Args:
+            path (str): Chemin du fichier .jsonl.
+            flush_every (int): Nombre d'entrées en attente déclenchant une écriture.
+            flush_interval (float): Délai maximal (secondes) avant écriture du tampon.
+            fsync (bool): Force la synchronisation disque après chaque lot.
+            lock (bool): Verrouille le fichier pendant l'écriture (mode multi-processus).
+        """
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.lock = lock
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def append(self, entry: dict) -> None:
+        """Ajoute une entrée au tampon et l'écrit si le lot est complet."""
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self._buffer.append(line)
+            if (len(self._buffer) >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def append_many(self, entries: Iterable[dict]) -> None:
+        """Ajoute plusieurs entrées puis écrit le lot complet."""
+        lines = [json.dumps(entry, ensure_ascii=False, default=str) for entry in entries]
+        with self._lock:
+            self._buffer.extend(lines)
+            self._flush_locked()
+
+    def flush(self) -> None:
+        """Écrit immédiatement toutes les entrées en attente."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        data = ("\n".join(self._buffer) + "\n").encode("utf-8")
+        self._write_batch(data)
+        self._buffer.clear()
+
+    def _write_batch(self, data: bytes) -> None:
+        """Écrit un lot complet de lignes en fin de fichier."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if self.lock:
+                _lock_fd(fd)
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            if self.fsync:
+                os.fsync(fd)
+        finally:
+            # La fermeture du descripteur libère aussi le verrou
+            os.close(fd)
+
+    def __iter__(self) -> Iterator[dict]:
+        self.flush()
+        return iter_jsonl(self.path)
+
+
+def _lock_fd(fd: int) -> None:
+    """Pose un verrou exclusif bloquant sur le fichier ouvert."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        os.lseek(fd, 0, os.SEEK_END)
+
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    """
+    Parcourt un fichier JSON Lines entrée par entrée, sans le charger en mémoire.
+
+    Les lignes illisibles (ex: dernière ligne tronquée après un crash) sont ignorées.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        for raw in f:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                yield json.loads(raw)
+            except json.JSONDecodeError:
+                print(f"⚠️ Attention : ligne corrompue ignorée dans {path}.")
+
+
+def export_to_json_array(src_jsonl: str, dest_json: str, indent: Optional[int] = 4) -> int:
+    """
+    Exporte un fichier JSON Lines vers le format historique (tableau JSON).
+
+    L'export est fait en streaming (une entrée à la fois) puis remplace
+    atomiquement le fichier de destination.
+
+    Returns:
+        int: Nombre d'entrées exportées.
+    """
+    directory = os.path.dirname(dest_json) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    count = 0
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            out.write("[")
+            for entry in iter_jsonl(src_jsonl):
+                out.write(",\n" if count else "\n")
+                text = json.dumps(entry, indent=indent, ensure_ascii=False)
+                if indent:
+                    pad = " " * indent
+                    text = "\n".join(pad + line for line in text.split("\n"))
+                out.write(text)
+                count += 1
+            out.write("\n]" if count else "]")
+        os.replace(tmp_name, dest_json)
+    except Exception:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+    return count
+
+
+def convert_json_array_to_jsonl(src_json: str, dest_jsonl: str) -> int:
+    """
+    Convertit un ancien fichier de logs (tableau JSON) en JSON Lines.
+
+    Les entrées sont ajoutées à la fin de `dest_jsonl` s'il existe déjà.
+
+    Returns:
+        int: Nombre d'entrées converties.
+
+    Raises:
+        ValueError: Si le fichier source n'est pas un tableau JSON.
+    """
+    with open(src_json, "r", encoding="utf-8") as f:
+        content = f.read().strip()
+    data = json.loads(content) if content else []
+    if not isinstance(data, list):
+        raise ValueError(f"❌ {src_json} ne contient pas un tableau JSON.")
+
+    store = JsonlLogStore(dest_jsonl, flush_every=len(data) + 1, flush_interval=float("inf"))
+    for entry in data:
+        store.append(entry)
+    store.flush()
+    return len(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversion des logs d'expérience JSON <-> JSONL.")
+    parser.add_argument("mode", choices=["to-jsonl", "to-json"])
+    parser.add_argument("src")
+    parser.add_argument("dest")
+    args = parser.parse_args()
+
+    if args.mode == "to-jsonl":
+        n = convert_json_array_to_jsonl(args.src, args.dest)
+    else:
+        n = export_to_json_array(args.src, args.dest)
+    print(f"✅ {n} entrées écrites dans {args.dest}")
@@ -0,0 +1,350 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+# Colonnes de métadonnées (clés de premier niveau des entrées de log_experiment)
+META_COLUMNS = ("id", "timestamp", "agent", "model", "action", "status")
+# Champs volumineux de `details`, stockés compressés et dédupliqués
+BODY_FIELDS = ("input_prompt", "output_response")
+
+STATE_FILE = "state.json"
+SEGMENT_SUFFIX = ".columns"
+LEGACY_SEGMENT_SUFFIX = ".columns.json.gz"
+PACK_FILE = "blobs.pack"
+PACK_INDEX_FILE = "blobs.idx.jsonl"
+
+
+class LogArchiver:
+    """
+    Archive le journal JSONL dans un format colonne + blobs compressés.
+
+    Structure du dossier d'archive :
+        segment-000001.000001.columns   colonnes d'un segment (rotation tous les
+                                        `segment_rows` enregistrements) : un en-tête
+                                        JSON puis un bloc zlib indépendant par colonne,
+                                        pour ne décompresser que les colonnes lues
+        blobs.pack                      corps des prompts/réponses, compressés (zlib)
+        blobs.idx.jsonl                 hash -> (offset, taille) dans blobs.pack
+        state.json                      segments publiés et position déjà archivée
+                                        dans le journal source
+
+    Chaque corps est identifié par son hash SHA-256 : un prompt système répété
+    n'est stocké qu'une seule fois. Le journal étant append-only, un nouvel
+    appel à `archive` reprend là où le précédent s'est arrêté ; tant que le
+    dernier segment n'est pas plein, les nouvelles entrées y sont ajoutées
+    (pas de segment minuscule par appel). Un segment réécrit reçoit un nouveau
+    nom : le remplacement atomique de state.json publie à la fois le segment et
+    la position archivée, une interruption ne peut donc pas dupliquer d'entrées.
+    """
+
+    def __init__(self, archive_dir: str, segment_rows: int = 10000, compression_level: int = 6):
+        """
+        Args:
+            archive_dir (str): Dossier de l'archive (créé si nécessaire).
+            segment_rows (int): Nombre d'entrées par segment avant rotation.
+            compression_level (int): Niveau de compression zlib des corps.
+        """
+        self.archive_dir = archive_dir
+        self.segment_rows = max(1, segment_rows)
+        self.compression_level = compression_level
+        os.makedirs(archive_dir, exist_ok=True)
+        self._state = _read_json(os.path.join(archive_dir, STATE_FILE)) or {
+            "source_offset": 0,
+            "segments": [],
+        }
+        self._known_blobs = set(_load_pack_index(archive_dir))
+        self._remove_orphan_segments()
+
+    def _remove_orphan_segments(self) -> None:
+        """Segments écrits mais jamais publiés (ou remplacés) lors d'un appel interrompu."""
+        published = set(self._state["segments"])
+        for name in os.listdir(self.archive_dir):
+            if name.startswith("segment-") and name not in published:
+                os.remove(os.path.join(self.archive_dir, name))
+
+    def archive(self, source_jsonl: str) -> int:
+        """
+        Archive les entrées ajoutées au journal depuis le dernier appel.
+
+        Returns:
+            int: Nombre d'entrées archivées.
+        """
+        if not os.path.exists(source_jsonl):
+            return 0
+        if os.path.getsize(source_jsonl) < self._state["source_offset"]:
+            raise ValueError(f"❌ {source_jsonl} est plus court que la partie déjà archivée.")
+
+        archived = 0
+        pending = 0  # entrées pas encore écrites dans un segment
+        columns, reopened = self._open_segment()
+        with open(source_jsonl, "rb") as src, \
+                open(os.path.join(self.archive_dir, PACK_FILE), "ab") as pack, \
+                open(os.path.join(self.archive_dir, PACK_INDEX_FILE), "a", encoding="utf-8") as pack_index:
+            src.seek(self._state["source_offset"])
+            offset = self._state["source_offset"]
+            for raw in src:
+                if not raw.endswith(b"\n"):
+                    break  # ligne en cours d'écriture
+                offset += len(raw)
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    entry = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                self._add_row(columns, entry, pack, pack_index)
+                archived += 1
+                pending += 1
+                if len(columns["id"]) >= self.segment_rows:
+                    self._write_segment(columns, offset, pack, pack_index, reopened)
+                    columns, reopened, pending = _empty_columns(), False, 0
+            if pending:
+                self._write_segment(columns, offset, pack, pack_index, reopened)
+            else:
+                self._state["source_offset"] = offset
+                self._save_state()
+        return archived
+
+    def _open_segment(self) -> tuple:
+        """Colonnes du dernier segment s'il n'est pas plein (il sera réécrit), sinon des colonnes vides."""
+        last_rows = self._state.get("last_rows")
+        if not self._state["segments"] or last_rows is None or last_rows >= self.segment_rows:
+            return _empty_columns(), False
+        columns = _read_segment(os.path.join(self.archive_dir, self._state["segments"][-1]))
+        columns.setdefault("details_raw", [False] * len(columns["id"]))
+        return columns, True
+
+    def _add_row(self, columns: dict, entry: dict, pack, pack_index) -> None:
+        for col in META_COLUMNS:
+            columns[col].append(entry.get(col))
+        details = entry.get("details")
+        # les anciennes entrées (ex: STARTUP) ont des détails non-dict : restitués tels quels
+        raw = not isinstance(details, dict)
+        columns["details_raw"].append(raw)
+        details = {"value": details} if raw else dict(details)
+        for field in BODY_FIELDS:
+            body = details.pop(field, None)
+            columns[field].append(None if body is None else self._store_blob(str(body), pack, pack_index))
+        columns["details"].append(details)
+
+    def _store_blob(self, body: str, pack, pack_index) -> str:
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self._known_blobs:
+            compressed = zlib.compress(data, self.compression_level)
+            offset = pack.tell()
+            pack.write(compressed)
+            pack_index.write(json.dumps({"h": digest, "o": offset, "n": len(compressed)}) + "\n")
+            self._known_blobs.add(digest)
+        return digest
+
+    def _write_segment(self, columns: dict, source_offset: int, pack, pack_index, replace_last: bool = False) -> None:
+        # Les corps référencés doivent être sur disque avant de publier le segment
+        pack.flush()
+        pack_index.flush()
+        os.fsync(pack.fileno())
+        os.fsync(pack_index.fileno())
+
+        segments = self._state["segments"]
+        number = len(segments) if replace_last else len(segments) + 1
+        revision = self._state.get("revision", 0) + 1
+        name = f"segment-{number:06d}.{revision:06d}{SEGMENT_SUFFIX}"
+        blocks, header = [], {}
+        position = 0
+        for col, values in columns.items():
+            block = zlib.compress(json.dumps(values, ensure_ascii=False, default=str).encode("utf-8"),
+                                  self.compression_level)
+            header[col] = [position, len(block)]
+            position += len(block)
+            blocks.append(block)
+        fd, tmp_name = tempfile.mkstemp(dir=self.archive_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps({"rows": len(columns["id"]), "columns": header}).encode("utf-8") + b"\n")
+            for block in blocks:
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, os.path.join(self.archive_dir, name))
+
+        # state.json est le point de publication : segment et position changent ensemble
+        replaced = segments[-1] if replace_last else None
+        self._state["segments"] = (segments[:-1] if replace_last else segments) + [name]
+        self._state["revision"] = revision
+        self._state["last_rows"] = len(columns["id"])
+        self._state["source_offset"] = source_offset
+        self._save_state()
+        if replaced is not None:
+            os.remove(os.path.join(self.archive_dir, replaced))
+
+    def _save_state(self) -> None:
+        _write_json_atomically(os.path.join(self.archive_dir, STATE_FILE), self._state)
+
+
+class ArchivedEntry:
+    """Entrée d'archive dont les prompts/réponses sont chargés à la demande."""
+
+    __slots__ = ("_reader", "_row", "id", "timestamp", "agent", "model", "action", "status")
+
+    def __init__(self, reader: "ArchiveReader", row: dict):
+        self._reader = reader
+        self._row = row
+        for col in META_COLUMNS:
+            setattr(self, col, row[col])
+
+    @property
+    def input_prompt(self) -> Optional[str]:
+        return self._reader.get_blob(self._row["input_prompt"])
+
+    @property
+    def output_response(self) -> Optional[str]:
+        return self._reader.get_blob(self._row["output_response"])
+
+    def to_dict(self) -> dict:
+        """Reconstruit l'entrée au format de log_experiment (charge les corps)."""
+        entry = {col: self._row[col] for col in META_COLUMNS}
+        if self._row.get("details_raw"):
+            entry["details"] = self._row["details"]["value"]
+            return entry
+        details = dict(self._row["details"])
+        for field in BODY_FIELDS:
+            if self._row[field] is not None:
+                details[field] = self._reader.get_blob(self._row[field])
+        entry["details"] = details
+        return entry
+
+
+class ArchiveReader:
+    """
+    Lecture d'une archive produite par `LogArchiver`.
+
+    `load_metrics` ne lit que les colonnes de métadonnées (jamais les corps) :
+    le résultat peut être passé directement à `pandas.DataFrame`.
+    """
+
+    def __init__(self, archive_dir: str, blob_cache_size: int = 256):
+        self.archive_dir = archive_dir
+        state = _read_json(os.path.join(archive_dir, STATE_FILE)) or {"segments": []}
+        self.segments = state["segments"]
+        self._pack_index: Optional[dict] = None
+        self._pack_fd: Optional[int] = None
+        self.get_blob = lru_cache(maxsize=blob_cache_size)(self._read_blob)
+
+    def load_metrics(self, columns: Optional[Iterable[str]] = None) -> dict:
+        """
+        Charge les colonnes demandées de tous les segments.
+
+        Args:
+            columns: Colonnes à conserver (par défaut les métadonnées).
+
+        Returns:
+            dict: {nom_de_colonne: [valeurs]}
+        """
+        wanted = tuple(columns) if columns is not None else META_COLUMNS
+        result = {col: [] for col in wanted}
+        for seg_columns in self._iter_segments(wanted):
+            for col in wanted:
+                result[col].extend(seg_columns[col])
+        return result
+
+    def entries(self) -> Iterator[ArchivedEntry]:
+        """Parcourt les entrées ; les corps ne sont lus qu'à l'accès."""
+        for seg_columns in self._iter_segments():
+            names = list(seg_columns)
+            for values in zip(*(seg_columns[n] for n in names)):
+                yield ArchivedEntry(self, dict(zip(names, values)))
+
+    def _iter_segments(self, columns: Optional[Iterable[str]] = None) -> Iterator[dict]:
+        for name in self.segments:
+            yield _read_segment(os.path.join(self.archive_dir, name), columns)
+
+    def _read_blob(self, digest: Optional[str]) -> Optional[str]:
+        if digest is None:
+            return None
+        if self._pack_index is None:
+            self._pack_index = _load_pack_index(self.archive_dir)
+            self._pack_fd = os.open(os.path.join(self.archive_dir, PACK_FILE), os.O_RDONLY)
+        offset, length = self._pack_index[digest]
+        if hasattr(os, "pread"):
+            data = os.pread(self._pack_fd, length, offset)
+        else:
+            os.lseek(self._pack_fd, offset, os.SEEK_SET)
+            data = os.read(self._pack_fd, length)
+        return zlib.decompress(data).decode("utf-8")
+
+    def close(self) -> None:
+        if self._pack_fd is not None:
+            os.close(self._pack_fd)
+            self._pack_fd = None
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _read_segment(path: str, columns: Optional[Iterable[str]] = None) -> dict:
+    """Colonnes d'un segment (toutes par défaut) ; seuls les blocs demandés sont décompressés."""
+    if path.endswith(LEGACY_SEGMENT_SUFFIX):
+        with gzip.open(path, "rb") as f:
+            data = json.loads(f.read())["columns"]
+        return data if columns is None else {col: data[col] for col in columns}
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        base = f.tell()
+        result = {}
+        for col in (header["columns"] if columns is None else columns):
+            position, length = header["columns"][col]
+            f.seek(base + position)
+            result[col] = json.loads(zlib.decompress(f.read(length)))
+    return result
+
+
+def _empty_columns() -> dict:
+    return {col: [] for col in META_COLUMNS + BODY_FIELDS + ("details", "details_raw")}
+
+
+def _load_pack_index(archive_dir: str) -> dict:
+    index = {}
+    path = os.path.join(archive_dir, PACK_INDEX_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # ligne tronquée : le blob sera réécrit si nécessaire
+                index[item["h"]] = (item["o"], item["n"])
+    return index
+
+
+def _read_json(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json_atomically(path: str, data: dict) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_name, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archivage colonne des logs d'expérience.")
+    parser.add_argument("source", help="Journal JSONL (ex: logs/experiment_data.jsonl)")
+    parser.add_argument("archive_dir")
+    parser.add_argument("--segment_rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    n = LogArchiver(args.archive_dir, segment_rows=args.segment_rows).archive(args.source)
+    print(f"✅ {n} entrées archivées dans {args.archive_dir}")
@@ -0,0 +1,343 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from . import logger
+
+# Champs indexés (clés de premier niveau des entrées de log_experiment)
+INDEXED_FIELDS = ("agent", "action", "model", "status")
+INDEX_VERSION = 2
+
+# Structure du dossier d'index
+HEADER_FILE = "header.json"
+RECORDS_FILE = "records.bin"
+POSTINGS_DIR = "postings"
+VALUES_FILE = "values.jsonl"
+
+# Un enregistrement par entrée : offset, longueur, horodatage (NaN si absent)
+_RECORD = struct.Struct("<QId")
+
+TimeBound = Union[datetime, timedelta, float, None]
+FieldFilter = Union[str, Enum, Iterable[Union[str, Enum]], None]
+
+
+class ExperimentLogQuery:
+    """
+    Requêtes filtrées sur le journal JSONL sans désérialiser tout le fichier.
+
+    L'index (dossier `<journal>.idx/`) est append-only, comme le journal :
+        records.bin                 un enregistrement binaire de taille fixe par
+                                    entrée (offset, longueur, horodatage)
+        postings/<champ>/<h>.u32    numéros d'entrées (uint32) par valeur de
+                                    `agent`, `action`, `model`, `status` et par
+                                    tranche de temps (`bucket`)
+        postings/<champ>/values.jsonl  valeur -> fichier de postings
+        header.json                 version, inode et taille déjà indexée du journal,
+                                    nombre d'entrées validées
+
+    Une mise à jour ne lit que les lignes ajoutées au journal, ajoute leurs
+    enregistrements et postings à la fin des fichiers, puis réécrit le seul
+    en-tête : son coût est proportionnel aux nouvelles entrées, pas au journal.
+    Les données écrites au-delà du nombre d'entrées de l'en-tête (mise à jour
+    interrompue) sont ignorées à la lecture.
+
+    Exemple :
+        q = ExperimentLogQuery()
+        q.find(action=ActionType.FIX, status="FAILURE",
+               model="gemini-1.5-flash", since=timedelta(hours=1))
+    """
+
+    def __init__(self, path: Optional[str] = None, index_path: Optional[str] = None,
+                 bucket_seconds: int = 3600):
+        """
+        Args:
+            path (str): Journal JSONL (par défaut logger.LOG_STREAM_FILE).
+            index_path (str): Dossier d'index (par défaut `<path>.idx`).
+            bucket_seconds (int): Largeur des tranches de temps indexées.
+        """
+        self.path = path or logger.LOG_STREAM_FILE
+        self.index_path = index_path or self.path + ".idx"
+        self.bucket_seconds = bucket_seconds
+        self._reset()
+        self._load_index()
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+    def _reset(self) -> None:
+        self._header = {
+            "version": INDEX_VERSION,
+            "bucket_seconds": self.bucket_seconds,
+            "inode": None,
+            "indexed_size": 0,
+            "records": 0,
+        }
+        self._offsets = array("Q")
+        self._lengths = array("I")
+        self._ts: List[Optional[float]] = []
+        self._postings: Dict[str, Dict[str, List[int]]] = {f: {} for f in INDEXED_FIELDS + ("bucket",)}
+        self._files: Dict[str, Dict[str, str]] = {f: {} for f in INDEXED_FIELDS + ("bucket",)}
+
+    def _wipe(self) -> None:
+        """Supprime l'index sur disque (ancien format, journal remplacé...)."""
+        if os.path.isdir(self.index_path):
+            shutil.rmtree(self.index_path, ignore_errors=True)
+        elif os.path.exists(self.index_path):
+            os.remove(self.index_path)
+        self._reset()
+
+    def _load_index(self) -> None:
+        header = _read_json(os.path.join(self.index_path, HEADER_FILE)) if os.path.isdir(self.index_path) else None
+        if header is None or header.get("version") != INDEX_VERSION \
+                or header.get("bucket_seconds") != self.bucket_seconds:
+            if os.path.exists(self.index_path):
+                self._wipe()
+            return
+        count = header["records"]
+        try:
+            with open(os.path.join(self.index_path, RECORDS_FILE), "rb") as f:
+                data = f.read(count * _RECORD.size)
+        except OSError:
+            data = b""
+        if len(data) != count * _RECORD.size:
+            self._wipe()
+            return
+        self._header = header
+        for offset, length, ts in _RECORD.iter_unpack(data):
+            self._offsets.append(offset)
+            self._lengths.append(length)
+            self._ts.append(None if math.isnan(ts) else ts)
+
+        for field in self._postings:
+            directory = os.path.join(self.index_path, POSTINGS_DIR, field)
+            values_file = os.path.join(directory, VALUES_FILE)
+            if not os.path.exists(values_file):
+                continue
+            with open(values_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # ligne tronquée : la valeur sera réenregistrée
+                    recs = array("I")
+                    try:
+                        with open(os.path.join(directory, item["f"]), "rb") as pf:
+                            data = pf.read()
+                        recs.frombytes(data[:len(data) - len(data) % recs.itemsize])
+                    except OSError:
+                        pass  # valeur enregistrée, postings pas encore écrits
+                    # set : une mise à jour interrompue puis rejouée peut dupliquer des postings
+                    self._postings[field][item["v"]] = sorted({r for r in recs if r < count})
+                    self._files[field][item["v"]] = item["f"]
+
+    def _save_header(self) -> None:
+        path = os.path.join(self.index_path, HEADER_FILE)
+        fd, tmp_name = tempfile.mkstemp(dir=self.index_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._header, f)
+            os.replace(tmp_name, path)
+        except Exception:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+
+    def refresh(self) -> int:
+        """
+        Indexe les entrées ajoutées depuis la dernière mise à jour.
+
+        Returns:
+            int: Nombre de nouvelles entrées indexées.
+        """
+        if os.path.abspath(self.path) == os.path.abspath(logger.LOG_STREAM_FILE):
+            logger.flush_logs()
+        if not os.path.exists(self.path):
+            return 0
+
+        st = os.stat(self.path)
+        header = self._header
+        # Fichier remplacé ou tronqué : l'index n'est plus valable
+        if header["inode"] != st.st_ino or st.st_size < header["indexed_size"]:
+            self._wipe()
+            header = self._header
+            header["inode"] = st.st_ino
+        if st.st_size == header["indexed_size"]:
+            return 0
+
+        records = bytearray()
+        postings: Dict[tuple, array] = {}
+        added = 0
+        with open(self.path, "rb") as f:
+            f.seek(header["indexed_size"])
+            offset = header["indexed_size"]
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # ligne en cours d'écriture : elle sera indexée plus tard
+                length = len(raw)
+                stripped = raw.strip()
+                if stripped:
+                    try:
+                        entry = json.loads(stripped)
+                    except json.JSONDecodeError:
+                        entry = None
+                    if isinstance(entry, dict):
+                        records += self._add(entry, offset, length, postings)
+                        added += 1
+                offset += length
+
+        os.makedirs(self.index_path, exist_ok=True)
+        with open(os.path.join(self.index_path, RECORDS_FILE), "ab") as f:
+            f.truncate(header["records"] * _RECORD.size)  # restes d'une mise à jour interrompue
+            f.write(records)
+        for (field, value), recs in postings.items():
+            self._append_postings(field, value, recs)
+        header["records"] += added
+        header["indexed_size"] = offset
+        self._save_header()
+        return added
+
+    def _add(self, entry: dict, offset: int, length: int, postings: Dict[tuple, array]) -> bytes:
+        rec = len(self._offsets)
+        ts = _parse_timestamp(entry.get("timestamp"))
+        self._offsets.append(offset)
+        self._lengths.append(length)
+        self._ts.append(ts)
+
+        keys = [(field, str(entry.get(field))) for field in INDEXED_FIELDS]
+        if ts is not None:
+            keys.append(("bucket", str(int(ts // self.bucket_seconds))))
+        for field, value in keys:
+            self._postings[field].setdefault(value, []).append(rec)
+            postings.setdefault((field, value), array("I")).append(rec)
+        return _RECORD.pack(offset, length, math.nan if ts is None else ts)
+
+    def _append_postings(self, field: str, value: str, recs: array) -> None:
+        directory = os.path.join(self.index_path, POSTINGS_DIR, field)
+        name = self._files[field].get(value)
+        if name is None:
+            os.makedirs(directory, exist_ok=True)
+            name = hashlib.sha1(value.encode("utf-8")).hexdigest()[:16] + ".u32"
+            with open(os.path.join(directory, VALUES_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"v": value, "f": name}) + "\n")
+            self._files[field][value] = name
+        with open(os.path.join(directory, name), "ab") as f:
+            f.write(recs.tobytes())
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+    def select(self, agent: FieldFilter = None, action: FieldFilter = None, model: FieldFilter = None,
+               status: FieldFilter = None, since: TimeBound = None, until: TimeBound = None) -> list[int]:
+        """
+        Retourne les numéros d'entrées correspondant aux filtres, en n'utilisant que l'index.
+
+        Chaque filtre de champ accepte une valeur ou une liste de valeurs (OU logique) ;
+        les filtres sont combinés par un ET logique. `since`/`until` acceptent un
+        datetime, un timestamp ou un timedelta (relatif à maintenant).
+        """
+        self.refresh()
+        postings = self._postings
+        candidates: Optional[set] = None
+
+        for field, wanted in (("agent", agent), ("action", action), ("model", model), ("status", status)):
+            if wanted is None:
+                continue
+            matched: set = set()
+            for value in _as_values(wanted):
+                matched.update(postings[field].get(value, ()))
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+
+        start, end = _to_epoch(since), _to_epoch(until)
+        if start is not None or end is not None:
+            in_buckets: set = set()
+            lo = int(start // self.bucket_seconds) if start is not None else None
+            hi = int(end // self.bucket_seconds) if end is not None else None
+            for key, recs in postings["bucket"].items():
+                b = int(key)
+                if (lo is None or b >= lo) and (hi is None or b <= hi):
+                    in_buckets.update(recs)
+            candidates = in_buckets if candidates is None else candidates & in_buckets
+            ts = self._ts
+            candidates = {
+                r for r in candidates
+                if (start is None or ts[r] >= start) and (end is None or ts[r] <= end)
+            }
+
+        if candidates is None:
+            return list(range(len(self._offsets)))
+        return sorted(candidates)
+
+    def find(self, **filters) -> Iterator[dict]:
+        """Lit uniquement les entrées correspondant aux filtres (voir `select`)."""
+        return self.read(self.select(**filters))
+
+    def read(self, records: Iterable[int]) -> Iterator[dict]:
+        """Lit les entrées demandées par accès direct (seek) dans le journal."""
+        offsets, lengths = self._offsets, self._lengths
+        with open(self.path, "rb") as f:
+            for rec in records:
+                f.seek(offsets[rec])
+                yield json.loads(f.read(lengths[rec]))
+
+    def count(self, **filters) -> int:
+        """Nombre d'entrées correspondant aux filtres (sans lire le journal)."""
+        return len(self.select(**filters))
+
+    def count_by(self, field: str, **filters) -> dict:
+        """
+        Agrège le nombre d'entrées par valeur d'un champ indexé (sans lire le journal).
+
+        Exemple : q.count_by("status", agent="Fixer") -> {"SUCCESS": 12, "FAILURE": 3}
+        """
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"❌ Champ non indexé : '{field}'. Champs disponibles : {INDEXED_FIELDS}")
+        selected = set(self.select(**filters))
+        result = {}
+        for value, recs in self._postings[field].items():
+            n = len(selected.intersection(recs))
+            if n:
+                result[value] = n
+        return result
+
+
+def _as_values(wanted: FieldFilter) -> list[str]:
+    if isinstance(wanted, (str, Enum)):
+        wanted = [wanted]
+    return [w.value if isinstance(w, Enum) else str(w) for w in wanted]
+
+
+def _parse_timestamp(value) -> Optional[float]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+def _to_epoch(bound: TimeBound) -> Optional[float]:
+    if bound is None:
+        return None
+    if isinstance(bound, timedelta):
+        return (datetime.now() - bound).timestamp()
+    if isinstance(bound, datetime):
+        return bound.timestamp()
+    return float(bound)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,99 @@
+import queue
+import threading
+from typing import Optional
+
+from .jsonl_store import JsonlLogStore
+
+# Marqueurs de contrôle transmis dans la file
+_FLUSH = object()
+_STOP = object()
+
+
+class BackgroundLogWriter:
+    """
+    Écrivain de logs alimenté par une file et exécuté dans un thread dédié.
+
+    Les agents appellent `submit`, qui se contente de déposer l'entrée dans une
+    file non bornée : l'appelant ne touche jamais au disque et aucune entrée
+    n'est rejetée, même à fort débit. Le thread regroupe les entrées disponibles
+    et les confie au `JsonlLogStore` par lots : plus le débit est élevé, plus les
+    lots sont gros et moins il y a de `fsync` par entrée.
+    """
+
+    def __init__(self, store: JsonlLogStore, max_batch: int = 512):
+        """
+        Args:
+            store (JsonlLogStore): Stockage cible (idéalement avec lock=True en multi-processus).
+            max_batch (int): Nombre maximal d'entrées écrites en un seul lot.
+        """
+        self.store = store
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="log-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> str:
+        return self.store.path
+
+    def submit(self, entry: dict) -> None:
+        """Dépose une entrée dans la file (non bloquant)."""
+        if self._closed:
+            raise RuntimeError("❌ Le writer de logs est fermé.")
+        self._queue.put(entry)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend que toutes les entrées soumises avant l'appel soient sur disque.
+
+        Returns:
+            bool: True si l'écriture est terminée avant le délai.
+        """
+        if self._closed or not self._thread.is_alive():
+            self.store.flush()
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Vide la file, écrit les dernières entrées et arrête le thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        while True:
+            # Bloque jusqu'à la prochaine entrée puis récupère tout ce qui est déjà disponible
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries: list[dict] = []
+            for item in batch:
+                if item is _STOP:
+                    self._write(entries)
+                    return
+                if isinstance(item, tuple) and item and item[0] is _FLUSH:
+                    self._write(entries)
+                    entries = []
+                    item[1].set()
+                else:
+                    entries.append(item)
+            self._write(entries)
+
+    def _write(self, entries: list) -> None:
+        try:
+            if entries:
+                self.store.append_many(entries)
+            else:
+                self.store.flush()
+        except Exception as e:
+            # Les lignes restent dans le tampon du store et seront réécrites au prochain lot
+            print(f"⚠️ Attention : écriture des logs impossible ({e}). Nouvel essai au prochain lot.")
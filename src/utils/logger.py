@@ -1,11 +1,20 @@
-import json
+import atexit
 import os
+import threading
 import uuid
 from datetime import datetime
 from enum import Enum
 
-# Chemin du fichier de logs
+from .jsonl_store import JsonlLogStore, convert_json_array_to_jsonl, export_to_json_array
+from .log_writer import BackgroundLogWriter
+
+# Chemin du fichier de logs (format historique : tableau JSON, produit par export)
 LOG_FILE = os.path.join("logs", "experiment_data.json")
+# Journal append-only (JSON Lines) alimenté par log_experiment
+LOG_STREAM_FILE = os.path.join("logs", "experiment_data.jsonl")
+
+_writer = None
+_writer_lock = threading.Lock()
 
 class ActionType(str, Enum):
     """
@@ -56,34 +65,94 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
             )
 
     # --- 3. PRÉPARATION DE L'ENTRÉE ---
-    # Création du dossier logs s'il n'existe pas
-    os.makedirs("logs", exist_ok=True)
-    
+    # (le dossier logs est créé par le stockage au moment de l'écriture)
     entry = {
         "id": str(uuid.uuid4()),  # ID unique pour éviter les doublons lors de la fusion des données
         "timestamp": datetime.now().isoformat(),
         "agent": agent_name,
         "model": model_used,
         "action": action_str,
-        "details": details,
+        "details": dict(details),  # copie : l'appelant peut réutiliser son dictionnaire
         "status": status
     }
 
-    # --- 4. LECTURE & ÉCRITURE ROBUSTE ---
-    data = []
-    if os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content: # Vérifie que le fichier n'est pas juste vide
-                    data = json.loads(content)
-        except json.JSONDecodeError:
-            # Si le fichier est corrompu, on repart à zéro (ou on pourrait sauvegarder un backup)
-            print(f"⚠️ Attention : Le fichier de logs {LOG_FILE} était corrompu. Une nouvelle liste a été créée.")
-            data = []
-
-    data.append(entry)
-    
-    # Écriture
-    with open(LOG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+    # --- 4. ÉCRITURE APPEND-ONLY ---
+    # L'entrée est confiée au thread d'écriture : l'agent ne bloque jamais sur le disque.
+    # Le fichier est verrouillé à chaque lot, plusieurs processus peuvent donc logger en parallèle.
+    _get_writer().submit(entry)
+
+
+def _get_writer() -> BackgroundLogWriter:
+    """Retourne le writer courant (recréé si LOG_STREAM_FILE change)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None or _writer.path != LOG_STREAM_FILE:
+            if _writer is not None:
+                _writer.close()
+            _migrate_legacy_log()
+            _writer = BackgroundLogWriter(JsonlLogStore(LOG_STREAM_FILE, lock=True))
+        return _writer
+
+
+def _migrate_legacy_log() -> None:
+    """
+    Convertit l'ancien fichier JSON en JSONL lors de la première utilisation,
+    pour ne perdre aucune entrée historique au prochain export.
+    """
+    if os.path.exists(LOG_STREAM_FILE) or not os.path.exists(LOG_FILE):
+        return
+    # Conversion dans un fichier temporaire puis lien exclusif :
+    # si plusieurs processus démarrent ensemble, une seule migration est publiée.
+    tmp = f"{LOG_STREAM_FILE}.{os.getpid()}.migration"
+    try:
+        convert_json_array_to_jsonl(LOG_FILE, tmp)
+        os.link(tmp, LOG_STREAM_FILE)
+    except FileExistsError:
+        pass
+    except ValueError:
+        print(f"⚠️ Attention : Le fichier de logs {LOG_FILE} était corrompu. Il n'a pas été migré.")
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def flush_logs() -> None:
+    """Attend que toutes les entrées déjà soumises soient écrites sur disque."""
+    if _writer is not None:
+        _writer.flush()
+
+
+def close_logs() -> None:
+    """Écrit les dernières entrées et arrête le thread d'écriture."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+def _reset_after_fork() -> None:
+    # Le thread d'écriture n'existe pas dans le processus enfant : on en recrée un à la demande
+    global _writer, _writer_lock
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+def export_experiment_log(dest: str = None) -> int:
+    """
+    Exporte le journal JSONL au format tableau JSON (compatible avec l'analyse pandas existante).
+
+    Args:
+        dest (str): Fichier de destination (par défaut LOG_FILE).
+
+    Returns:
+        int: Nombre d'entrées exportées.
+    """
+    writer = _get_writer()
+    writer.flush()
+    return export_to_json_array(writer.path, dest or LOG_FILE)
+
+
+atexit.register(close_logs)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,99 @@
+import sys
+import types
+import importlib
+import os
+from pathlib import Path
+
+import pytest
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+AnalysisCache = importlib.import_module("src.tools.analysis.AnalysisCache").AnalysisCache
+PylintRunner = importlib.import_module("src.tools.analysis.PylintRunner").PylintRunner
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def test_lru_eviction_by_count(tmp_path):
+    cache = AnalysisCache(tmp_path / "c", max_entries=2)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}  # "a" becomes most recently used
+    cache.put("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert len(list((tmp_path / "c").iterdir())) == 2
+
+
+def test_size_cap_and_persistence(tmp_path):
+    cache = AnalysisCache(tmp_path / "c", max_bytes=150)
+    for i in range(10):
+        cache.put(f"k{i}", {"payload": "x" * 40})
+    assert cache.stats()["bytes"] <= 150
+
+    reopened = AnalysisCache(tmp_path / "c", max_bytes=150)
+    assert reopened.get("k9") == {"payload": "x" * 40}
+    assert reopened.get("k0") is None
+
+
+def test_for_sandbox_lives_under_logs(tmp_path):
+    setup_project_sandbox(tmp_path)
+    cache = AnalysisCache.for_sandbox("pylint")
+    assert cache.cache_dir == tmp_path.resolve() / "logs" / "analysis_cache" / "pylint"
+
+
+def test_runner_relints_only_changed_files(tmp_path):
+    pytest.importorskip("pylint")
+    (tmp_path / "a.py").write_text('"""a."""\nimport os\n', encoding="utf-8")
+    (tmp_path / "b.py").write_text('"""b."""\nX = 1\n', encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    cache = AnalysisCache.for_sandbox("pylint")
+    runner = PylintRunner(max_workers=1, cache=cache)
+
+    first = runner.run()
+    assert cache.stats()["misses"] == 2
+
+    (tmp_path / "b.py").write_text('"""b."""\nimport sys\n', encoding="utf-8")
+    second = runner.run()
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+    assert [m.symbol for m in second.messages if m.path == "a.py"] == \
+        [m.symbol for m in first.messages if m.path == "a.py"]
+    assert "unused-import" in {m.symbol for m in second.messages if m.path == "b.py"}
+
+
+def test_identical_files_at_different_paths_do_not_share_results(tmp_path):
+    pytest.importorskip("pylint")
+    source = '"""m."""\nimport os\n\n\ndef f():\n    """f."""\n    return 1\n'
+    (tmp_path / "a.py").write_text(source, encoding="utf-8")
+    (tmp_path / "b.py").write_text(source, encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    cache = AnalysisCache.for_sandbox("pylint")
+    runner = PylintRunner(max_workers=1, cache=cache)
+
+    runner.run()
+    report = runner.run()
+    assert cache.stats()["hits"] == 2
+    by_path = {m.path: m.module for m in report.messages if m.symbol == "unused-import"}
+    assert by_path == {"a.py": "a", "b.py": "b"}
@@ -0,0 +1,78 @@
+import sys
+import types
+import importlib
+from pathlib import Path
+
+import pytest
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+AstCacheModule = importlib.import_module("src.tools.analysis.AstCache")
+AstCache = AstCacheModule.AstCache
+compute_metrics = importlib.import_module("src.tools.analysis.ComplexityAnalyzer").compute_metrics
+WriteTool = importlib.import_module("src.tools.file_operations.WriteTool").WriteTool
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def test_same_content_parsed_once():
+    cache = AstCache()
+    first = cache.parse("x = 1\n")
+    assert cache.parse("x = 1\n") is first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_syntax_errors_are_cached():
+    cache = AstCache()
+    for _ in range(2):
+        with pytest.raises(SyntaxError):
+            cache.parse("def f(:\n")
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_bounds():
+    cache = AstCache(max_entries=2, max_source_bytes=1000)
+    a = cache.parse("a = 1\n")
+    cache.parse("b = 1\n")
+    cache.parse("a = 1\n")
+    cache.parse("c = 1\n")
+    assert len(cache) == 2
+    assert cache.parse("a = 1\n") is a
+
+    cache.parse("d = '" + "x" * 995 + "'\n")
+    assert cache.stats()["source_bytes"] <= 1000
+
+
+def test_write_validation_shares_tree_with_metrics(tmp_path):
+    setup_project_sandbox(tmp_path)
+    AstCacheModule.AST_CACHE.clear()
+    content = "def f(x):\n    return x if x else 0\n"
+
+    wt = WriteTool(create_backup=False)
+    assert "Success" in wt._run("shared.py", content)
+    misses = AstCacheModule.AST_CACHE.stats()["misses"]
+
+    metrics = compute_metrics(content, "shared.py")
+    assert metrics.max_complexity == 2
+    assert AstCacheModule.AST_CACHE.stats()["misses"] == misses
@@ -0,0 +1,134 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import asyncio
+import threading
+import time
+
+BoundedExecutor = importlib.import_module("src.tools.file_operations.AsyncExecutor").BoundedExecutor
+ReadTool = importlib.import_module("src.tools.file_operations.ReadTool").ReadTool
+WriteTool = importlib.import_module("src.tools.file_operations.WriteTool").WriteTool
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def test_executor_bounds_concurrency():
+    executor = BoundedExecutor(max_workers=8, limit=2)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def job(i):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return i
+
+    async def main():
+        return await asyncio.gather(*(executor.run(job, i) for i in range(10)))
+
+    assert asyncio.run(main()) == list(range(10))
+    assert peak[0] == 2
+    executor.shutdown()
+
+
+def test_cancelled_call_keeps_its_slot_until_the_thread_finishes():
+    executor = BoundedExecutor(max_workers=4, limit=1)
+    started, release = threading.Event(), threading.Event()
+    order = []
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        order.append("blocking")
+
+    async def main():
+        task = asyncio.create_task(executor.run(blocking))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        follower = asyncio.create_task(executor.run(order.append, "follower"))
+        await asyncio.sleep(0.05)
+        assert order == [] and executor.stats()["in_flight"] == 1
+        release.set()
+        await follower
+
+    asyncio.run(main())
+    assert order == ["blocking", "follower"]
+    executor.shutdown()
+
+
+def test_slow_write_does_not_block_event_loop(tmp_path):
+    setup_project_sandbox(str(tmp_path))
+    wt = WriteTool(create_backup=False)
+    real_write = wt.write_atomic
+
+    def slow_write(path, content):
+        time.sleep(0.2)
+        return real_write(path, content)
+
+    wt.write_atomic = slow_write
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        result, _ = await asyncio.gather(wt._arun("slow.py", "x = 1\n"), ticker())
+        return result
+
+    assert asyncio.run(main()).startswith("Success")
+    assert len(ticks) == 10 and ticks[-1] - ticks[0] < 0.19
+    assert (tmp_path / "slow.py").read_text(encoding="utf-8") == "x = 1\n"
+
+
+def test_same_file_writes_keep_call_order(tmp_path):
+    setup_project_sandbox(str(tmp_path))
+    wt = WriteTool(create_backup=False)
+
+    async def main():
+        await asyncio.gather(*(wt._arun("same.py", f"v = {i}\n") for i in range(20)))
+
+    asyncio.run(main())
+    assert (tmp_path / "same.py").read_text(encoding="utf-8") == "v = 19\n"
+
+
+def test_many_concurrent_reads(tmp_path):
+    root = setup_project_sandbox(str(tmp_path))
+    for i in range(30):
+        (root / f"m{i}.py").write_text(f"v = {i}\n", encoding="utf-8")
+    rt = ReadTool()
+
+    async def main():
+        return await asyncio.gather(*(rt._arun(f"m{i}.py") for i in range(30)))
+
+    assert asyncio.run(main()) == [f"v = {i}\n" for i in range(30)]
@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import pytest
+
+bs_mod = importlib.import_module("src.tools.file_operations.BackupStore")
+BackupStore = bs_mod.BackupStore
+get_backup_store = bs_mod.get_backup_store
+WriteTool = importlib.import_module("src.tools.file_operations.WriteTool").WriteTool
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def test_identical_contents_are_stored_once(tmp_path):
+    store = BackupStore(tmp_path / "store")
+    v1 = store.save("a.py", b"x = 1\n")
+    assert store.save("a.py", b"x = 1\n") is v1  # unchanged: no new version
+    store.save("a.py", b"x = 2\n")
+    store.save("b.py", b"x = 1\n")  # same content as a.py v1
+    assert [v.version for v in store.versions("a.py")] == [1, 2]
+    assert store.stats()["objects"] == 2
+
+
+def test_read_any_version_and_compression(tmp_path):
+    store = BackupStore(tmp_path / "store", compress=True)
+    big = ("def f():\n    return 1\n" * 200).encode()
+    store.save("m.py", big)
+    store.save("m.py", b"small\n")
+    assert store.read("m.py", 1) == big
+    assert store.read("m.py") == b"small\n"
+    assert store.read("m.py", -2) == big
+    assert store.stats()["bytes"] < len(big)
+    with pytest.raises(KeyError):
+        store.read("m.py", 7)
+
+
+def test_gc_keeps_last_versions_and_drops_unreferenced_objects(tmp_path):
+    store = BackupStore(tmp_path / "store")
+    for i in range(6):
+        store.save("a.py", f"x = {i}\n".encode())
+    result = store.gc(keep_last=2)
+    assert result["versions_removed"] == 4 and result["objects_removed"] == 4
+    assert [v.version for v in store.versions("a.py")] == [5, 6]
+    # numbering continues after gc
+    assert store.save("a.py", b"x = 99\n").version == 7
+    # max_age never drops the newest version
+    store.gc(keep_last=10, max_age=0)
+    assert [v.version for v in store.versions("a.py")] == [7]
+
+
+def test_write_tool_backs_up_into_store_and_restore(tmp_path):
+    root = setup_project_sandbox(str(tmp_path))
+    (root / "code.py").write_text("old = 1\n", encoding="utf-8")
+    wt = WriteTool()
+    res = wt._run("code.py", "new = 1\n")
+    assert "Backup created: code.py@v1" in res
+    wt._run("code.py", "newer = 1\n")
+    assert not list(root.glob("*.backup_*"))
+
+    store = get_backup_store(root)
+    assert [v.version for v in store.versions("code.py")] == [1, 2]
+    store.restore("code.py", 1)
+    assert (root / "code.py").read_text(encoding="utf-8") == "old = 1\n"
+
+
+def test_get_seeks_one_record_and_reads_legacy_index(tmp_path):
+    store = BackupStore(tmp_path / "store")
+    for i in range(50):
+        store.save("a.py", f"x = {i}\n".encode())
+    store.gc(keep_last=5)
+    index_file = store._index_file("a.py")
+    assert index_file.stat().st_size == 50 * bs_mod._RECORD.size
+    assert store.get("a.py", 3) is None  # dropped by gc
+    assert store.read("a.py", 47) == b"x = 46\n" and store.read("a.py", -5) == b"x = 45\n"
+    assert store.get("a.py", -6) is None
+
+    # a store written with the former JSON-lines index is converted on first use
+    legacy = index_file.with_suffix(".jsonl")
+    legacy.write_text("".join(json.dumps(v.to_dict()) + "\n" for v in store.versions("a.py")), encoding="utf-8")
+    index_file.unlink()
+    reopened = BackupStore(tmp_path / "store")
+    assert reopened.latest("a.py").version == 50
+    assert [v.version for v in reopened.versions("a.py")] == [46, 47, 48, 49, 50]
+    assert not legacy.exists()
@@ -0,0 +1,92 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import json
+
+BatchReadTool = importlib.import_module("src.tools.file_operations.BatchReadTool").BatchReadTool
+BatchWriteTool = importlib.import_module("src.tools.file_operations.BatchWriteTool").BatchWriteTool
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def test_batch_read_mixes_contents_and_errors(tmp_path):
+    root = setup_project_sandbox(str(tmp_path))
+    (root / "a.py").write_text("a = 1\n", encoding="utf-8")
+    (root / "pkg").mkdir()
+    (root / "pkg" / "b.py").write_text("b = 2\n", encoding="utf-8")
+
+    payload = json.loads(BatchReadTool()._run(["a.py", "pkg/b.py", "missing.py", "../escape.py", "notes.txt"]))
+
+    files = {f["file_path"]: f for f in payload["files"]}
+    assert files["a.py"]["content"] == "a = 1\n"
+    assert files["pkg/b.py"]["content"] == "b = 2\n"
+    assert "does not exist" in files["missing.py"]["error"]
+    assert files["../escape.py"]["error"] and files["notes.txt"]["error"]
+    assert (payload["read"], payload["failed"]) == (2, 3)
+    assert [f["file_path"] for f in payload["files"]][:2] == ["a.py", "pkg/b.py"]
+
+
+def test_batch_read_accepts_json_string(tmp_path):
+    root = setup_project_sandbox(str(tmp_path))
+    (root / "a.py").write_text("a = 1\n", encoding="utf-8")
+    payload = json.loads(BatchReadTool()._run('["a.py"]'))
+    assert payload["files"][0]["content"] == "a = 1\n"
+    assert BatchReadTool()._run("not json").startswith("Error")
+
+
+def test_batch_write_writes_all_files(tmp_path):
+    root = setup_project_sandbox(str(tmp_path))
+    edits = [{"file_path": f"m{i}.py", "content": f"v = {i}\n"} for i in range(20)]
+    payload = json.loads(BatchWriteTool()._run(edits))
+    assert (payload["written"], payload["failed"]) == (20, 0)
+    assert (root / "m7.py").read_text(encoding="utf-8") == "v = 7\n"
+
+
+def test_batch_write_rejects_whole_batch_on_invalid_edit(tmp_path):
+    root = setup_project_sandbox(str(tmp_path))
+    edits = [
+        {"file_path": "ok.py", "content": "x = 1\n"},
+        {"file_path": "bad.py", "content": "def broken(:\n"},
+        {"file_path": "../out.py", "content": "x = 1\n"},
+    ]
+    payload = json.loads(BatchWriteTool()._run(json.dumps(edits)))
+    assert payload["written"] == 0
+    results = {r["file_path"]: r for r in payload["results"]}
+    assert "Invalid Python syntax" in results["bad.py"]["message"]
+    assert "Unsafe" in results["../out.py"]["message"]
+    assert results["ok.py"]["message"].startswith("Skipped")
+    assert not (root / "ok.py").exists()
+
+
+def test_batch_write_rejects_duplicate_targets(tmp_path):
+    setup_project_sandbox(str(tmp_path))
+    edits = [{"file_path": "a.py", "content": "x = 1\n"}, {"file_path": "./a.py", "content": "x = 2\n"}]
+    payload = json.loads(BatchWriteTool()._run(edits))
+    assert payload["written"] == 0
+    assert "Duplicate" in payload["results"][1]["message"]
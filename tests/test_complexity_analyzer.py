@@ -0,0 +1,100 @@
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+ComplexityAnalyzer = importlib.import_module("src.tools.analysis.ComplexityAnalyzer").ComplexityAnalyzer
+AnalysisCache = importlib.import_module("src.tools.analysis.AnalysisCache").AnalysisCache
+
+SAMPLE = '''"""Sample module."""
+# a comment
+
+def classify(x):
+    if x > 0 and x < 10:
+        return "small"
+    elif x >= 10:
+        for i in range(x):
+            if i % 2:
+                return "odd"
+    return "other"
+
+
+class Shape:
+    def area(self):
+        return 0
+
+    def scaled(self, k):
+        return [k * v for v in (1, 2) if v]
+'''
+
+
+def test_single_pass_metrics():
+    m = ComplexityAnalyzer().analyze_source(SAMPLE, "sample.py")
+
+    assert (m.loc, m.comments, m.blank) == (19, 1, 4)
+    assert m.sloc == 14
+    assert (m.functions, m.classes) == (3, 1)
+
+    defs = {d.name: d for d in m.definitions}
+    # 1 + if + and + elif + for + if
+    assert defs["classify"].complexity == 6
+    # if/elif counts once, then for, then inner if
+    assert defs["classify"].max_nesting == 3
+    assert defs["Shape.scaled"].complexity == 3
+    assert defs["Shape"].complexity == 4
+    assert m.max_complexity == 6
+    assert m.complexity == 1 + 6 + 1 + 3
+    assert 0 < m.maintainability_index < 100
+    assert m.halstead_volume > 0
+
+
+def test_syntax_error_reported():
+    m = ComplexityAnalyzer().analyze_source("def f(:\n", "bad.py")
+    assert m.error.startswith("SyntaxError")
+
+
+def test_directory_with_worker_pool(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    for i in range(6):
+        (tmp_path / "pkg" / f"m{i}.py").write_text(SAMPLE, encoding="utf-8")
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "logs" / "ignored.py").write_text("x = 1\n", encoding="utf-8")
+
+    results = ComplexityAnalyzer(max_workers=2, parallel_threshold=0).analyze_directory(tmp_path)
+
+    assert list(results) == [f"pkg/m{i}.py" for i in range(6)]
+    assert all(r.max_complexity == 6 for r in results.values())
+
+
+def test_cached_metrics_roundtrip(tmp_path):
+    (tmp_path / "a.py").write_text(SAMPLE, encoding="utf-8")
+    cache = AnalysisCache(tmp_path / "logs" / "cache")
+    analyzer = ComplexityAnalyzer(max_workers=1, cache=cache)
+
+    first = analyzer.analyze_directory(tmp_path)
+    second = analyzer.analyze_directory(tmp_path)
+    assert cache.stats()["hits"] == 1
+    assert second == first
@@ -0,0 +1,143 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+import json
+
+context_packer = importlib.import_module("src.middleware.context_packer")
+PylintMessage = importlib.import_module("src.tools.analysis.PylintParser").PylintMessage
+fixer_mod = importlib.import_module("src.agents.fixer")
+auditor_mod = importlib.import_module("src.agents.auditor")
+base_agent = importlib.import_module("src.agents.base_agent")
+
+ContextPacker = context_packer.ContextPacker
+
+FILLER = "".join(f"\n\ndef filler_{i}(x):\n    total = x\n    for k in range(10):\n        total += k * {i}\n    return total\n" for i in range(40))
+
+SOURCES = {
+    "pkg/models.py": (
+        "class Account:\n"
+        "    \"\"\"A bank account.\"\"\"\n"
+        "\n"
+        "    def __init__(self, balance):\n"
+        "        self.balance = balance\n"
+        "\n"
+        "    def withdraw(self, amount):\n"
+        "        \"\"\"Take money out.\"\"\"\n"
+        "        self.balance -= amount\n"
+        "        return self.balance\n"
+        + FILLER
+    ),
+    "pkg/service.py": (
+        "from .models import Account\n"
+        + FILLER
+        + "\n\ndef pay(account, amount):\n"
+        "    unused = 1\n"
+        "    return account.withdraw(amount) + helper(amount)\n"
+        "\n\ndef helper(value):\n"
+        "    \"\"\"Fee for a payment.\"\"\"\n"
+        "    return value * 0\n"
+    ),
+}
+
+
+def _message(path, line, symbol="unused-variable", category="warning"):
+    return PylintMessage(path=path, line=line, column=4, symbol=symbol, message_id="W0612",
+                         category=category, message=f"{symbol} here")
+
+
+def _pay_line():
+    return SOURCES["pkg/service.py"].splitlines().index("    unused = 1") + 1
+
+
+def test_packs_enclosing_definition_and_referenced_headers():
+    packed = ContextPacker(budget=2000).pack(SOURCES, [_message("pkg/service.py", _pay_line())])
+
+    assert "def pay(account, amount):\n    unused = 1" in packed.files
+    # referenced helper: signature and docstring only
+    assert 'def helper(value):\n    """Fee for a payment."""' in packed.files
+    assert "return value * 0" not in packed.files
+    # filler functions of the file are not sent
+    assert "filler_3" not in packed.files.split("### pkg/models.py")[0]
+    assert packed.excerpted == ["pkg/models.py", "pkg/service.py"]
+    whole = sum(context_packer.estimate_tokens(s) for s in SOURCES.values())
+    assert packed.tokens < whole / 4
+
+
+def test_method_references_resolve_across_files():
+    line = SOURCES["pkg/models.py"].splitlines().index("        self.balance -= amount") + 1
+    packer = ContextPacker(budget=2000)
+    snippets = packer.snippets(SOURCES, [_message("pkg/models.py", line)])
+    assert (snippets[0].path, snippets[0].start) == ("pkg/models.py", 7)
+
+    # pay() uses Account.withdraw through an instance: only names the index knows are followed
+    refs = packer.snippets(SOURCES, [_message("pkg/service.py", _pay_line())])
+    assert {(s.path, s.rank[1]) for s in refs} >= {("pkg/service.py", 0), ("pkg/service.py", 1)}
+
+
+def test_excerpt_line_numbers_ignore_form_feeds():
+    source = SOURCES["pkg/service.py"].replace("from .models import Account\n", "from .models import Account\n\f\n")
+    line = source.split("\n").index("    unused = 1") + 1
+    packed = ContextPacker(budget=2000).pack({"pkg/service.py": source}, [_message("pkg/service.py", line)])
+    header, body = packed.files.split("\n```python\n", 1)
+    start = int(header.split("(lines ")[1].split("-")[0])
+    assert body.split("\n")[line - start] == "    unused = 1"
+
+
+def test_budget_is_respected_and_small_files_stay_whole():
+    sources = dict(SOURCES, **{"pkg/tiny.py": "VALUE = 1\n"})
+    messages = [_message("pkg/service.py", _pay_line())] + [
+        _message("pkg/models.py", 13 + 6 * i, "invalid-name", "convention") for i in range(30)
+    ]
+    packed = ContextPacker(budget=400).pack(sources, messages)
+    assert packed.tokens <= 400
+    assert "### pkg/tiny.py\n```python\nVALUE = 1\n" in packed.files
+    assert "pkg/tiny.py" not in packed.excerpted
+    # the warning outranks the conventions
+    assert packed.messages[0].symbol == "unused-variable"
+    assert "unused = 1" in packed.files
+
+
+def test_fixer_patches_excerpts_and_ignores_partial_rewrites(monkeypatch):
+    monkeypatch.setattr(base_agent, "log_experiment", lambda *args: None)
+    prompts = []
+    patch = "<<<<<<< SEARCH\n    unused = 1\n=======\n>>>>>>> REPLACE"
+
+    def llm(prompt):
+        prompts.append(prompt)
+        return json.dumps({
+            "patches": {"pkg/service.py": patch},
+            "files": {"pkg/models.py": "class Account:\n    pass\n"},
+        })
+
+    fixer = fixer_mod.FixerAgent(llm, "fake", packer=ContextPacker(budget=2000))
+    changed = fixer.fix(SOURCES, "remove unused variable", messages=[_message("pkg/service.py", _pay_line())])
+
+    assert "patches only" in prompts[0] and "total += k * 7" not in prompts[0]
+    assert list(changed) == ["pkg/service.py"]
+    assert "unused = 1" not in changed["pkg/service.py"]
+    assert changed["pkg/service.py"].count("def filler_") == 40
@@ -0,0 +1,120 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import pytest
+
+scanner = importlib.import_module("src.tools.file_operations.DirectoryScanner")
+ListItems = importlib.import_module("src.tools.file_operations.ListItems").ListItems
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def _tree(root):
+    for rel in [
+        "main.py", "README.md", "src/app.py", "src/util/helpers.py", "src/util/data.json",
+        "tests/test_app.py", "build/gen.py", "src/__pycache__/app.cpython-311.pyc",
+        "logs/run.json", "src/util/keep.log", "src/util/drop.log",
+    ]:
+        p = root / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text("x = 1\n", encoding="utf-8")
+    (root / ".gitignore").write_text("build/\n*.log\n!keep.log\n", encoding="utf-8")
+    return root
+
+
+def _paths(**options):
+    return [e.path for e in scanner.iter_directory(**options)]
+
+
+def test_recursive_walk_applies_ignores_and_gitignore(tmp_path):
+    root = _tree(tmp_path)
+    paths = _paths(root=root)
+    assert paths == [
+        ".gitignore", "README.md", "main.py", "src", "src/app.py", "src/util",
+        "src/util/data.json", "src/util/helpers.py", "src/util/keep.log", "tests", "tests/test_app.py",
+    ]
+
+
+def test_filters_and_depth(tmp_path):
+    root = _tree(tmp_path)
+    assert _paths(root=root, suffixes=[".py"], include_dirs=False) == [
+        "main.py", "src/app.py", "src/util/helpers.py", "tests/test_app.py",
+    ]
+    assert _paths(root=root, pattern="src/**/*.py") == ["src/app.py", "src/util/helpers.py"]
+    assert _paths(root=root, pattern="test_*.py") == ["tests/test_app.py"]
+    assert _paths(root=root, max_depth=1) == [".gitignore", "README.md", "main.py", "src", "tests"]
+
+
+def test_cursor_pagination_covers_everything_once(tmp_path):
+    root = _tree(tmp_path)
+    expected = _paths(root=root)
+    seen, cursor = [], None
+    while True:
+        page = scanner.scan_directory(root, limit=3, cursor=cursor)
+        seen += [e.path for e in page.entries]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_metadata_from_scandir(tmp_path):
+    root = _tree(tmp_path)
+    entry = next(e for e in scanner.iter_directory(root, with_metadata=True) if e.path == "main.py")
+    assert entry.size == 6 and entry.mtime is not None
+
+
+def test_list_items_recursive_and_default_unchanged(tmp_path):
+    root = setup_project_sandbox(str(_tree(tmp_path)))
+    tool = ListItems()
+    assert "_sandbox_backup" in tool._run(".").splitlines()  # one-level listing as before
+
+    out = tool._run(".", recursive=True, pattern="*.py", limit=2)
+    lines = out.splitlines()
+    assert lines == ["main.py", "src/app.py", "Next cursor: src/app.py"]
+    rest = tool._run(".", recursive=True, pattern="*.py", cursor="src/app.py").splitlines()
+    assert rest == ["src/util/helpers.py", "tests/test_app.py"]
+    assert tool._run("src", recursive=True, max_depth=1).splitlines() == ["app.py", "util/"]
+
+
+def test_subdirectory_listing_applies_gitignore_from_sandbox_root(tmp_path):
+    root = setup_project_sandbox(str(_tree(tmp_path)))
+    (root / "src" / ".gitignore").write_text("data.json\n", encoding="utf-8")
+    tool = ListItems()
+    assert tool._run("src/util", recursive=True).splitlines() == ["helpers.py", "keep.log"]
+    assert _paths(root=root / "src", gitignore_root=root) == [
+        ".gitignore", "app.py", "util", "util/helpers.py", "util/keep.log",
+    ]
+
+
+def test_max_depth_requires_recursive(tmp_path):
+    setup_project_sandbox(str(_tree(tmp_path)))
+    assert ListItems()._run("src", max_depth=1) == "Error: max_depth requires recursive=true"
+    with pytest.raises(ValueError):
+        _paths(root=tmp_path, max_depth=0)
@@ -0,0 +1,150 @@
+import sys
+import types
+import importlib
+import threading
+from pathlib import Path
+
+import pytest
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+IncrementalAnalyzer = importlib.import_module("src.tools.analysis.IncrementalAnalyzer")
+compute_write_delta = IncrementalAnalyzer.compute_write_delta
+DeltaTracker = IncrementalAnalyzer.DeltaTracker
+PylintRunner = importlib.import_module("src.tools.analysis.PylintRunner").PylintRunner
+AnalysisCache = importlib.import_module("src.tools.analysis.AnalysisCache").AnalysisCache
+WriteTool = importlib.import_module("src.tools.file_operations.WriteTool").WriteTool
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+OLD = '''"""Module."""
+
+
+def keep(x):
+    return x
+
+
+def tangled(x):
+    if x:
+        if x > 1:
+            return 1
+    return 0
+
+
+class Box:
+    def get(self):
+        return 1
+
+    def put(self, v):
+        return v
+'''
+
+NEW = OLD.replace(
+    "    if x:\n        if x > 1:\n            return 1\n    return 0\n",
+    "    return int(x > 1)\n",
+).replace("    def put(self, v):\n        return v\n", "    def put(self, v):\n        return v\n\n    def size(self):\n        return 0\n")
+
+
+def test_only_changed_definitions_are_reported():
+    delta = compute_write_delta(OLD, NEW, "m.py")
+
+    changes = {c.name: c for c in delta.changes}
+    assert set(changes) == {"tangled", "Box", "Box.size"}
+    assert changes["tangled"].change == "modified"
+    assert (changes["tangled"].complexity_before, changes["tangled"].complexity_after) == (3, 1)
+    assert changes["Box.size"].change == "added"
+    assert delta.verdict == "improved"
+
+
+def test_syntax_error_is_a_regression():
+    delta = compute_write_delta(OLD, "def broken(:\n", "m.py")
+    assert delta.syntax_error and delta.verdict == "regressed"
+
+
+def test_tracker_follows_write_tool(tmp_path):
+    (tmp_path / "m.py").write_text(OLD, encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    seen = []
+
+    with DeltaTracker(on_delta=seen.append) as tracker:
+        res = WriteTool(create_backup=False)._run("m.py", NEW)
+        assert "Success" in res
+
+    assert tracker.latest("m.py") is seen[0]
+    assert {c.name for c in seen[0].changes} == {"tangled", "Box", "Box.size"}
+
+    # once stopped, writes are no longer tracked
+    WriteTool(create_backup=False)._run("m.py", OLD)
+    assert len(seen) == 1
+
+
+def test_tracker_scores_writes_in_background(tmp_path):
+    (tmp_path / "m.py").write_text(OLD, encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    release = threading.Event()
+    seen = []
+
+    def slow(delta):
+        release.wait(5)
+        seen.append(delta)
+
+    with DeltaTracker(on_delta=slow) as tracker:
+        WriteTool(create_backup=False)._run("m.py", NEW)
+        WriteTool(create_backup=False)._run("m.py", OLD)  # not blocked by the first delta
+        assert seen == []
+        release.set()
+        tracker.flush()
+        assert len(seen) == 2
+        assert tracker.latest("m.py") is seen[1]
+
+
+def test_lint_restricted_to_changed_definitions(tmp_path):
+    pytest.importorskip("pylint")
+    old = '"""m."""\n\n\ndef a():\n    """a."""\n    return 1\n\n\ndef b():\n    """b."""\n    return 2\n'
+    new = old.replace('    return 2\n', '    unused = 3\n    return 2\n')
+    (tmp_path / "m.py").write_text(old, encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    runner = PylintRunner(max_workers=1, cache=AnalysisCache.for_sandbox("pylint"))
+    runner.run()  # previous audit populates the cache
+
+    (tmp_path / "m.py").write_text(new, encoding="utf-8")
+    delta = compute_write_delta(old, new, "m.py", runner=runner)
+
+    (change,) = delta.changes
+    assert change.name == "b"
+    assert change.lint_before == []
+    assert [m.symbol for m in change.lint_after] == ["unused-variable"]
+    assert delta.lint_delta == 1 and delta.verdict == "regressed"
+
+
+def test_lint_unknown_when_file_no_longer_holds_the_written_content(tmp_path):
+    pytest.importorskip("pylint")
+    (tmp_path / "m.py").write_text(OLD, encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    runner = PylintRunner(max_workers=1)
+
+    # a later write (or a rollback) replaced NEW before its event was scored
+    delta = compute_write_delta(OLD, NEW, "m.py", runner=runner)
+    assert delta.changes and all(c.lint_after is None for c in delta.changes)
+    assert delta.lint_delta is None
@@ -0,0 +1,109 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+import time
+
+import pytest
+
+llm_cache = importlib.import_module("src.middleware.llm_cache")
+base_agent = importlib.import_module("src.agents.base_agent")
+ActionType = importlib.import_module("src.utils.logger").ActionType
+
+LLMCache = llm_cache.LLMCache
+CachedLLM = llm_cache.CachedLLM
+
+
+class StubModel:
+    """Offline chat model: answers with a counter so every network call is visible."""
+
+    def __init__(self, temperature=0.0):
+        self.temperature = temperature
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return f"answer {self.calls}"
+
+
+def test_key_depends_on_model_params_and_normalized_prompt():
+    key = llm_cache.cache_key("m", {"temperature": 0}, "fix this\r\nplease  \n")
+    assert key == llm_cache.cache_key("m", {"temperature": 0}, "fix this\nplease")
+    assert key != llm_cache.cache_key("m", {"temperature": 0.7}, "fix this\nplease")
+    assert key != llm_cache.cache_key("other", {"temperature": 0}, "fix this\nplease")
+    messages = [("system", "be brief"), ("human", "hi ")]
+    assert llm_cache.cache_key("m", {}, messages) == llm_cache.cache_key(
+        "m", {}, [{"role": "system", "content": "be brief"}, {"role": "human", "content": "hi"}])
+
+
+def test_cached_llm_replays_across_instances(tmp_path):
+    model = StubModel()
+    llm = CachedLLM(model, LLMCache(tmp_path / "cache.sqlite"), "stub")
+    assert llm.invoke("prompt") == "answer 1"
+    assert llm.invoke("prompt") == "answer 1"
+    assert llm.invoke("another") == "answer 2"
+
+    # a new process (new connection) replays from disk without calling the model
+    replay = CachedLLM(StubModel(), LLMCache(tmp_path / "cache.sqlite"), "stub")
+    text, info = replay.invoke_cached("prompt")
+    assert (text, info["hit"]) == ("answer 1", True)
+    assert replay.llm.calls == 0
+    assert model.calls == 2 and llm.params == {"temperature": 0.0}
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = LLMCache(tmp_path / "c.sqlite", max_entries=2)
+    cache.put("a", "m", "A")
+    cache.put("b", "m", "B")
+    time.sleep(0.01)
+    assert cache.get("a") == "A"  # a is now more recent than b
+    cache.put("c", "m", "C")
+    assert cache.get("b") is None and cache.get("a") == "A"
+    assert cache.stats()["entries"] == 2
+
+    expiring = LLMCache(tmp_path / "t.sqlite", ttl=0.05)
+    expiring.put("k", "m", "v")
+    assert expiring.get("k") == "v"
+    time.sleep(0.1)
+    assert expiring.get("k") is None
+    assert expiring.stats()["entries"] == 0
+
+
+def test_agent_logs_cache_hits(tmp_path, monkeypatch):
+    entries = []
+    monkeypatch.setattr(base_agent, "log_experiment", lambda *args: entries.append(args))
+    model = StubModel()
+    agent = base_agent.BaseAgent(CachedLLM(model, LLMCache(tmp_path / "c.sqlite"), "stub"), "stub")
+
+    agent.ask("audit this", ActionType.ANALYSIS)
+    agent.ask("audit this", ActionType.ANALYSIS)
+
+    first, second = (e[3]["llm_cache"] for e in entries)
+    assert (first["hit"], second["hit"]) == (False, True)
+    assert (second["hits"], second["misses"]) == (1, 1)
+    assert entries[1][3]["output_response"] == "answer 1"
+    assert model.calls == 1
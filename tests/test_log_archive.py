@@ -0,0 +1,139 @@
+import os
+import sys
+import importlib
+from pathlib import Path
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+log_archive = importlib.import_module("src.utils.log_archive")
+jsonl_store = importlib.import_module("src.utils.jsonl_store")
+
+SYSTEM_PROMPT = "You are a meticulous Python refactoring agent. " * 200
+
+
+def _entries(start, n):
+    return [
+        {
+            "id": str(i),
+            "timestamp": f"2025-12-26T01:{i % 60:02d}:00",
+            "agent": "Fixer" if i % 2 else "Auditor",
+            "model": "gemini-1.5-flash",
+            "action": "FIX",
+            "details": {"input_prompt": SYSTEM_PROMPT, "output_response": f"patch {i}", "file": f"m{i}.py"},
+            "status": "SUCCESS",
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def _log(tmp_path, entries):
+    path = tmp_path / "experiment_data.jsonl"
+    jsonl_store.JsonlLogStore(str(path)).append_many(entries)
+    return str(path)
+
+
+def test_rotation_and_metrics(tmp_path):
+    source = _log(tmp_path, _entries(0, 25))
+    archive_dir = str(tmp_path / "archive")
+
+    assert log_archive.LogArchiver(archive_dir, segment_rows=10).archive(source) == 25
+
+    reader = log_archive.ArchiveReader(archive_dir)
+    assert len(reader.segments) == 3
+    metrics = reader.load_metrics()
+    assert metrics["id"] == [str(i) for i in range(25)]
+    assert metrics["agent"][:2] == ["Auditor", "Fixer"]
+
+
+def test_repeated_prompt_stored_once(tmp_path):
+    source = _log(tmp_path, _entries(0, 50))
+    archive_dir = tmp_path / "archive"
+    log_archive.LogArchiver(str(archive_dir)).archive(source)
+
+    # 1 shared system prompt + 50 distinct responses
+    lines = (archive_dir / log_archive.PACK_INDEX_FILE).read_text().splitlines()
+    assert len(lines) == 51
+    assert os.path.getsize(archive_dir / log_archive.PACK_FILE) < len(SYSTEM_PROMPT)
+
+
+def test_lazy_entries_roundtrip(tmp_path):
+    entries = _entries(0, 3)
+    source = _log(tmp_path, entries)
+    archive_dir = str(tmp_path / "archive")
+    log_archive.LogArchiver(archive_dir).archive(source)
+
+    with log_archive.ArchiveReader(archive_dir) as reader:
+        archived = list(reader.entries())
+        assert archived[1].output_response == "patch 1"
+        assert [a.to_dict() for a in archived] == entries
+
+
+def test_incremental_archive(tmp_path):
+    source = _log(tmp_path, _entries(0, 5))
+    archive_dir = str(tmp_path / "archive")
+    log_archive.LogArchiver(archive_dir).archive(source)
+
+    jsonl_store.JsonlLogStore(source).append_many(_entries(5, 2))
+    assert log_archive.LogArchiver(archive_dir).archive(source) == 2
+    assert log_archive.ArchiveReader(archive_dir).load_metrics(["id"])["id"] == [str(i) for i in range(7)]
+
+
+def test_small_archives_fill_the_open_segment(tmp_path):
+    source = _log(tmp_path, _entries(0, 4))
+    archive_dir = str(tmp_path / "archive")
+    for start in (4, 6, 8):
+        log_archive.LogArchiver(archive_dir, segment_rows=5).archive(source)
+        jsonl_store.JsonlLogStore(source).append_many(_entries(start, 2))
+    assert log_archive.LogArchiver(archive_dir, segment_rows=5).archive(source) == 2
+
+    reader = log_archive.ArchiveReader(archive_dir)
+    assert len(reader.segments) == 2
+    assert reader.load_metrics(["id"])["id"] == [str(i) for i in range(10)]
+
+
+def test_non_dict_details_roundtrip(tmp_path):
+    legacy = {"id": "s", "timestamp": "t", "agent": "System", "model": "unknown",
+              "action": "STARTUP", "details": "Target: ./sandbox", "status": "INFO"}
+    entries = [legacy] + _entries(0, 1)
+    archive_dir = str(tmp_path / "archive")
+    log_archive.LogArchiver(archive_dir).archive(_log(tmp_path, entries))
+
+    with log_archive.ArchiveReader(archive_dir) as reader:
+        assert [a.to_dict() for a in reader.entries()] == entries
+
+
+def test_load_metrics_decompresses_only_requested_columns(tmp_path, monkeypatch):
+    archive_dir = str(tmp_path / "archive")
+    log_archive.LogArchiver(archive_dir, segment_rows=10).archive(_log(tmp_path, _entries(0, 10)))
+    decompressed = []
+    real = log_archive.zlib.decompress
+    monkeypatch.setattr(log_archive.zlib, "decompress", lambda data: decompressed.append(data) or real(data))
+
+    reader = log_archive.ArchiveReader(archive_dir)
+    assert reader.load_metrics(["agent"])["agent"][:2] == ["Auditor", "Fixer"]
+    assert len(decompressed) == 1
+
+
+def test_interrupted_rewrite_does_not_duplicate_rows(tmp_path, monkeypatch):
+    source = _log(tmp_path, _entries(0, 3))
+    archive_dir = str(tmp_path / "archive")
+    log_archive.LogArchiver(archive_dir, segment_rows=5).archive(source)
+    jsonl_store.JsonlLogStore(source).append_many(_entries(3, 2))
+
+    def crash(self):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(log_archive.LogArchiver, "_save_state", crash)
+    try:
+        log_archive.LogArchiver(archive_dir, segment_rows=5).archive(source)
+    except KeyboardInterrupt:
+        pass
+    monkeypatch.undo()
+
+    # le segment réécrit n'a jamais été publié : il est ignoré puis supprimé
+    assert log_archive.LogArchiver(archive_dir, segment_rows=5).archive(source) == 2
+    reader = log_archive.ArchiveReader(archive_dir)
+    assert reader.load_metrics(["id"])["id"] == [str(i) for i in range(5)]
+    assert sorted(n for n in os.listdir(archive_dir) if n.startswith("segment-")) == reader.segments
@@ -0,0 +1,104 @@
+import sys
+import importlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+log_query = importlib.import_module("src.utils.log_query")
+jsonl_store = importlib.import_module("src.utils.jsonl_store")
+ActionType = importlib.import_module("src.utils.logger").ActionType
+
+
+def _entry(i, agent, action, status, model="gemini-1.5-flash", age=timedelta(0)):
+    return {
+        "id": str(i),
+        "timestamp": (datetime.now() - age).isoformat(),
+        "agent": agent,
+        "model": model,
+        "action": action,
+        "details": {"input_prompt": "p" * 500, "output_response": "r" * 500},
+        "status": status,
+    }
+
+
+def _write(path, entries):
+    store = jsonl_store.JsonlLogStore(str(path))
+    store.append_many(entries)
+
+
+def test_filters_and_time_range(tmp_path):
+    path = tmp_path / "log.jsonl"
+    _write(path, [
+        _entry(0, "Fixer", "FIX", "FAILURE"),
+        _entry(1, "Fixer", "FIX", "SUCCESS"),
+        _entry(2, "Fixer", "FIX", "FAILURE", age=timedelta(hours=3)),
+        _entry(3, "Fixer", "FIX", "FAILURE", model="gpt-4o"),
+        _entry(4, "Auditor", "CODE_ANALYSIS", "FAILURE"),
+    ])
+
+    q = log_query.ExperimentLogQuery(str(path))
+    found = list(q.find(action=ActionType.FIX, status="FAILURE",
+                        model="gemini-1.5-flash", since=timedelta(hours=1)))
+    assert [e["id"] for e in found] == ["0"]
+    assert q.count(agent=["Fixer", "Auditor"]) == 5
+
+
+def test_count_by_uses_index(tmp_path):
+    path = tmp_path / "log.jsonl"
+    _write(path, [
+        _entry(0, "Fixer", "FIX", "FAILURE"),
+        _entry(1, "Fixer", "FIX", "SUCCESS"),
+        _entry(2, "Judge", "DEBUG", "SUCCESS"),
+    ])
+    q = log_query.ExperimentLogQuery(str(path))
+    assert q.count_by("status", agent="Fixer") == {"FAILURE": 1, "SUCCESS": 1}
+    assert q.count_by("agent") == {"Fixer": 2, "Judge": 1}
+
+
+def test_incremental_refresh_and_persisted_index(tmp_path):
+    path = tmp_path / "log.jsonl"
+    _write(path, [_entry(0, "Fixer", "FIX", "SUCCESS")])
+    q = log_query.ExperimentLogQuery(str(path))
+    assert q.refresh() == 1
+    assert Path(str(path) + ".idx").exists()
+
+    _write(path, [_entry(1, "Judge", "DEBUG", "SUCCESS")])
+    reopened = log_query.ExperimentLogQuery(str(path))
+    assert reopened.refresh() == 1
+    assert [e["id"] for e in reopened.find()] == ["0", "1"]
+
+
+def test_partial_trailing_line_not_indexed(tmp_path):
+    path = tmp_path / "log.jsonl"
+    _write(path, [_entry(0, "Fixer", "FIX", "SUCCESS")])
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"id": "half"')
+    q = log_query.ExperimentLogQuery(str(path))
+    assert q.count() == 1
+
+
+def test_refresh_appends_to_the_index_instead_of_rewriting_it(tmp_path):
+    path = tmp_path / "log.jsonl"
+    index = Path(str(path) + ".idx")
+    index.write_text('{"version": 1}', encoding="utf-8")  # old single-file format
+    _write(path, [_entry(0, "Fixer", "FIX", "SUCCESS"), _entry(1, "Auditor", "CODE_ANALYSIS", "SUCCESS")])
+    q = log_query.ExperimentLogQuery(str(path))
+    assert q.refresh() == 2 and index.is_dir()
+
+    agent_postings = index / log_query.POSTINGS_DIR / "agent"
+    files = {p.name: p.stat().st_size for p in agent_postings.iterdir()}
+    records = (index / log_query.RECORDS_FILE).stat().st_size
+    _write(path, [_entry(2, "Fixer", "FIX", "FAILURE")])
+    assert q.refresh() == 1
+
+    assert (index / log_query.RECORDS_FILE).stat().st_size == records + log_query._RECORD.size
+    grown = [name for name, size in files.items() if (agent_postings / name).stat().st_size != size]
+    assert len(grown) == 1  # only the "Fixer" postings got one more record number
+    reopened = log_query.ExperimentLogQuery(str(path))
+    assert reopened.refresh() == 0
+    assert [e["id"] for e in reopened.find(agent="Fixer")] == ["0", "2"]
+    assert reopened.count(status="FAILURE", since=timedelta(hours=1)) == 1
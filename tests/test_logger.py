@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import threading
+import multiprocessing
+import importlib
+from pathlib import Path
+
+import pytest
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+logger = importlib.import_module("src.utils.logger")
+jsonl_store = importlib.import_module("src.utils.jsonl_store")
+ActionType = logger.ActionType
+
+
+@pytest.fixture
+def log_paths(tmp_path, monkeypatch):
+    """Redirect the experiment log files into tmp_path."""
+    legacy = tmp_path / "experiment_data.json"
+    stream = tmp_path / "experiment_data.jsonl"
+    monkeypatch.setattr(logger, "LOG_FILE", str(legacy))
+    monkeypatch.setattr(logger, "LOG_STREAM_FILE", str(stream))
+    monkeypatch.setattr(logger, "_writer", None)
+    yield legacy, stream
+    logger.close_logs()
+
+
+def _details(i=0):
+    return {"input_prompt": f"prompt {i}", "output_response": f"response {i}"}
+
+
+def test_log_appends_jsonl_lines(log_paths):
+    _, stream = log_paths
+    for i in range(3):
+        logger.log_experiment("Auditor", "gemini-1.5-flash", ActionType.ANALYSIS, _details(i), "SUCCESS")
+    logger.flush_logs()
+
+    lines = stream.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert [json.loads(l)["details"]["input_prompt"] for l in lines] == ["prompt 0", "prompt 1", "prompt 2"]
+
+
+def test_missing_prompt_rejected(log_paths):
+    with pytest.raises(ValueError):
+        logger.log_experiment("Fixer", "gemini-1.5-flash", ActionType.FIX, {"input_prompt": "x"}, "FAILURE")
+
+
+def test_export_matches_legacy_format(log_paths):
+    legacy, _ = log_paths
+    logger.log_experiment("Fixer", "gemini-1.5-flash", "FIX", _details(), "SUCCESS")
+    assert logger.export_experiment_log() == 1
+
+    data = json.loads(legacy.read_text(encoding="utf-8"))
+    assert isinstance(data, list)
+    assert data[0]["action"] == "FIX"
+    assert data[0]["details"] == _details()
+
+
+def test_legacy_log_migrated_on_first_use(log_paths):
+    legacy, stream = log_paths
+    old_entry = {"id": "old", "agent": "System", "action": "FIX", "details": _details(), "status": "INFO"}
+    legacy.write_text(json.dumps([old_entry], indent=4), encoding="utf-8")
+
+    logger.log_experiment("Judge", "gemini-1.5-flash", ActionType.DEBUG, _details(1), "SUCCESS")
+    logger.flush_logs()
+
+    ids = [e["id"] for e in jsonl_store.iter_jsonl(str(stream))]
+    assert ids[0] == "old"
+    assert len(ids) == 2
+
+
+def test_store_batches_until_flush(tmp_path):
+    path = tmp_path / "batch.jsonl"
+    store = jsonl_store.JsonlLogStore(str(path), flush_every=10, flush_interval=3600)
+    store.append({"n": 1})
+    assert not path.exists()
+    store.flush()
+    assert list(jsonl_store.iter_jsonl(str(path))) == [{"n": 1}]
+
+
+def test_truncated_line_is_skipped(tmp_path):
+    path = tmp_path / "crash.jsonl"
+    path.write_text('{"n": 1}\n{"n": 2', encoding="utf-8")
+    assert list(jsonl_store.iter_jsonl(str(path))) == [{"n": 1}]
+
+
+def test_concurrent_threads_lose_no_entries(log_paths):
+    _, stream = log_paths
+
+    def worker(n):
+        for i in range(200):
+            logger.log_experiment(f"Agent{n}", "gemini-1.5-flash", ActionType.FIX, _details(i), "SUCCESS")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    logger.flush_logs()
+
+    entries = list(jsonl_store.iter_jsonl(str(stream)))
+    assert len(entries) == 8 * 200
+    assert len({e["id"] for e in entries}) == 8 * 200
+
+
+def _append_from_process(path, n):
+    store = jsonl_store.JsonlLogStore(path, flush_every=7, lock=True)
+    for i in range(300):
+        store.append({"pid": n, "i": i, "payload": "x" * 2000})
+    store.flush()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_locked_store_shared_by_processes(tmp_path):
+    path = str(tmp_path / "shared.jsonl")
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_append_from_process, args=(path, n)) for n in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    entries = list(jsonl_store.iter_jsonl(path))
+    assert len(entries) == 4 * 300
@@ -0,0 +1,190 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import json
+
+import pytest
+
+import_graph = importlib.import_module("src.orchestration.import_graph")
+sharding = importlib.import_module("src.orchestration.sharding")
+swarm_mod = importlib.import_module("src.orchestration.swarm")
+base_agent = importlib.import_module("src.agents.base_agent")
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+
+CORE = "def add(a, b):\n    return a + b\n"
+CORE_FIXED = '"""Core helpers."""\n\n\ndef add(a, b):\n    """Return the sum of a and b."""\n    return a + b\n'
+CORE_BROKEN = '"""Core helpers."""\n\n\ndef add(a, b):\n    """Return the sum of a and b."""\n    return a - b\n'
+
+
+def _project(root):
+    files = {
+        "pkg/__init__.py": "",
+        "pkg/core.py": CORE,
+        "pkg/util.py": "from .core import add\n\n\ndef twice(x):\n    return add(x, x)\n",
+        "tests/test_core.py": "from pkg.core import add\n\n\ndef test_add():\n    assert add(1, 2) == 3\n",
+        "standalone.py": "import os\n",
+    }
+    for rel, content in files.items():
+        p = root / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(content, encoding="utf-8")
+    SandboxSetup.setup_project_sandbox(str(root))
+    return root
+
+
+class FakeLLM:
+    """Plays the Auditor and the Fixer; `fixes` are returned in order, one per Fixer call ("{..." as is)."""
+
+    def __init__(self, fixes):
+        self.fixes = list(fixes)
+        self.prompts = []
+
+    def __call__(self, prompt):
+        self.prompts.append(prompt)
+        if prompt.startswith("You are the Auditor"):
+            return json.dumps({"plan": "Add docstrings", "issues": {}})
+        if "### pkg/core.py" not in prompt or not self.fixes:
+            return json.dumps({"files": {}})
+        fix = self.fixes.pop(0)
+        if fix.startswith("{"):
+            return fix  # raw (e.g. truncated) answer
+        return "```json\n" + json.dumps({"files": {"pkg/core.py": fix}}) + "\n```"
+
+
+@pytest.fixture(autouse=True)
+def langchain_globals(monkeypatch):
+    # langgraph reads these globals from the (stubbed) langchain root module
+    for name, value in (("debug", False), ("verbose", False), ("llm_cache", None)):
+        monkeypatch.setattr(sys.modules["langchain"], name, value, raising=False)
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    entries = []
+    monkeypatch.setattr(base_agent, "log_experiment", lambda *args: entries.append(args))
+    return entries
+
+
+def test_import_graph_resolves_relative_absolute_and_src_layout(tmp_path):
+    root = _project(tmp_path)
+    (root / "src" / "lib").mkdir(parents=True)
+    (root / "src" / "lib" / "__init__.py").write_text("", encoding="utf-8")
+    (root / "src" / "lib" / "api.py").write_text("from pkg.util import twice\n", encoding="utf-8")
+    (root / "src" / "app.py").write_text("from lib import api\nimport lib.api as a2\n", encoding="utf-8")
+    files = ["pkg/__init__.py", "pkg/core.py", "pkg/util.py", "tests/test_core.py",
+             "standalone.py", "src/lib/__init__.py", "src/lib/api.py", "src/app.py"]
+    graph = import_graph.build_import_graph(root, files)
+    assert graph["pkg/util.py"] == {"pkg/core.py"}
+    assert graph["tests/test_core.py"] == {"pkg/core.py"}
+    assert graph["src/lib/api.py"] == {"pkg/util.py"}
+    assert graph["src/app.py"] == {"src/lib/api.py", "src/lib/__init__.py"}
+    assert graph["standalone.py"] == set()
+
+
+def test_shards_keep_import_components_together():
+    graph = {"a.py": {"b.py"}, "b.py": set(), "c.py": {"b.py"}, "d.py": set(), "e.py": set(), "f.py": {"e.py"}}
+    shards = sharding.shard_files(graph, max_files=3)
+    groups = [set(s.files) for s in shards]
+    assert {"a.py", "b.py", "c.py"} in groups
+    assert sorted(f for s in shards for f in s.files) == sorted(graph)
+    assert all(len(s.files) <= 3 for s in shards)
+    # oversized components are cut, never dropped
+    big = sharding.shard_files({f"m{i}.py": {f"m{i + 1}.py"} for i in range(7)} | {"m7.py": set()}, max_files=3)
+    assert [len(s.files) for s in big] == [3, 3, 2]
+
+
+def test_swarm_fixes_shards_concurrently(tmp_path, logged):
+    root = _project(tmp_path)
+    llm = FakeLLM([CORE_FIXED])
+    report = swarm_mod.Swarm(root, llm, workers=2, max_shard_files=4).run()
+
+    assert len(report.results) == 2 and not report.errors
+    assert report.passed == 2
+    assert report.changed_files == ["pkg/core.py"]
+    assert (root / "pkg" / "core.py").read_text(encoding="utf-8") == CORE_FIXED
+    assert {args[0] for args in logged} == {"Auditor", "Fixer"}
+    assert all("input_prompt" in args[3] and "output_response" in args[3] for args in logged)
+
+
+def test_rejected_fix_is_rolled_back_then_retried(tmp_path, logged):
+    root = _project(tmp_path)
+    llm = FakeLLM([CORE_BROKEN, CORE_FIXED])
+    swarm = swarm_mod.Swarm(root, llm, workers=1, max_iterations=3, max_shard_files=4)
+    shard = next(s for s in swarm.plan() if "pkg/core.py" in s.files)
+    result = swarm.run_shard(shard)
+
+    assert result.passed and result.iterations == 2
+    assert (root / "pkg" / "core.py").read_text(encoding="utf-8") == CORE_FIXED
+    retry_prompt = [p for p in llm.prompts if "rejected by the Judge" in p][0]
+    assert "Tests failed" in retry_prompt
+    assert [args[2].value for args in logged if args[0] == "Fixer"] == ["FIX", "DEBUG"]
+
+
+def test_invalid_fix_never_reaches_the_tree(tmp_path, logged):
+    root = _project(tmp_path)
+    swarm = swarm_mod.Swarm(root, FakeLLM(["def add(a, b:\n"]), workers=1, max_iterations=1, max_shard_files=4)
+    shard = next(s for s in swarm.plan() if "pkg/core.py" in s.files)
+    result = swarm.run_shard(shard)
+    assert not result.passed and result.error is None
+    assert (root / "pkg" / "core.py").read_text(encoding="utf-8") == CORE
+
+
+def test_unparseable_answer_is_retried_not_passed(tmp_path, logged):
+    root = _project(tmp_path)
+    llm = FakeLLM(['{"files": {"pkg/core.py": "\\"\\"\\"Core', CORE_FIXED])
+    swarm = swarm_mod.Swarm(root, llm, workers=1, max_iterations=3, max_shard_files=4)
+    shard = next(s for s in swarm.plan() if "pkg/core.py" in s.files)
+    result = swarm.run_shard(shard)
+
+    assert result.passed and result.iterations == 2
+    retry_prompt = [p for p in llm.prompts if "rejected by the Judge" in p][0]
+    assert "not valid JSON" in retry_prompt
+    assert (root / "pkg" / "core.py").read_text(encoding="utf-8") == CORE_FIXED
+
+
+def test_tests_outside_the_shard_judge_it_and_tree_holds_only_accepted_fixes(tmp_path, logged, monkeypatch):
+    root = _project(tmp_path)
+    swarm = swarm_mod.Swarm(root, FakeLLM([CORE_BROKEN, CORE_FIXED]), workers=1, max_iterations=2, max_shard_files=1)
+    shard = next(s for s in swarm.plan() if s.files == ["pkg/core.py"])
+    assert swarm.tests_for(shard.files) == ["tests/test_core.py"]
+
+    judge_cls = importlib.import_module("src.agents.judge").JudgeAgent
+    evaluate = judge_cls.evaluate
+    seen = []
+
+    def spy(self, *args, **kwargs):
+        # the candidate is judged in an overlay, the tree is untouched until it passed
+        seen.append((self.root != root, (root / "pkg" / "core.py").read_text(encoding="utf-8")))
+        return evaluate(self, *args, **kwargs)
+
+    monkeypatch.setattr(judge_cls, "evaluate", spy)
+    result = swarm.run_shard(shard)
+    assert result.passed and result.iterations == 2  # the broken fix fails tests/test_core.py
+    assert seen == [(True, CORE), (True, CORE)]
+    assert (root / "pkg" / "core.py").read_text(encoding="utf-8") == CORE_FIXED
@@ -0,0 +1,83 @@
+import sys
+import types
+import importlib
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pylint")
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+PylintRunner = importlib.import_module("src.tools.analysis.PylintRunner").PylintRunner
+PylintParser = importlib.import_module("src.tools.analysis.PylintParser")
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def _make_project(root):
+    (root / "pkg").mkdir()
+    (root / "pkg" / "__init__.py").write_text('"""pkg."""\n', encoding="utf-8")
+    (root / "pkg" / "a.py").write_text('"""a."""\nimport os\n', encoding="utf-8")
+    (root / "b.py").write_text('"""b."""\nprint(undefined_name)\n', encoding="utf-8")
+    (root / "_sandbox_backup").mkdir(exist_ok=True)
+    (root / "_sandbox_backup" / "old.py").write_text("import sys\n", encoding="utf-8")
+
+
+def test_run_parallel_over_sandbox(tmp_path):
+    _make_project(tmp_path)
+    setup_project_sandbox(tmp_path)
+
+    report = PylintRunner(max_workers=2).run()
+
+    assert sorted(report.files) == ["b.py", "pkg/__init__.py", "pkg/a.py"]
+    symbols = {(m.path, m.symbol) for m in report.messages}
+    assert ("pkg/a.py", "unused-import") in symbols
+    assert ("b.py", "undefined-variable") in symbols
+    assert report.statements["pkg/a.py"] == 1
+    assert report.score("b.py") < report.score("pkg/__init__.py") == 10.0
+
+
+def test_run_subset_in_process(tmp_path):
+    _make_project(tmp_path)
+    report = PylintRunner(max_workers=1).run(tmp_path, files=["pkg/a.py"])
+    assert report.files == ["pkg/a.py"]
+    assert {m.path for m in report.messages} == {"pkg/a.py"}
+
+
+def test_parse_pylint_output():
+    raw = json.dumps([{
+        "type": "warning", "module": "a", "obj": "", "line": 2, "column": 0,
+        "endLine": 2, "endColumn": 9, "path": "a.py", "symbol": "unused-import",
+        "message": "Unused import os", "message-id": "W0611",
+    }])
+    (msg,) = PylintParser.parse_pylint_output(raw)
+    assert msg.message_id == "W0611" and msg.category == "warning" and msg.end_column == 9
+    assert PylintParser.parse_pylint_output([msg.to_dict()]) == [msg]
+
+
+def test_parse_rejects_invalid_output():
+    with pytest.raises(ValueError):
+        PylintParser.parse_pylint_output("not json")
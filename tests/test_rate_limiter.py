@@ -0,0 +1,180 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+rate_limiter = importlib.import_module("src.middleware.rate_limiter")
+llm_cache = importlib.import_module("src.middleware.llm_cache")
+auditor_mod = importlib.import_module("src.agents.auditor")
+RateLimitedLLM = rate_limiter.RateLimitedLLM
+
+
+class QuotaExceeded(Exception):
+    """What a provider client raises on HTTP 429."""
+
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests")
+        self.retry_after = retry_after
+
+
+class FakeServer:
+    """Local stand-in for the provider: echoes prompts, optional latency and quota."""
+
+    def __init__(self, latency=0.0, max_parallel=None, fail_first=0, retry_after=None):
+        self.latency = latency
+        self.max_parallel = max_parallel
+        self.fail_first = fail_first
+        self.retry_after = retry_after
+        self.calls = []
+        self.active = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self.lock:
+            self.calls.append(prompt)
+            self.active += 1
+            overloaded = self.max_parallel is not None and self.active > self.max_parallel
+            failing = self.fail_first > 0
+            self.fail_first -= 1
+        try:
+            if overloaded or failing:
+                raise QuotaExceeded(self.retry_after)
+            time.sleep(self.latency)
+            return f"echo: {prompt}"
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_requests_per_minute_bucket_paces_calls():
+    server = FakeServer()
+    limiter = RateLimitedLLM(server, rpm=1200, burst=1 / 1200)  # 20/s, no burst
+    start = time.perf_counter()
+    for i in range(6):
+        limiter.invoke(f"p{i}")
+    assert time.perf_counter() - start >= 0.24
+    assert limiter.stats()["requests"] == 6
+
+
+def test_priority_classes_serve_retries_before_auditor():
+    release = threading.Event()
+    order = []
+
+    class Server:
+        def invoke(self, prompt):
+            if prompt == "blocker":
+                release.wait(5)
+            order.append(prompt)
+            return prompt
+
+    limiter = RateLimitedLLM(Server(), max_concurrency=1)
+    auditor = auditor_mod.AuditorAgent(limiter, "fake").llm
+    assert auditor.priority == rate_limiter.AGENT_PRIORITIES["Auditor"]
+    retry = limiter.with_priority("Retry")
+
+    with ThreadPoolExecutor(4) as pool:
+        pool.submit(limiter.invoke, "blocker")
+        time.sleep(0.05)
+        audit = pool.submit(auditor.invoke, "audit")
+        time.sleep(0.05)
+        fix = pool.submit(retry.invoke, "retry")
+        time.sleep(0.05)
+        release.set()
+        audit.result(), fix.result()
+    assert order == ["blocker", "retry", "audit"]
+
+
+def test_rate_limited_requests_back_off_and_halve_concurrency():
+    server = FakeServer(fail_first=2, retry_after=0.05)
+    limiter = RateLimitedLLM(server, max_concurrency=4, base_delay=0.01, rng=random.Random(0))
+    start = time.perf_counter()
+    assert limiter.invoke("hello") == "echo: hello"
+    assert time.perf_counter() - start >= 0.1  # Retry-After honoured twice
+    stats = limiter.stats()
+    assert (stats["rate_limited"], stats["retries"], len(server.calls)) == (2, 2, 3)
+    assert stats["concurrency_limit"] < 4
+
+
+def test_adaptive_concurrency_converges_under_quota():
+    server = FakeServer(latency=0.02, max_parallel=2)
+    limiter = RateLimitedLLM(server, max_concurrency=6, base_delay=0.01, max_delay=0.05, rng=random.Random(1))
+    with ThreadPoolExecutor(6) as pool:
+        results = list(pool.map(limiter.invoke, [f"p{i}" for i in range(30)]))
+    assert results == [f"echo: p{i}" for i in range(30)]
+    stats = limiter.stats()
+    assert stats["rate_limited"] >= 1 and stats["in_flight"] == 0
+    # far fewer wasted calls than one retry per request
+    assert len(server.calls) - 30 == stats["retries"] < 30
+
+
+def test_identical_in_flight_prompts_are_coalesced():
+    server = FakeServer(latency=0.1)
+    limiter = RateLimitedLLM(server)
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(limiter.invoke, ["same prompt"] * 4 + ["same prompt  \r\n"]))
+    assert set(results) == {"echo: same prompt"}
+    assert len(server.calls) == 1 and limiter.stats()["coalesced"] == 4
+
+
+def test_cache_in_front_of_limiter_keeps_priorities(tmp_path):
+    server = FakeServer()
+    limiter = RateLimitedLLM(server)
+    cached = llm_cache.CachedLLM(limiter, llm_cache.LLMCache(tmp_path / "c.sqlite"), "fake")
+    fixer_llm = cached.with_priority("Fixer")
+    assert fixer_llm.llm.priority == rate_limiter.AGENT_PRIORITIES["Fixer"]
+    assert fixer_llm.invoke("x") == fixer_llm.invoke("x") == "echo: x"
+    assert limiter.stats()["requests"] == 1
+
+
+def test_only_real_rate_limits_are_retried():
+    class ResourceExhausted(Exception):
+        pass
+
+    assert rate_limiter.is_rate_limit_error(QuotaExceeded())
+    assert rate_limiter.is_rate_limit_error(ResourceExhausted("try later"))
+    assert not rate_limiter.is_rate_limit_error(ValueError("syntax error at line 429"))
+    assert not rate_limiter.is_rate_limit_error(RuntimeError("billing quota disabled for this project"))
+
+    class Server:
+        calls = 0
+
+        def invoke(self, prompt):
+            Server.calls += 1
+            raise ValueError("bad request near line 429")
+
+    limiter = RateLimitedLLM(Server(), max_concurrency=4)
+    with pytest.raises(ValueError):
+        limiter.invoke("x")
+    assert Server.calls == 1 and limiter.stats()["concurrency_limit"] == 4
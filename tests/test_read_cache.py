@@ -0,0 +1,89 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+ReadCache = importlib.import_module("src.tools.file_operations.ReadCache").ReadCache
+ReadTool = importlib.import_module("src.tools.file_operations.ReadTool").ReadTool
+WriteTool = importlib.import_module("src.tools.file_operations.WriteTool").WriteTool
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def test_second_read_is_a_hit(tmp_path):
+    p = tmp_path / "a.py"
+    p.write_text("x = 1\n", encoding="utf-8")
+    cache = ReadCache()
+    assert cache.read_text(p) == "x = 1\n"
+    assert cache.read_text(p) == "x = 1\n"
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_external_change_is_detected(tmp_path):
+    p = tmp_path / "a.py"
+    p.write_text("x = 1\n", encoding="utf-8")
+    cache = ReadCache()
+    cache.read_text(p)
+
+    p.write_text("x = 22\n", encoding="utf-8")
+    assert cache.read_text(p) == "x = 22\n"
+
+    # same size, different mtime
+    p.write_text("x = 33\n", encoding="utf-8")
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert cache.read_text(p) == "x = 33\n"
+
+
+def test_large_files_use_mmap_and_skip_cache(tmp_path):
+    p = tmp_path / "big.py"
+    p.write_bytes(b"# \xc3\xa9\r\n" * 1000)
+    cache = ReadCache(mmap_threshold=1024, max_entry_bytes=2048)
+    content = cache.read_text(p)
+    assert content == "# é\n" * 1000
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_bound(tmp_path):
+    cache = ReadCache(max_entries=2)
+    for name in ("a.py", "b.py", "c.py"):
+        (tmp_path / name).write_text(name, encoding="utf-8")
+        cache.read_text(tmp_path / name)
+    assert cache.stats()["entries"] == 2
+
+
+def test_write_tool_invalidates_read_tool_cache(tmp_path):
+    setup_project_sandbox(tmp_path)
+    (tmp_path / "m.py").write_text("old = 1\n", encoding="utf-8")
+    rt = ReadTool()
+    assert rt._run("m.py") == "old = 1\n"
+    hits = ReadTool.cache_stats()["hits"]
+    assert rt._run("m.py") == "old = 1\n"
+    assert ReadTool.cache_stats()["hits"] == hits + 1
+
+    WriteTool(create_backup=False)._run("m.py", "new = 2\n")
+    assert rt._run("m.py") == "new = 2\n"
@@ -86,3 +86,71 @@ def test_permission_error(tmp_path):
     finally:
         # restore permissions so pytest can cleanup the tmp_path
         p.chmod(0o644)
+
+
+MODULE_SRC = '''import os
+
+
+@decorator
+def helper(x):
+    return x
+
+
+class Parser:
+    def parse(self, text):
+        return text.split()
+
+    def reset(self):
+        pass
+'''
+
+
+def test_read_line_range(tmp_path):
+    (tmp_path / "m.py").write_text(MODULE_SRC, encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    rt = ReadTool()
+    assert rt._run("m.py", start_line=4, end_line=6) == "@decorator\ndef helper(x):\n    return x\n"
+    assert "Invalid line range" in rt._run("m.py", start_line=5, end_line=2)
+
+
+def test_read_byte_range(tmp_path):
+    (tmp_path / "m.py").write_text("abcdef", encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    assert ReadTool()._run("m.py", start_byte=2, end_byte=4) == "cd"
+
+
+def test_read_symbol(tmp_path):
+    (tmp_path / "m.py").write_text(MODULE_SRC, encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    rt = ReadTool()
+    assert rt._run("m.py", symbol="Parser.parse") == "    def parse(self, text):\n        return text.split()\n"
+    assert rt._run("m.py", symbol="helper").startswith("@decorator\n")
+    res = rt._run("m.py", symbol="missing")
+    assert "not found" in res and "Parser.reset" in res
+
+
+def test_iter_chunks_whole_lines(tmp_path):
+    content = "".join(f"line {i}\n" for i in range(500))
+    (tmp_path / "big.py").write_text(content, encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    chunks = list(ReadTool().iter_chunks("big.py", chunk_size=100))
+    assert len(chunks) > 10
+    assert all(c.endswith("\n") for c in chunks)
+    assert "".join(chunks) == content
+
+
+def test_iter_chunks_caps_lines_without_newline(tmp_path):
+    content = "DATA = [" + "1, " * 2000 + "]\nend = 1\n"
+    (tmp_path / "data.py").write_text(content, encoding="utf-8")
+    setup_project_sandbox(tmp_path)
+    chunks = list(ReadTool().iter_chunks("data.py", chunk_size=100, max_line=400))
+    assert max(len(c) for c in chunks) <= 400
+    assert "".join(chunks) == content
+
+
+def test_iter_chunks_reports_undecodable_file(tmp_path):
+    (tmp_path / "blob.py").write_bytes(b"x = 1\n" * 50 + b"\xff\xfe\x00binary")
+    setup_project_sandbox(tmp_path)
+    chunks = list(ReadTool().iter_chunks("blob.py", chunk_size=100))
+    assert chunks[-1].startswith("Error reading file:")
+    assert all(not c.startswith("Error") for c in chunks[:-1])
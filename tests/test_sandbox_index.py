@@ -0,0 +1,131 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import time
+
+import pytest
+
+SandboxIndex = importlib.import_module("src.tools.file_operations.SandboxIndex").SandboxIndex
+WriteTool = importlib.import_module("src.tools.file_operations.WriteTool").WriteTool
+ListItems = importlib.import_module("src.tools.file_operations.ListItems").ListItems
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_setup_builds_index_with_hashes(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n", encoding="utf-8")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "a.pyc").write_bytes(b"\0")
+    setup_project_sandbox(str(tmp_path))
+    index = SandboxSetup.SANDBOX_INDEX
+    entry = index.get("a.py")
+    assert entry.size == 6 and entry.digest is None  # hashed on demand
+    assert len(index.digest("a.py")) == 64 and entry.digest == index.digest("a.py")
+    assert [f.path for f in index.files()] == ["a.py"]
+
+
+def test_tool_writes_are_indexed_and_queried_by_generation(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n", encoding="utf-8")
+    setup_project_sandbox(str(tmp_path))
+    index = SandboxSetup.SANDBOX_INDEX
+    start = index.generation
+
+    wt = WriteTool(create_backup=False)
+    wt._run("a.py", "a = 2\n")
+    wt._run("pkg/b.py", "b = 1\n")
+    wt._run("a.py", "a = 2\n")  # identical rewrite: not a change
+
+    changes = index.changes_since(start)
+    assert [(c.path, c.kind) for c in changes] == [("a.py", "modified"), ("pkg/b.py", "added")]
+    assert index.changed_files_since(start) == ["a.py", "pkg/b.py"]
+    assert index.changes_since(index.generation) == []
+
+    out = ListItems()._run(".", changed_since=start).splitlines()
+    assert out == ["modified\ta.py", "added\tpkg/b.py", f"Generation: {index.generation}"]
+
+
+def test_refresh_sees_external_changes_and_nets_them(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n", encoding="utf-8")
+    index = SandboxIndex(tmp_path).build()
+    gen = index.generation
+    (tmp_path / "a.py").unlink()
+    (tmp_path / "tmp.py").write_text("t = 1\n", encoding="utf-8")
+    (tmp_path / "c.py").write_text("c = 1\n", encoding="utf-8")
+    index.refresh()
+    (tmp_path / "tmp.py").unlink()
+    index.refresh()
+    assert sorted((c.path, c.kind) for c in index.changes_since(gen)) == [("a.py", "deleted"), ("c.py", "added")]
+
+
+@pytest.mark.parametrize("mode", ["poll", "auto"])
+def test_watcher_follows_external_changes(tmp_path, mode):
+    index = SandboxIndex(tmp_path).build()
+    resolved = []
+    index.on_directory_change = lambda: resolved.append(True)
+    used = index.start_watching(mode=mode, interval=0.05)
+    try:
+        gen = index.generation
+        (tmp_path / "sub").mkdir()
+        time.sleep(0.1)
+        (tmp_path / "sub" / "new.py").write_text("n = 1\n", encoding="utf-8")
+        assert _wait_for(lambda: index.get("sub/new.py") is not None)
+        assert index.changed_files_since(gen) == ["sub/new.py"]
+        if used == "inotify":
+            assert resolved
+    finally:
+        index.stop_watching()
+
+
+def test_inotify_follows_moved_directories(tmp_path):
+    index = SandboxIndex(tmp_path).build()
+    try:
+        if index.start_watching(mode="inotify", interval=0.05) != "inotify":
+            pytest.skip("inotify not available")
+    except OSError:
+        pytest.skip("inotify not available")
+    try:
+        (tmp_path / "old" / "inner").mkdir(parents=True)
+        time.sleep(0.1)
+        (tmp_path / "old").rename(tmp_path / "new")
+        time.sleep(0.1)
+        (tmp_path / "new" / "inner" / "m.py").write_text("m = 1\n", encoding="utf-8")
+        assert _wait_for(lambda: index.get("new/inner/m.py") is not None)
+        assert index.get("old/inner/m.py") is None
+        assert sorted(index._watcher._dirs.values()) == ["", "new", "new/inner"]
+    finally:
+        index.stop_watching()
@@ -0,0 +1,85 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import time
+
+SandboxResolver = importlib.import_module("src.tools.file_operations.SandboxResolver").SandboxResolver
+validate_path = importlib.import_module("src.tools.file_operations.PathValidator").validate_path
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def test_repeated_validation_is_memoized(tmp_path):
+    resolver = SandboxResolver(tmp_path)
+    first = resolver.validate("pkg/mod.py")
+    assert first == tmp_path.resolve() / "pkg" / "mod.py"
+    assert resolver.validate("pkg/mod.py") is first
+    assert (resolver.stats()["hits"], resolver.stats()["misses"]) == (1, 1)
+    assert resolver.relative(first) == "pkg/mod.py"
+
+
+def test_rejects_escapes_and_non_python(tmp_path):
+    (tmp_path / "root").mkdir()
+    resolver = SandboxResolver(tmp_path / "root")
+    assert resolver.validate("../outside.py") is None
+    assert resolver.validate("/etc/passwd") is None
+    assert resolver.validate("notes.txt") is None
+    assert resolver.resolve("sub/..") == resolver.root
+    assert resolver.validate_many(["a.py", "../b.py", "c/d.py"]) == [
+        resolver.root / "a.py", None, resolver.root / "c" / "d.py"
+    ]
+
+
+def test_invalidate_and_ttl_catch_symlink_swap(tmp_path):
+    root = tmp_path / "root"
+    (root / "pkg").mkdir(parents=True)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    resolver = SandboxResolver(root, ttl=60)
+    assert resolver.validate("pkg/mod.py") is not None
+
+    (root / "pkg").rmdir()
+    os.symlink(outside, root / "pkg")
+    assert resolver.validate("pkg/mod.py") is not None  # still memoized
+    resolver.invalidate()
+    assert resolver.validate("pkg/mod.py") is None
+
+    short = SandboxResolver(root, ttl=0.01)
+    assert short.validate("other.py") is not None
+    time.sleep(0.02)
+    short.validate("other.py")
+    assert short.stats()["misses"] == 2
+
+
+def test_setup_creates_shared_resolver(tmp_path):
+    root = setup_project_sandbox(str(tmp_path))
+    resolver = SandboxSetup.get_resolver()
+    assert resolver is SandboxSetup.SANDBOX_RESOLVER and resolver.root == root
+    assert validate_path("x.py", str(tmp_path))
+    assert resolver.stats()["misses"] == 1
@@ -0,0 +1,135 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+import threading
+import time
+
+import pytest
+
+scheduler_mod = importlib.import_module("src.orchestration.scheduler")
+sharding = importlib.import_module("src.orchestration.sharding")
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+WriteTransaction = importlib.import_module("src.tools.file_operations.WriteTransaction").WriteTransaction
+
+DependencyScheduler = scheduler_mod.DependencyScheduler
+Shard = sharding.Shard
+
+
+def _shards(*groups):
+    return [Shard(id=i, files=list(files)) for i, files in enumerate(groups)]
+
+
+def _sandbox(tmp_path, files):
+    for rel in files:
+        (tmp_path / rel).write_text(f"# {rel}\n", encoding="utf-8")
+    SandboxSetup.setup_project_sandbox(str(tmp_path), build_index=False)
+
+
+def test_strongly_connected_groups_cycles():
+    component = scheduler_mod.strongly_connected([0, 1, 2, 3], {0: {1}, 1: {0}, 2: {1}, 3: set()})
+    assert component[0] == component[1]
+    assert len({component[0], component[2], component[3]}) == 3
+
+
+def test_dependencies_run_first_and_independent_shards_overlap(tmp_path):
+    # c imports b imports a; x and y are independent
+    graph = {"a.py": set(), "b.py": {"a.py"}, "c.py": {"b.py"}, "x.py": set(), "y.py": set()}
+    _sandbox(tmp_path, graph)
+    shards = _shards(["c.py"], ["b.py"], ["a.py"], ["x.py"], ["y.py"])
+    finished, active, peak = [], [0], [0]
+    lock = threading.Lock()
+
+    def run(shard):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+            finished.append(shard.files[0])
+        return shard.id
+
+    sched = DependencyScheduler(graph, shards, run, tmp_path, workers=4)
+    results = sched.run()
+
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    assert finished.index("a.py") < finished.index("b.py") < finished.index("c.py")
+    assert peak[0] >= 3  # a, x and y together
+    assert all(n == 1 for n in sched.runs.values())
+
+
+def test_changed_file_requeues_only_its_finished_importers(tmp_path):
+    # a <-> b import each other (a cycle, so they run side by side); c imports nothing
+    graph = {"a.py": {"b.py"}, "b.py": {"a.py"}, "c.py": set()}
+    _sandbox(tmp_path, graph)
+    shards = _shards(["a.py"], ["b.py"], ["c.py"])
+    b_may_write = threading.Event()
+
+    def run(shard):
+        name = shard.files[0]
+        if name == "a.py" and sched.runs[0] == 1:
+            b_may_write.set()
+        if name == "b.py" and sched.runs[1] == 1:
+            b_may_write.wait(5)
+            time.sleep(0.1)  # let a finish first
+            with WriteTransaction(tmp_path) as txn:
+                txn.write("b.py", "# changed\n")
+            with WriteTransaction(tmp_path) as txn:
+                txn.write("c.py", "# written\n")
+        return shard.id
+
+    sched = DependencyScheduler(graph, shards, run, tmp_path, workers=3, max_requeues=1)
+    sched.run()
+
+    assert sched.runs == {0: 2, 1: 1, 2: 1}  # only a imports b; nobody imports c
+    assert sched.order.count(0) == 2
+
+
+def test_rolled_back_writes_do_not_requeue(tmp_path):
+    # a <-> b: both start together, b finishes before a's rejected attempt
+    graph = {"a.py": {"b.py"}, "b.py": {"a.py"}}
+    _sandbox(tmp_path, graph)
+    shards = _shards(["a.py"], ["b.py"])
+    b_done = threading.Event()
+
+    def run(shard):
+        if shard.files == ["b.py"]:
+            b_done.set()
+            return shard.id
+        b_done.wait(5)
+        time.sleep(0.1)
+        txn = WriteTransaction(tmp_path)
+        txn.write("a.py", "# attempt\n")
+        txn.commit()
+        txn.rollback()
+        return shard.id
+
+    sched = DependencyScheduler(graph, shards, run, tmp_path, workers=2)
+    sched.run()
+    assert (tmp_path / "a.py").read_text(encoding="utf-8") == "# a.py\n"
+    assert sched.runs == {0: 1, 1: 1}
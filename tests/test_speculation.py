@@ -0,0 +1,190 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+import json
+import os
+import re
+import threading
+import time
+
+import pytest
+
+speculation = importlib.import_module("src.orchestration.speculation")
+swarm_mod = importlib.import_module("src.orchestration.swarm")
+judge_mod = importlib.import_module("src.agents.judge")
+fixer_mod = importlib.import_module("src.agents.fixer")
+base_agent = importlib.import_module("src.agents.base_agent")
+logger = importlib.import_module("src.utils.logger")
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+PylintRunner = importlib.import_module("src.tools.analysis.PylintRunner").PylintRunner
+
+CORE = "def add(a, b):\n    return a + b\n"
+CORE_FIXED = '"""Core helpers."""\n\n\ndef add(a, b):\n    """Return the sum of a and b."""\n    return a + b\n'
+CORE_INVALID = "def add(a, b:\n    return a + b\n"
+TEST_CORE = "from pkg.core import add\n\n\ndef test_add():\n    assert add(1, 2) == 3\n"
+
+
+def _project(root):
+    files = {"pkg/__init__.py": "", "pkg/core.py": CORE, "pkg/test_core.py": TEST_CORE}
+    for rel, content in files.items():
+        p = root / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(content, encoding="utf-8")
+    SandboxSetup.setup_project_sandbox(str(root))
+    return root
+
+
+class CandidateLLM:
+    """
+    Candidate 1 is rejected at once (invalid syntax), candidate 2 is a valid fix,
+    candidate 3 only answers once a candidate has passed (see `signalling_judge`).
+    With `truncated`, every answer is cut in the middle of the JSON.
+    """
+
+    answers = {1: CORE_INVALID, 2: CORE_FIXED, 3: CORE_FIXED}
+
+    def __init__(self, truncated=False):
+        self.truncated = truncated
+        self.release = threading.Event()
+
+    def __call__(self, prompt):
+        if prompt.startswith("You are the Auditor"):
+            return json.dumps({"plan": "Add docstrings", "issues": {}})
+        if self.truncated:
+            return '{"files": {"pkg/core.py": "\\"\\"\\"Core'
+        index = int(re.search(r"candidate (\d+) of", prompt).group(1))
+        if index == 3:
+            self.release.wait(10)
+        return json.dumps({"files": {"pkg/core.py": self.answers[index]}})
+
+
+@pytest.fixture(autouse=True)
+def langchain_globals(monkeypatch):
+    # langgraph reads these globals from the (stubbed) langchain root module
+    for name, value in (("debug", False), ("verbose", False), ("llm_cache", None)):
+        monkeypatch.setattr(sys.modules["langchain"], name, value, raising=False)
+
+
+@pytest.fixture(autouse=True)
+def isolated_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger, "LOG_FILE", str(tmp_path / "experiment_data.json"))
+    monkeypatch.setattr(logger, "LOG_STREAM_FILE", str(tmp_path / "experiment_data.jsonl"))
+    monkeypatch.setattr(logger, "_writer", None)
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    entries = []
+    monkeypatch.setattr(base_agent, "log_experiment", lambda *args: entries.append(args))
+    return entries
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    llm = CandidateLLM()
+
+    class SignallingJudge(judge_mod.JudgeAgent):
+        def evaluate(self, *args, **kwargs):
+            verdict = super().evaluate(*args, **kwargs)
+            if verdict.passed:
+                llm.release.set()
+            return verdict
+
+    monkeypatch.setattr(speculation, "JudgeAgent", SignallingJudge)
+    return llm
+
+
+def _candidate_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("candidate")]
+
+
+def test_overlay_links_project_and_isolates_writes(tmp_path):
+    root = _project(tmp_path)
+    overlay = speculation.Overlay.create(root)
+    assert os.stat(overlay.root / "pkg/test_core.py").st_ino == os.stat(root / "pkg/test_core.py").st_ino
+
+    assert overlay.write("pkg/core.py", CORE_FIXED) == ""
+    assert (overlay.root / "pkg/core.py").read_text(encoding="utf-8") == CORE_FIXED
+    assert (root / "pkg/core.py").read_text(encoding="utf-8") == CORE
+    assert overlay.write("pkg/core.py", CORE_INVALID).startswith("Error")
+
+    overlay.remove()
+    assert not overlay.root.exists()
+
+
+def test_judge_cancellation_kills_running_tests(tmp_path):
+    (tmp_path / "test_slow.py").write_text("import time\n\n\ndef test_slow():\n    time.sleep(30)\n", encoding="utf-8")
+    judge = judge_mod.JudgeAgent(tmp_path, PylintRunner(max_workers=1))
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    start = time.perf_counter()
+    assert judge.run_tests(["test_slow.py"], cancel) == (False, "Cancelled")
+    assert time.perf_counter() - start < 10
+
+
+def test_first_passing_candidate_wins_and_losers_are_joined(tmp_path, logged, llm):
+    root = _project(tmp_path)
+    judge = judge_mod.JudgeAgent(root, PylintRunner(max_workers=1))
+    speculator = speculation.SpeculativeFixer(root, fixer_mod.FixerAgent(llm, "fake"), judge, candidates=3)
+    sources = {rel: (root / rel).read_text(encoding="utf-8") for rel in ("pkg/core.py", "pkg/test_core.py")}
+    result = speculator.run(sources, "Add docstrings", judge.lint(sorted(sources)).score())
+
+    assert result.winner.index == 2 and result.winner.verdict.passed
+    assert [c.index for c in result.candidates] == [1, 2, 3]
+    first, _, late = result.candidates
+    assert first.verdict.syntax_errors and not first.verdict.passed
+    assert late.verdict is None or late.verdict.cancelled  # answered after the cut-off
+    # every LLM call returned before run() did: nothing is left running
+    assert {entry[3]["candidate"] for entry in logged} == {1, 2, 3}
+    assert not _candidate_threads()
+    assert (root / "pkg/core.py").read_text(encoding="utf-8") == CORE
+
+
+def test_swarm_commits_the_winning_candidate(tmp_path, logged, llm):
+    root = _project(tmp_path)
+    swarm = swarm_mod.Swarm(root, llm, "fake", workers=1, candidates=3, runner=PylintRunner(max_workers=1))
+    report = swarm.run()
+
+    assert report.passed == len(report.results) == 1
+    assert report.changed_files == ["pkg/core.py"]
+    assert (root / "pkg/core.py").read_text(encoding="utf-8") == CORE_FIXED
+    assert report.results[0].iterations == 1
+    assert not _candidate_threads()
+    overlays = root / "_sandbox_backup" / "overlays"
+    assert not overlays.exists() or not any(overlays.iterdir())
+
+
+def test_unusable_candidates_fail_the_shard(tmp_path, logged):
+    root = _project(tmp_path)
+    swarm = swarm_mod.Swarm(root, CandidateLLM(truncated=True), "fake", workers=1, candidates=2,
+                            max_iterations=1, runner=PylintRunner(max_workers=1))
+    report = swarm.run()
+
+    assert report.passed == 0 and report.changed_files == []
+    assert (root / "pkg/core.py").read_text(encoding="utf-8") == CORE
+    assert len([entry for entry in logged if entry[0] == "Fixer"]) == 2
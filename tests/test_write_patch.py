@@ -0,0 +1,143 @@
+import os
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+import pytest
+
+WriteTool = importlib.import_module("src.tools.file_operations.WriteTool").WriteTool
+PatchApplier = importlib.import_module("src.tools.file_operations.PatchApplier")
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+SOURCE = (
+    "import os\n"
+    "\n"
+    "\n"
+    "def first():\n"
+    "    return 1\n"
+    "\n"
+    "\n"
+    "@decorate\n"
+    "def second():\n"
+    "    return 2\n"
+    "\n"
+    "\n"
+    "def third():\n"
+    "    return 3\n"
+)
+
+DIFF = """--- a/mod.py
++++ b/mod.py
+@@ -4,2 +4,2 @@
+ def first():
+-    return 1
++    return 10
+@@ -13,2 +13,3 @@
+ def third():
+-    return 3
++    value = 3
++    return value
+"""
+
+
+def test_unified_diff_applies_hunks():
+    result = PatchApplier.apply_patch(SOURCE, DIFF)
+    assert "    return 10\n" in result.content
+    assert "    value = 3\n    return value\n" in result.content
+    assert (result.added, result.removed) == (5, 4)
+    assert result.content.endswith("return value\n")
+
+
+def test_search_replace_and_conflicts_fail_fast():
+    patch = "<<<<<<< SEARCH\n    return 2\n=======\n    return 20\n>>>>>>> REPLACE\n"
+    assert "return 20" in PatchApplier.apply_patch(SOURCE, patch).content
+
+    missing = "<<<<<<< SEARCH\n    return 99\n=======\n    pass\n>>>>>>> REPLACE\n"
+    with pytest.raises(PatchApplier.PatchError, match="not found"):
+        PatchApplier.apply_patch(SOURCE, missing)
+
+    ambiguous = "<<<<<<< SEARCH\n\n\n=======\n>>>>>>> REPLACE\n"  # the blank lines between definitions
+    with pytest.raises(PatchApplier.PatchError, match="several places"):
+        PatchApplier.apply_patch(SOURCE, ambiguous)
+
+    overlapping = patch + "<<<<<<< SEARCH\ndef second():\n    return 2\n=======\n>>>>>>> REPLACE\n"
+    with pytest.raises(PatchApplier.PatchError, match="overlap"):
+        PatchApplier.apply_patch(SOURCE, overlapping)
+
+
+def test_only_touched_definitions_are_reparsed(monkeypatch):
+    result = PatchApplier.apply_patch(SOURCE, DIFF)
+    tree = PatchApplier.parse_cached(SOURCE)
+    regions = PatchApplier.affected_regions(tree, result.edits)
+    new_lines = result.content.splitlines()
+    assert ["\n".join(new_lines[a:b]) for a, b, _ in regions] == [
+        "def first():\n    return 10",
+        "def third():\n    value = 3\n    return value",
+    ]
+
+    parsed = []
+    real_parse = PatchApplier.ast.parse
+    monkeypatch.setattr(PatchApplier.ast, "parse", lambda src, **kw: parsed.append(src) or real_parse(src, **kw))
+    assert PatchApplier.patched_syntax_error(SOURCE, result) == ""
+    assert SOURCE not in parsed and len(parsed) == 2
+
+    # a decorator line added alone does not parse in isolation: full parse decides
+    decorator = "<<<<<<< SEARCH\n\n\n@decorate\n=======\n\n\n@decorate\n@other\n>>>>>>> REPLACE\n"
+    assert PatchApplier.patched_syntax_error(SOURCE, PatchApplier.apply_patch(SOURCE, decorator)) == ""
+
+    broken = PatchApplier.apply_patch(SOURCE, "<<<<<<< SEARCH\n    return 1\n=======\n    return (1\n>>>>>>> REPLACE\n")
+    assert PatchApplier.patched_syntax_error(SOURCE, broken)
+
+
+def test_write_tool_patch_mode(tmp_path):
+    root = setup_project_sandbox(str(tmp_path))
+    (root / "mod.py").write_text(SOURCE, encoding="utf-8")
+    tool = WriteTool()
+
+    message = tool._run("mod.py", patch=DIFF)
+    assert message.startswith("Success: Applied 2 hunk(s)")
+    assert "return 10" in (root / "mod.py").read_text(encoding="utf-8")
+
+    # the same diff no longer applies: nothing is written
+    after = (root / "mod.py").read_text(encoding="utf-8")
+    assert "Patch does not apply" in tool._run("mod.py", patch=DIFF)
+    bad = "<<<<<<< SEARCH\n    return 10\n=======\n    return (\n>>>>>>> REPLACE\n"
+    assert "Invalid Python syntax" in tool._run("mod.py", patch=bad)
+    assert (root / "mod.py").read_text(encoding="utf-8") == after
+    assert tool._run("mod.py").startswith("Error")
+
+
+def test_patch_keeps_form_feeds_and_each_line_terminator():
+    original = 'PAGE = "a\x0cb"\r\nx = 1\ny = 2\n\x0c\nz = 3'
+    patch = "<<<<<<< SEARCH\ny = 2\n=======\ny = 20\ny2 = 21\n>>>>>>> REPLACE\n"
+    result = PatchApplier.apply_patch(original, patch)
+    assert result.content == 'PAGE = "a\x0cb"\r\nx = 1\ny = 20\ny2 = 21\n\x0c\nz = 3'
+
+    crlf = "a = 1\r\nb = 2\r\nc = 3\r\n"
+    patch = "<<<<<<< SEARCH\nc = 3\n=======\nc = 30\n>>>>>>> REPLACE\n"
+    assert PatchApplier.apply_patch(crlf, patch).content == "a = 1\r\nb = 2\r\nc = 30\r\n"
+    assert PatchApplier.split_lines("a\x0cb\r\nc") == (["a\x0cb", "c"], ["\r\n", ""])
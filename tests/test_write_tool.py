@@ -42,9 +42,9 @@ def make_writer(**overrides):
     if "_validate_python_syntax" in overrides:
         wt._validate_python_syntax = types.MethodType(overrides["_validate_python_syntax"], wt)
 
-    # Attach optional _write_atomically stub
-    if "_write_atomically" in overrides:
-        wt._write_atomically = types.MethodType(overrides["_write_atomically"], wt)
+    # Attach optional write_atomic stub
+    if "write_atomic" in overrides:
+        wt.write_atomic = types.MethodType(overrides["write_atomic"], wt)
 
     return wt
 
@@ -54,13 +54,13 @@ def test_write_success(tmp_path):
     content = "hello write"
     setup_project_sandbox(tmp_path)
 
-    def _write_atomically(self, path, content_arg):
+    def write_atomic(self, path, content_arg):
         path.parent.mkdir(parents=True, exist_ok=True)
         with path.open("w", encoding="utf-8") as f:
             f.write(content_arg)
         return True, ""
 
-    wt = make_writer(create_backup=False, _write_atomically=_write_atomically)
+    wt = make_writer(create_backup=False, write_atomic=write_atomic)
     res = wt._run(out.name, content)
 
     assert "Success: Wrote" in res
@@ -74,13 +74,13 @@ def test_backup_created(tmp_path):
 
     new_content = "print('new')\n"
 
-    def _write_atomically(self, path, content_arg):
+    def write_atomic(self, path, content_arg):
         with path.open("w", encoding="utf-8") as f:
             f.write(content_arg)
         return True, ""
 
     setup_project_sandbox(tmp_path)
-    wt = make_writer(create_backup=True, _write_atomically=_write_atomically)
+    wt = make_writer(create_backup=True, write_atomic=write_atomic)
     res = wt._run(out.name, new_content)
 
     # Expect success and a backup mention
@@ -95,11 +95,11 @@ def test_permission_error_writing(tmp_path):
     out = tmp_path / "nope.py"
     content = "data"
 
-    def _write_atomically(self, path, content_arg):
+    def write_atomic(self, path, content_arg):
         raise PermissionError("no write")
 
     setup_project_sandbox(tmp_path)
-    wt = make_writer(_write_atomically=_write_atomically)
+    wt = make_writer(write_atomic=write_atomic)
     res = wt._run(out.name, content)
     assert "Permission denied" in res
 
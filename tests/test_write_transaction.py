@@ -0,0 +1,194 @@
+import os
+import subprocess
+import sys
+import types
+import importlib
+from pathlib import Path
+
+
+# Minimal stub for langchain.tools.BaseTool to avoid installing langchain in tests
+def _install_langchain_stub():
+    tools_mod = types.ModuleType("langchain.tools")
+    class BaseTool:
+        def __init__(self, *args, **kwargs):
+            pass
+    tools_mod.BaseTool = BaseTool
+
+    langchain_mod = types.ModuleType("langchain")
+    langchain_mod.tools = tools_mod
+
+    sys.modules["langchain"] = langchain_mod
+    sys.modules["langchain.tools"] = tools_mod
+
+
+_install_langchain_stub()
+
+# Ensure repo root is importable as `src`
+repo_root = str(Path(__file__).resolve().parents[1])
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+import pytest
+
+wt_mod = importlib.import_module("src.tools.file_operations.WriteTransaction")
+WriteTransaction = wt_mod.WriteTransaction
+TransactionError = wt_mod.TransactionError
+WriteTool = importlib.import_module("src.tools.file_operations.WriteTool").WriteTool
+WriteEvents = importlib.import_module("src.tools.file_operations.WriteEvents")
+SandboxSetup = importlib.import_module("src.tools.file_operations.SandboxSetup")
+setup_project_sandbox = SandboxSetup.setup_project_sandbox
+
+
+def _sandbox(tmp_path):
+    root = setup_project_sandbox(str(tmp_path))
+    (root / "a.py").write_text("a = 1\n", encoding="utf-8")
+    (root / "b.py").write_text("b = 1\n", encoding="utf-8")
+    return root
+
+
+def test_commit_applies_all_and_keeps_linked_originals(tmp_path):
+    root = _sandbox(tmp_path)
+    ino_a = (root / "a.py").stat().st_ino
+    seen = []
+    WriteEvents.subscribe(seen.append)
+    try:
+        with WriteTool(create_backup=False).transaction() as txn:
+            txn.write("a.py", "a = 2\n")
+            txn.write("b.py", "b = 2\n")
+            txn.write("pkg/new.py", "n = 1\n")
+            assert (root / "a.py").read_text(encoding="utf-8") == "a = 1\n"
+    finally:
+        WriteEvents.unsubscribe(seen.append)
+
+    assert txn.state == "committed"
+    assert (root / "a.py").read_text(encoding="utf-8") == "a = 2\n"
+    assert (root / "pkg" / "new.py").read_text(encoding="utf-8") == "n = 1\n"
+    assert sorted(e.relative_path for e in seen) == ["a.py", "b.py", "pkg/new.py"]
+    # the original survives as a hardlink of the old inode, not as a copy
+    backups = list((txn.directory / "originals").iterdir())
+    assert ino_a in {b.stat().st_ino for b in backups}
+    assert not list(root.glob("*.backup_*"))
+
+
+def test_rollback_after_commit_restores_tree(tmp_path):
+    root = _sandbox(tmp_path)
+    txn = WriteTransaction()
+    txn.write("a.py", "a = 2\n")
+    txn.write("pkg/new.py", "n = 1\n")
+    txn.commit()
+
+    txn.rollback()
+    assert (root / "a.py").read_text(encoding="utf-8") == "a = 1\n"
+    assert not (root / "pkg").exists()
+    assert not txn.directory.exists()
+
+
+def test_failure_midway_rolls_back_applied_files(tmp_path, monkeypatch):
+    root = _sandbox(tmp_path)
+    txn = WriteTransaction()
+    txn.write("a.py", "a = 2\n")
+    txn.write("b.py", "b = 2\n")
+
+    real_replace = os.replace
+    def flaky_replace(src, dst):
+        if str(dst).endswith("b.py"):
+            raise OSError("disk full")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(wt_mod.os, "replace", flaky_replace)
+    with pytest.raises(TransactionError):
+        txn.commit()
+    monkeypatch.setattr(wt_mod.os, "replace", real_replace)
+
+    assert txn.state == "rolled_back"
+    assert (root / "a.py").read_text(encoding="utf-8") == "a = 1\n"
+    assert (root / "b.py").read_text(encoding="utf-8") == "b = 1\n"
+
+
+def test_invalid_edit_and_exception_leave_tree_untouched(tmp_path):
+    root = _sandbox(tmp_path)
+    with pytest.raises(TransactionError):
+        WriteTransaction().write("bad.py", "def broken(:\n")
+    with pytest.raises(TransactionError):
+        WriteTransaction().write("../escape.py", "x = 1\n")
+
+    with pytest.raises(RuntimeError):
+        with WriteTransaction() as txn:
+            txn.write("a.py", "a = 3\n")
+            raise RuntimeError("agent crashed")
+    assert (root / "a.py").read_text(encoding="utf-8") == "a = 1\n"
+    assert not txn.directory.exists()
+
+
+def test_recover_interrupted_commit(tmp_path):
+    root = _sandbox(tmp_path)
+    txn = WriteTransaction()
+    txn.write("a.py", "a = 2\n")
+    txn.write("b.py", "b = 2\n")
+    # simulate a crash after the first file was swapped in
+    txn._existed = {"a.py": True, "b.py": True}
+    txn.state = "committing"
+    (txn.directory / "originals").mkdir()
+    txn._save_manifest()
+    wt_mod.snapshot_file(root / "a.py", txn.directory / "originals" / "0")
+    os.replace(txn.directory / "staged" / "0", root / "a.py")
+    directory = txn.directory
+    del txn  # the crashed process no longer holds the transaction
+
+    assert WriteTransaction.recover(root) == 1
+    assert (root / "a.py").read_text(encoding="utf-8") == "a = 1\n"
+    assert (root / "b.py").read_text(encoding="utf-8") == "b = 1\n"
+    assert not directory.exists()
+
+
+def test_setup_recovers_and_drops_stale_transactions(tmp_path):
+    root = _sandbox(tmp_path)
+    crashed = WriteTransaction()
+    crashed.write("a.py", "a = 2\n")
+    crashed._existed = {"a.py": True}
+    crashed.state = "committing"
+    (crashed.directory / "originals").mkdir()
+    crashed._save_manifest()
+    wt_mod.snapshot_file(root / "a.py", crashed.directory / "originals" / "0")
+    os.replace(crashed.directory / "staged" / "0", root / "a.py")
+    stale = WriteTransaction()
+    stale.write("b.py", "b = 2\n")
+    stale._save_manifest()  # state "open"
+    directories = [crashed.directory, stale.directory]
+    del crashed, stale
+
+    live = WriteTransaction()
+    live.write("b.py", "b = 3\n")
+    setup_project_sandbox(root)
+
+    assert (root / "a.py").read_text(encoding="utf-8") == "a = 1\n"
+    assert not any(d.exists() for d in directories)
+    assert live.directory.exists()
+    live.commit()
+    assert (root / "b.py").read_text(encoding="utf-8") == "b = 3\n"
+
+
+def test_recover_leaves_transactions_owned_by_another_process(tmp_path):
+    if wt_mod.fcntl is None:
+        pytest.skip("flock not available")
+    root = _sandbox(tmp_path)
+    txn = WriteTransaction()
+    txn.write("a.py", "a = 2\n")  # open, no manifest yet
+    directory, lock_path = txn.directory, txn._lock_path
+    del txn
+
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import fcntl, sys; f = open(sys.argv[1], 'a'); fcntl.flock(f, fcntl.LOCK_EX); "
+         "print('locked', flush=True); sys.stdin.read()", str(lock_path)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        assert WriteTransaction.recover(root) == 0
+        assert directory.exists()
+    finally:
+        holder.communicate("")
+
+    WriteTransaction.recover(root)  # the owner is gone: now it is stale
+    assert not directory.exists() and not lock_path.exists()